@@ -34,6 +34,10 @@ echo ""
 echo "Running migrations..."
 python manage.py migrate --no-input
 
+echo ""
+echo "Creating cache table..."
+python manage.py createcachetable
+
 echo ""
 echo "Verifying database tables..."
 python manage.py showmigrations orders
@@ -82,6 +82,20 @@ else:
         }
     }
 
+# Cache
+# default: per process (fast). shared: DB table every gunicorn worker sees - dashboard payloads
+# and rebuild locks (created by `manage.py createcachetable` in build.sh)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'shared_cache',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -146,7 +160,10 @@ CORS_ALLOW_HEADERS = [
     'x-csrftoken',
     'x-requested-with',
     'ngrok-skip-browser-warning',
+    'if-none-match',
+    'if-modified-since',
 ]
+CORS_EXPOSE_HEADERS = ['etag', 'last-modified']
 CORS_ALLOW_METHODS = [
     'DELETE',
     'GET',
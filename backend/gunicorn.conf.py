@@ -0,0 +1,8 @@
+# Loaded automatically by gunicorn when started from this directory
+# Live session long-polls wait up to LONG_POLL_MAX_SECONDS (at most LONG_POLL_MAX_WAITERS
+# per worker) - threaded workers keep serving the API meanwhile
+import os
+
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+timeout = 60
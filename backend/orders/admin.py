@@ -1,6 +1,9 @@
 from django.contrib import admin
+from django.utils import timezone
+from django.db.models import Count, Q
 from django.utils.html import format_html
-from .models import Order, CallHistory
+from .models import Order, CallHistory, CallSession, JobRun, TrackingCacheStats
+from . import cache_versions, read_model, call_sessions, tombstones
 
 
 @admin.register(Order)
@@ -141,6 +144,10 @@ class OrderAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return True
 
+    # "Delete selected" - one tombstone insert + one version bump instead of per-row signals
+    def delete_queryset(self, request, queryset):
+        tombstones.delete(queryset, 'order')
+
     # Custom actions
     actions = ['mark_as_ofd', 'mark_as_undelivered', 'sync_phone_numbers', 'cleanup_all_data']
 
@@ -148,13 +155,15 @@ class OrderAdmin(admin.ModelAdmin):
         """Delete ALL orders and call history - Fresh start"""
         from .models import CallHistory
 
-        # Delete ALL call history
-        call_deleted = CallHistory.objects.all().delete()[0]
+        # One tombstone insert + one version bump per table, dashboard rows refreshed once at the end
+        with read_model.batch():
+            # Delete ALL call history
+            call_deleted = tombstones.delete(CallHistory.objects.all(), 'call')
 
-        # Delete all OFD/Undelivered orders
-        order_deleted = Order.objects.filter(
-            order_type__in=['OFD', 'Undelivered']
-        ).delete()[0]
+            # Delete all OFD/Undelivered orders
+            order_deleted = tombstones.delete(Order.objects.filter(
+                order_type__in=['OFD', 'Undelivered']
+            ), 'order')
 
         self.message_user(
             request,
@@ -165,13 +174,19 @@ class OrderAdmin(admin.ModelAdmin):
 
     def mark_as_ofd(self, request, queryset):
         """Mark selected orders as OFD"""
-        updated = queryset.update(order_type='OFD')
+        awbs = list(queryset.values_list('awb', flat=True))
+        updated = queryset.update(order_type='OFD', updated_at=timezone.now())
+        read_model.refresh_rows(awbs)
+        cache_versions.bump(cache_versions.ORDERS)
         self.message_user(request, f'{updated} orders marked as OFD')
     mark_as_ofd.short_description = '🚚 Mark as OFD'
 
     def mark_as_undelivered(self, request, queryset):
         """Mark selected orders as Undelivered"""
-        updated = queryset.update(order_type='Undelivered')
+        awbs = list(queryset.values_list('awb', flat=True))
+        updated = queryset.update(order_type='Undelivered', updated_at=timezone.now())
+        read_model.refresh_rows(awbs)
+        cache_versions.bump(cache_versions.ORDERS)
         self.message_user(request, f'{updated} orders marked as Undelivered')
     mark_as_undelivered.short_description = '⚠️ Mark as Undelivered'
 
@@ -199,9 +214,12 @@ class OrderAdmin(admin.ModelAdmin):
                 phone = customer_details.get('customer_mobile') or customer_details.get('customer_phone')
 
                 if phone and phone != 'N/A':
-                    queryset.filter(awb=awb).update(customer_mobile=phone)
+                    queryset.filter(awb=awb).update(customer_mobile=phone, updated_at=timezone.now())
                     updated_count += 1
 
+        if updated_count:
+            read_model.refresh_rows(awbs_to_sync)
+            cache_versions.bump(cache_versions.ORDERS)
         self.message_user(request, f'Updated {updated_count} phone numbers from Track API')
     sync_phone_numbers.short_description = '📞 Sync Phone Numbers'
 
@@ -248,6 +266,10 @@ class CallHistoryAdmin(admin.ModelAdmin):
         'duration',
         'cost',
         'ended_reason',
+        'success_evaluation',
+        'summary',
+        'recording_url',
+        'transcript',
         'vapi_response_display',
         'created_at',
         'updated_at',
@@ -287,6 +309,14 @@ class CallHistoryAdmin(admin.ModelAdmin):
                 'retry_count'
             )
         }),
+        ('Call Outcome', {
+            'fields': (
+                'success_evaluation',
+                'summary',
+                'recording_url',
+                'transcript'
+            )
+        }),
         ('VAPI Response', {
             'fields': ('vapi_response_display',),
             'classes': ('collapse',)
@@ -389,3 +419,113 @@ class CallHistoryAdmin(admin.ModelAdmin):
     # Disable add permission (calls are made via API)
     def has_add_permission(self, request):
         return False
+
+    # "Delete selected" - one tombstone insert + one version bump instead of per-row signals
+    def delete_queryset(self, request, queryset):
+        tombstones.delete(queryset, 'call')
+
+    # Custom actions
+    actions = ['cost_summary']
+
+    def cost_summary(self, request, queryset):
+        """Cost and outcome totals of the selected calls per day / type (computed in SQL)"""
+        totals = queryset.cost_summary()
+        self.message_user(
+            request,
+            f"💰 {totals['calls']} calls | Success: {totals['successful']} | Retry: {totals['needs_retry']} | "
+            f"Total Cost: ${totals['total_cost']:.4f}",
+            level='success'
+        )
+        for row in queryset.cost_breakdown(group_by=('day', 'order_type')):
+            self.message_user(
+                request,
+                f"{row['day']} {row['order_type']}: {row['calls']} calls | Success: {row['successful']} | "
+                f"Cost: ${row['total_cost']:.4f}"
+            )
+    cost_summary.short_description = '💰 Cost summary of selected calls'
+
+
+@admin.register(TrackingCacheStats)
+class TrackingCacheStatsAdmin(admin.ModelAdmin):
+    """Daily tracking cache hit/miss counters (read only)"""
+
+    list_display = [
+        'date',
+        'hits',
+        'misses',
+        'hit_rate_display',
+        'api_requests',
+        'api_requests_saved'
+    ]
+
+    def hit_rate_display(self, obj):
+        """Share of AWBs served from cache"""
+        total = obj.hits + obj.misses
+        if total:
+            return f"{obj.hits * 100 / total:.1f}%"
+        return '—'
+    hit_rate_display.short_description = 'Hit Rate'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    """Scheduled job run history - which node ran each slot (read only)"""
+
+    list_display = [
+        'name',
+        'scheduled_for',
+        'status',
+        'worker',
+        'attempts',
+        'started_at',
+        'finished_at'
+    ]
+    list_filter = ['name', 'status']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CallSession)
+class CallSessionAdmin(admin.ModelAdmin):
+    """Calling sessions with their saved progress (read only)"""
+
+    list_display = [
+        'id',
+        'started_at',
+        'status',
+        'stage',
+        'progress_display',
+        'worker',
+        'resumed',
+        'finished_at'
+    ]
+    list_filter = ['status']
+
+    def get_queryset(self, request):
+        # Item counts in the list query, not one progress query per row
+        return super().get_queryset(request).annotate(
+            total_items=Count('items'),
+            completed_items=Count('items', filter=Q(items__status__in=call_sessions.FINISHED)),
+            successful_items=Count('items', filter=Q(items__status='successful'))
+        )
+
+    def progress_display(self, obj):
+        """Calls done out of planned"""
+        return f"{obj.completed_items}/{obj.total_items} ({obj.successful_items} successful)"
+    progress_display.short_description = 'Progress'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
 
 
+def is_server_process(argv, environ):
+    """
+    True for a gunicorn worker or the runserver process that serves requests
+    (the auto-reloader's child, or runserver --noreload)
+    """
+    program = argv[0] if argv else ''
+    if 'gunicorn' in program:
+        return True
+    if len(argv) > 1 and argv[1] == 'runserver':
+        return environ.get('RUN_MAIN') == 'true' or '--noreload' in argv
+    return False
+
+
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
@@ -9,15 +22,12 @@ class OrdersConfig(AppConfig):
         """Start scheduler automatically when Django app starts"""
         import os
         import sys
-        import threading
 
-        # Prevent running during migrations or in secondary processes
-        if 'migrate' in sys.argv or 'makemigrations' in sys.argv:
-            return
+        from . import signals  # noqa: F401 (connects receivers)
 
-        # Start scheduler in production (gunicorn) and development
-        # Skip only in Django's auto-reloader process
-        if os.environ.get('RUN_MAIN') != 'false':
+        # Start scheduler in production (gunicorn) and development (runserver) only -
+        # test, check, shell, migrate, collectstatic etc. get no background threads
+        if is_server_process(sys.argv, os.environ):
             # Check database configuration
             def check_database_config():
                 from django.conf import settings
@@ -94,11 +104,24 @@ class OrdersConfig(AppConfig):
                 except Exception as e:
                     print(f"[STARTUP] ⚠️ Failed to create superuser: {e}")
 
-            # Start scheduler in background thread to avoid blocking startup
-            def start_scheduler_background():
-                from .scheduler import auto_call_scheduler
-                auto_call_scheduler.start_hourly_scheduler()
-                print("[STARTUP] ✅ Auto Call Scheduler started automatically!")
+            # Run scheduled jobs in this process - each job slot is claimed in the database,
+            # so with several workers only one of them runs it
+            # EMBEDDED_JOB_RUNNER=false: jobs run in a separate `python manage.py run_jobs` process
+            def start_job_runner():
+                from . import jobs
+                if os.environ.get('EMBEDDED_JOB_RUNNER', 'true').lower() == 'false':
+                    print("[STARTUP] ℹ️ Embedded job runner disabled (EMBEDDED_JOB_RUNNER=false)")
+                    return
+                if 'run_jobs' in sys.argv:
+                    return  # The command runs the loop itself
+                jobs.start_embedded()
+                print("[STARTUP] ✅ Job runner started (Auto Call Scheduler jobs)")
+
+            # Apply webhook events left in the queue before a restart (and new ones)
+            def start_webhook_consumer():
+                from . import webhook_queue
+                webhook_queue.start_consumer()
+                print("[STARTUP] ✅ Webhook consumer started!")
 
             # Check database configuration first
             check_database_config()
@@ -109,7 +132,7 @@ class OrdersConfig(AppConfig):
             # Create superuser (quick operation)
             create_superuser_if_needed()
 
-            # Run scheduler in daemon thread so it doesn't block gunicorn startup
-            scheduler_thread = threading.Thread(target=start_scheduler_background, daemon=True)
-            scheduler_thread.start()
-            print("[STARTUP] 🚀 Scheduler starting in background thread...")
+            start_webhook_consumer()
+
+            # Runner is a daemon thread so it doesn't block gunicorn startup
+            start_job_runner()
@@ -0,0 +1,32 @@
+from django.db import IntegrityError
+from django.db.models import F
+from .models import CacheVersion
+
+
+# Tables cached responses are built from
+ORDERS = 'orders'
+CALLS = 'calls'
+
+
+def current(*names):
+    """
+    Version string of the given tables for cache keys (one query)
+    Returns:
+        str: e.g. '12.40' for current(ORDERS, CALLS)
+    """
+    versions = dict(CacheVersion.objects.filter(name__in=names).values_list('name', 'version'))
+    return '.'.join(str(versions.get(name, 0)) for name in names)
+
+
+def bump(*names):
+    """Mark the given tables as changed - never raises (a failed bump must not fail the write)"""
+    for name in names:
+        try:
+            if not CacheVersion.objects.filter(name=name).update(version=F('version') + 1):
+                try:
+                    CacheVersion.objects.create(name=name, version=1)
+                except IntegrityError:
+                    # Created by another process in the meantime
+                    CacheVersion.objects.filter(name=name).update(version=F('version') + 1)
+        except Exception as e:
+            print(f"[CACHE] ⚠️ Could not bump {name} version: {e}")
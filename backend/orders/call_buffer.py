@@ -0,0 +1,107 @@
+import threading
+from django.db import connection
+from .constants import CALL_HISTORY_FLUSH_SIZE, CALL_HISTORY_FLUSH_SECONDS
+from .models import CallHistory, CallPayload
+from . import live_events, cache_versions, read_model
+
+
+class CallHistoryBuffer:
+    """
+    Collects CallHistory rows during a call session and writes them with bulk_create
+    Flushes every CALL_HISTORY_FLUSH_SIZE rows or CALL_HISTORY_FLUSH_SECONDS after the
+    first buffered row, whichever comes first. Always call flush() (or use it as a
+    context manager) when the session ends so nothing is left in memory.
+    Also hands out retry counts from one aggregate query instead of a count() per call.
+    Args:
+        awbs: AWBs that will be called this session (today's call counts are preloaded)
+    """
+
+    def __init__(self, awbs=(), flush_size=CALL_HISTORY_FLUSH_SIZE, flush_seconds=CALL_HISTORY_FLUSH_SECONDS):
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.saved = 0
+        self.failed = 0
+        self.failed_call_ids = []  # Calls placed but not saved
+
+        self._rows = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # One flush at a time keeps saved/failed counts exact
+        self._timer = None
+        self._call_counts = CallHistory.objects.today().call_counts_by_awb(list(awbs)) if awbs else {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def next_retry_count(self, awb):
+        """Calls already made to this AWB today (counts calls of this session too)"""
+        with self._lock:
+            count = self._call_counts.get(awb, 0)
+            self._call_counts[awb] = count + 1
+            return count
+
+    def add(self, call):
+        """Buffer an unsaved CallHistory instance"""
+        with self._lock:
+            self._rows.append(call)
+            full = len(self._rows) >= self.flush_size
+
+            # Time based flush so webhooks find the row even if the session slows down
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self.flush()
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Write buffered rows, returns number of rows saved"""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not rows:
+            return 0
+
+        with self._write_lock:
+            try:
+                CallHistory.objects.bulk_create(rows)
+                saved = len(rows)
+            except Exception as e:
+                # One bad row shouldn't lose the whole batch - save them one by one
+                print(f"[DB] ⚠️ Bulk insert of {len(rows)} call records failed ({e}), saving individually")
+                saved = 0
+                for call in rows:
+                    try:
+                        call.save()
+                        saved += 1
+                    except Exception as row_error:
+                        print(f"[DB ERROR] ❌ Could not save call {call.call_id} ({call.awb}): {row_error}")
+                        self.failed += 1
+                        self.failed_call_ids.append(call.call_id)
+            else:
+                # Raw VAPI responses go to the compressed side table
+                try:
+                    CallPayload.store_many(rows)
+                except Exception as e:
+                    print(f"[DB ERROR] ⚠️ Call records saved but VAPI payloads were not: {e}")
+
+            self.saved += saved
+
+        print(f"[DB] ✅ Saved {saved} call records")
+        if saved:
+            read_model.refresh_rows([call.awb for call in rows])
+            cache_versions.bump(cache_versions.CALLS)
+            live_events.publish('calls', {'inserted': saved})
+        return saved
@@ -0,0 +1,82 @@
+import re
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .constants import (
+    CALL_PRIORITY_OFD_POINTS,
+    CALL_PRIORITY_COD_POINTS_PER_1000,
+    CALL_PRIORITY_COD_MAX_POINTS,
+    CALL_PRIORITY_OUT_POINTS_PER_HOUR,
+    CALL_PRIORITY_OUT_MAX_POINTS,
+    CALL_PRIORITY_RETRY_PENALTY,
+    CALL_PRIORITY_IDLE_POINTS_PER_HOUR,
+    CALL_PRIORITY_IDLE_MAX_POINTS,
+)
+
+
+# Scan time keys seen in iThink last_scan / track_history entries
+SCAN_TIME_KEYS = ['status_date_time', 'scan_date_time', 'scan_datetime', 'date_time']
+
+
+def parse_amount(value):
+    """'1,500.00' / 1500 / 'N/A' -> 1500.0 / 1500.0 / 0.0"""
+    cleaned = re.sub(r'[^\d.]', '', str(value or ''))
+    try:
+        return float(cleaned) if cleaned else 0.0
+    except ValueError:
+        return 0.0
+
+
+def scan_time(last_scan):
+    """When the last scan happened (aware datetime) or None"""
+    if not isinstance(last_scan, dict):
+        return None
+    for key in SCAN_TIME_KEYS:
+        value = last_scan.get(key)
+        scanned_at = parse_datetime(str(value)) if value else None
+        if scanned_at:
+            return timezone.make_aware(scanned_at) if timezone.is_naive(scanned_at) else scanned_at
+    return None
+
+
+def _hours_since(moment, now):
+    return max(0.0, (now - moment).total_seconds() / 3600) if moment else 0.0
+
+
+def score(call, now=None):
+    """
+    Priority of a pending call - higher is dialed earlier
+    Args:
+        call: Pending call with order_type, cod_amount, retry_count and optionally
+              out_since (out for delivery scan / first seen) and last_attempt_at
+    Returns:
+        float: Score (OFD > COD value > time out for delivery, minus retries, plus idle time)
+    """
+    now = now or timezone.now()
+    points = CALL_PRIORITY_OFD_POINTS if call.get('order_type') == 'OFD' else 0
+
+    points += min(parse_amount(call.get('cod_amount')) / 1000 * CALL_PRIORITY_COD_POINTS_PER_1000,
+                  CALL_PRIORITY_COD_MAX_POINTS)
+    points += min(_hours_since(call.get('out_since'), now) * CALL_PRIORITY_OUT_POINTS_PER_HOUR,
+                  CALL_PRIORITY_OUT_MAX_POINTS)
+
+    retry_count = call.get('retry_count') or 0
+    points -= retry_count * CALL_PRIORITY_RETRY_PENALTY
+    if retry_count:
+        points += min(_hours_since(call.get('last_attempt_at'), now) * CALL_PRIORITY_IDLE_POINTS_PER_HOUR,
+                      CALL_PRIORITY_IDLE_MAX_POINTS)
+
+    return round(points, 2)
+
+
+def rank(pending_calls, now=None):
+    """
+    Sort pending calls by priority (adds 'priority', drops the datetime inputs so calls stay JSON-safe)
+    Returns:
+        list: Highest priority first (ties: AWB order, so the plan is stable)
+    """
+    now = now or timezone.now()
+    for call in pending_calls:
+        call['priority'] = score(call, now)
+        call.pop('out_since', None)
+        call.pop('last_attempt_at', None)
+    return sorted(pending_calls, key=lambda call: (-call['priority'], call['awb']))
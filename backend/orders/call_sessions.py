@@ -0,0 +1,222 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from .call_buffer import CallHistoryBuffer
+from .constants import CALL_SESSION_STALE_SECONDS, JOB_HEARTBEAT_SECONDS
+from .jobs import WORKER
+from .models import CallHistory, CallSession, CallSessionItem
+from . import live_events
+
+
+# Item statuses that count as done
+FINISHED = ['successful', 'failed', 'skipped', 'interrupted']
+
+
+def _today_start():
+    return timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+
+
+def start():
+    """
+    New running session
+    Returns:
+        CallSession or None: None if a session is already running (on any worker)
+    """
+    try:
+        with transaction.atomic():
+            return CallSession.objects.create(worker=WORKER)
+    except IntegrityError:
+        return None
+
+
+def take_over_stale():
+    """
+    Running session whose worker stopped (not touched for CALL_SESSION_STALE_SECONDS)
+    Returns:
+        CallSession or None: Today's session with a saved plan, now owned by this worker.
+                             Sessions that stopped before dialing or on another day are closed
+                             as failed instead (the caller plans a new one).
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=CALL_SESSION_STALE_SECONDS)
+    session = CallSession.objects.filter(status='running', updated_at__lt=cutoff).first()
+    if not session:
+        return None
+
+    stale = CallSession.objects.filter(id=session.id, status='running', updated_at__lt=cutoff)
+    if session.stage != 'calling' or session.started_at < _today_start():
+        stale.update(status='failed', error=f'Worker {session.worker} stopped - not resumed', finished_at=now)
+        print(f"[SESSION] ⚠️ Session #{session.id} stopped during {session.stage} - closed")
+        return None
+
+    # Conditional update - if two workers try, only one gets it
+    if not stale.update(worker=WORKER, resumed=F('resumed') + 1, updated_at=now):
+        return None
+
+    session.refresh_from_db()
+    return session
+
+
+@contextmanager
+def heartbeat(session):
+    """Touch the session every JOB_HEARTBEAT_SECONDS while the block runs, so no one takes it over"""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(JOB_HEARTBEAT_SECONDS):
+                CallSession.objects.filter(id=session.id, worker=WORKER).update(updated_at=timezone.now())
+        finally:
+            # Thread opened its own DB connection - don't leak it
+            connection.close()
+
+    threading.Thread(target=beat, name=f'session-{session.id}-heartbeat', daemon=True).start()
+    try:
+        yield session
+    finally:
+        stop.set()
+
+
+def set_stage(session, stage):
+    session.stage = stage
+    session.save(update_fields=['stage', 'updated_at'])
+
+
+def save_plan(session, pending_calls):
+    """Save the calls to make in dial order - from here on the session can be resumed"""
+    CallSessionItem.objects.bulk_create([
+        CallSessionItem(session=session, position=position, awb=call['awb'], call_data=call)
+        for position, call in enumerate(pending_calls)
+    ], batch_size=500)
+    session.calling_at = timezone.now()
+    session.stage = 'calling'
+    session.save(update_fields=['calling_at', 'stage', 'updated_at'])
+
+
+def pending_calls(session):
+    """Planned calls not made yet, in dial order (each with its 'session_item_id')"""
+    return [
+        {**call_data, 'session_item_id': item_id}
+        for item_id, call_data in session.items.filter(status='pending').order_by('position')
+                                              .values_list('id', 'call_data')
+    ]
+
+
+def mark(item_id, status, call_id=None):
+    """Checkpoint one call ('dialing' before the VAPI request, the outcome after it)"""
+    if not item_id:
+        return  # Call placed outside a session
+    fields = {'status': status, 'updated_at': timezone.now()}
+    if call_id:
+        fields['call_id'] = call_id
+    CallSessionItem.objects.filter(id=item_id).update(**fields)
+
+
+def mark_unsaved(call_ids):
+    """Placed calls whose CallHistory row couldn't be saved - failed, like the live counters say"""
+    if not call_ids:
+        return 0
+    return CallSessionItem.objects.filter(call_id__in=call_ids, status='successful').update(
+        status='failed', updated_at=timezone.now()
+    )
+
+
+def interrupt_in_flight(session):
+    """Calls being dialed when the worker stopped may have rung - marked so they are never dialed again"""
+    return session.items.filter(status='dialing').update(status='interrupted', updated_at=timezone.now())
+
+
+def recover_lost_calls(session):
+    """
+    Save CallHistory rows of calls placed before the worker stopped that were still buffered
+    (reconcile fills in their status/cost from VAPI)
+    Returns:
+        int: Rows recovered
+    """
+    placed = list(session.items.filter(status='successful', call_id__isnull=False))
+    if not placed:
+        return 0
+
+    saved = set(CallHistory.objects.filter(call_id__in=[item.call_id for item in placed])
+                .values_list('call_id', flat=True))
+    lost = [item for item in placed if item.call_id not in saved]
+    if not lost:
+        return 0
+
+    with CallHistoryBuffer(awbs=[item.awb for item in lost]) as buffer:
+        for item in lost:
+            buffer.add(CallHistory(
+                call_id=item.call_id,
+                awb=item.awb,
+                customer_name=item.call_data.get('customer_name', 'N/A'),
+                customer_phone=item.call_data.get('customer_mobile'),
+                order_type=item.call_data.get('order_type', 'OFD'),
+                status='queued',
+                retry_count=buffer.next_retry_count(item.awb)
+            ))
+    return buffer.saved
+
+
+def finish(session, status='done', error=None):
+    session.status = status
+    session.stage = 'done' if status == 'done' else session.stage
+    session.error = error
+    session.finished_at = timezone.now()
+    session.save(update_fields=['status', 'stage', 'error', 'finished_at', 'updated_at'])
+
+
+def latest_today():
+    return CallSession.objects.filter(started_at__gte=_today_start()).first()
+
+
+def progress(session):
+    """
+    Session progress from its saved items (the same on every worker)
+    Returns:
+        dict: live_session counters + stage, pending, interrupted and calls per minute
+    """
+    counts = dict(session.items.order_by().values_list('status').annotate(count=Count('id')))
+    completed = sum(counts.get(status, 0) for status in FINISHED)
+
+    calls_per_minute = 0
+    if session.calling_at and completed:
+        minutes = ((session.finished_at or timezone.now()) - session.calling_at).total_seconds() / 60
+        calls_per_minute = round(completed / max(minutes, 1 / 60), 1)
+
+    current = session.items.filter(status='dialing').order_by('-updated_at').values_list('call_data', flat=True).first()
+
+    return {
+        'session_id': session.id,
+        'is_calling': session.status == 'running',
+        'stage': session.stage,
+        'session_start': timezone.localtime(session.started_at).strftime('%H:%M:%S'),
+        'total_to_call': sum(counts.values()),
+        'completed': completed,
+        'successful': counts.get('successful', 0),
+        'failed': counts.get('failed', 0),
+        'skipped': counts.get('skipped', 0),
+        'interrupted': counts.get('interrupted', 0),
+        'pending': counts.get('pending', 0),
+        'calls_per_minute': calls_per_minute,
+        'resumed': session.resumed,
+        'current_order': {
+            'awb': current.get('awb'),
+            'customer_name': current.get('customer_name'),
+            'retry_count': current.get('retry_count', 0)
+        } if current else None,
+    }
+
+
+def live_session():
+    """
+    Today's session as the dashboard shows it (read from the database, so any worker can answer)
+    Returns:
+        dict or None: progress() + the last 20 logs, None if no session ran today
+    """
+    session = latest_today()
+    if not session:
+        return None
+    return {**progress(session), 'logs': live_events.recent('log', 20)}
@@ -1,13 +1,29 @@
 # API Configuration Constants
-BATCH_SIZE = 10  # Number of orders to process in one batch for tracking
+BATCH_SIZE = 10  # Number of orders to process in one batch for tracking (iThink API limit: max 10 AWBs per request)
+TRACK_MAX_WORKERS = 5  # Number of tracking batches sent to iThink at the same time
+ORDER_DETAILS_MAX_WORKERS = 3  # Day windows fetched at the same time (caps payloads held in memory)
+ORDER_DETAILS_RETRIES = 2  # Extra attempts for a day window that failed
+ORDER_DETAILS_QUEUE_SIZE = 200  # Decoded orders buffered between download threads and the caller
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read at a time when streaming iThink responses
 READY_TO_DISPATCH_DAYS = 5  # Days to look back for ready-to-dispatch orders
 IN_TRANSIT_DAYS = 10  # Days to look back for in-transit orders
 OFD_DAYS = 10  # Days to look back for OFD/Undelivered orders
 ESTIMATED_DELIVERY_DAYS = 3  # Estimated days for delivery after AWB creation
 
-# Cache Configuration
-CACHE_TIMEOUT_OFD = 300  # 5 minutes for OFD orders cache
-CACHE_TIMEOUT_CALL_HISTORY = 30  # 30 seconds for call history cache
+# Cache Configuration (keys are versioned - entries are replaced as soon as the data changes)
+CACHE_TIMEOUT_OFD = 6 * 3600  # 6 hours for OFD orders cache
+CACHE_TIMEOUT_CALL_HISTORY = 6 * 3600  # 6 hours for call history pages
+CACHE_REBUILD_LOCK_SECONDS = 120  # Max time one worker holds a rebuild lock (API fallback is slow)
+CACHE_REBUILD_WAIT_SECONDS = 20  # With nothing cached yet, others wait this long for the rebuild
+DASHBOARD_REFRESH_ENABLED = True  # Rebuild hot dashboard payloads in the background
+DASHBOARD_REFRESH_MINUTES = 1  # How often the scheduler checks them
+DASHBOARD_REFRESH_AHEAD_SECONDS = 300  # Rebuild this long before the cache entry expires
+DASHBOARD_HOT_SECONDS = 600  # Payloads requested this recently are kept warm
+
+# Tracking result cache (per AWB) - TTL depends on the tracked status
+TRACKING_CACHE_TTL_TERMINAL = 6 * 3600  # Delivered, RTO, cancelled... won't change anymore
+TRACKING_CACHE_TTL_OFD = 300  # Out for delivery / undelivered change within minutes
+TRACKING_CACHE_TTL_DEFAULT = 1800  # Manifested, in transit, etc.
 
 # Order Status Constants
 ORDER_STATUS_MANIFESTED = 'Manifested'
@@ -37,8 +53,76 @@ RETRY_REASONS = [
 ]
 
 # API Timeouts (in seconds)
-ITHINK_API_TIMEOUT = 60
-VAPI_API_TIMEOUT = 30
+ITHINK_API_TIMEOUT = 60  # Read timeout
+VAPI_API_TIMEOUT = 30  # Read timeout
+ITHINK_CONNECT_TIMEOUT = 10
+VAPI_CONNECT_TIMEOUT = 10
+
+# HTTP connection pooling / retries
+HTTP_POOL_MAXSIZE = 10  # Max open connections per host (keep >= TRACK_MAX_WORKERS)
+HTTP_MAX_RETRIES = 3  # Retries for connection errors and RETRY_STATUS_CODES
+HTTP_RETRY_BACKOFF = 0.5  # Backoff factor between retries (0.5s, 1s, 2s...)
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+# Outbound call dispatching (match the VAPI plan limits)
+VAPI_MAX_CONCURRENT_CALLS = 5  # Calls being placed at the same time
+VAPI_CALLS_PER_SECOND = 1  # New calls started per second
+CALL_HISTORY_FLUSH_SIZE = 10  # Call records buffered before a bulk insert
+CALL_HISTORY_FLUSH_SECONDS = 5  # Max time a call record waits in the buffer
+
+# VAPI webhook queue (see webhook_queue.py)
+WEBHOOK_BATCH_SIZE = 200  # Events applied per consumer pass
+WEBHOOK_POLL_SECONDS = 5  # Consumer wakes up at least this often
+WEBHOOK_MAX_WAIT_SECONDS = 120  # How long events of an unknown call_id are retried before being dropped
+WEBHOOK_CLAIM_STALE_SECONDS = 60  # Events claimed by a consumer that stopped are picked up again after this
+WEBHOOK_EVENT_RETENTION_DAYS = 2  # Processed events kept for debugging
+
+# Call status reconciliation (VAPI list endpoint, 100 calls per page)
+RECONCILE_MAX_PAGES = 20  # Max list requests per run
+RECONCILE_INTERVAL_MINUTES = 5  # Scheduler runs reconciliation this often
+
+# Live session events (long-poll)
+SESSION_EVENT_BUFFER = 500  # Events kept for clients to resume from
+LONG_POLL_MAX_SECONDS = 20  # Max wait of a long-poll request (stay under gunicorn's timeout)
+LONG_POLL_CHECK_SECONDS = 1  # How often a waiting long-poll checks for new events
+LONG_POLL_MAX_WAITERS = 2  # Long-polls waiting at once per worker process (others return right away)
+
+# Call history list (keyset pagination)
+CALL_HISTORY_PAGE_SIZE = 100  # Calls per page when no limit is given
+CALL_HISTORY_MAX_PAGE_SIZE = 500  # Largest limit a client can ask for
+
+# OFD orders delta mode (?since=<cursor>)
+DELTA_OVERLAP_SECONDS = 5  # Re-send rows changed this long before the cursor (writes committing late)
+TOMBSTONE_RETENTION_HOURS = 48  # Deleted rows remembered - older cursors get a full resync
+
+# OFD fallback sync (database empty - orders fetched from iThink in the background)
+OFD_FALLBACK_DAYS = 5  # Days of orders fetched
+OFD_SYNC_TRACK_CHUNK = 100  # AWBs tracked (10 Track API batches) and saved per step
+SYNC_JOB_STALE_SECONDS = 300  # A running job without progress this long is treated as dead
+SYNC_JOB_COOLDOWN_SECONDS = 600  # After a sync finished (done or failed), an empty list is shown instead of syncing again
+
+# Job runner (scheduled jobs are claimed in the database - each slot runs on one node only)
+JOB_POLL_SECONDS = 30  # How often the runner looks for due jobs
+JOB_MISFIRE_GRACE_MINUTES = 15  # A daily job this late (runner was down) still runs, later it is skipped
+JOB_HEARTBEAT_SECONDS = 30  # Running jobs touch their row this often
+JOB_STALE_SECONDS = 180  # Running job without heartbeat this long - its worker died
+JOB_MAX_ATTEMPTS = 2  # Runs of a daily slot whose worker died (taken over by another node)
+JOB_HISTORY_DAYS = 7  # Job run and call session history kept
+JOB_INTERVAL_HISTORY_HOURS = 24  # Successful runs of interval jobs kept (one row per slot)
+
+# Call sessions (plan and per-call status saved as they go)
+CALL_SESSION_STALE_SECONDS = 180  # Running session not touched this long - its worker stopped, next run resumes it
+CALL_SESSION_MAX_CALLS = None  # Optional cap on calls per session - only the highest priority ones are dialed
+
+# Call priority (pending calls are dialed highest score first - see call_priority.py)
+CALL_PRIORITY_OFD_POINTS = 100  # OFD ahead of Undelivered (more than all other points together)
+CALL_PRIORITY_COD_POINTS_PER_1000 = 10  # COD value - cash collection needs the customer at the door
+CALL_PRIORITY_COD_MAX_POINTS = 30
+CALL_PRIORITY_OUT_POINTS_PER_HOUR = 4  # Hours since the out for delivery scan - courier closer to giving up
+CALL_PRIORITY_OUT_MAX_POINTS = 20
+CALL_PRIORITY_RETRY_PENALTY = 15  # Per earlier attempt today - repeat no-answers convert less
+CALL_PRIORITY_IDLE_POINTS_PER_HOUR = 5  # Hours since the last attempt - long gaps are worth a retry
+CALL_PRIORITY_IDLE_MAX_POINTS = 15
 
 # Phone number validation
 MIN_PHONE_NUMBER_LENGTH = 10
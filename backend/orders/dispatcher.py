@@ -0,0 +1,69 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.db import connection
+from .constants import VAPI_MAX_CONCURRENT_CALLS, VAPI_CALLS_PER_SECOND
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket - acquire() blocks until a token is available
+    Args:
+        rate: Tokens added per second
+        capacity: Max burst size (defaults to 1, i.e. evenly spaced calls)
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def dispatch_calls(items, place_call, max_concurrent=VAPI_MAX_CONCURRENT_CALLS,
+                   calls_per_second=VAPI_CALLS_PER_SECOND, should_dial=None):
+    """
+    Run place_call(item) for every item on a thread pool, rate limited by a token bucket
+    Args:
+        items: Call payloads (e.g. pending calls from get_pending_calls())
+        place_call: Function doing one call, its return value is collected
+        max_concurrent: Max calls being placed at the same time
+        calls_per_second: Max new calls started per second (VAPI plan limit)
+        should_dial: Optional check run before taking a token - items it rejects
+                     are passed to place_call without waiting for the rate limit
+    Returns:
+        list: place_call results in completion order
+    """
+    bucket = TokenBucket(calls_per_second)
+
+    def worker(item):
+        try:
+            if should_dial is None or should_dial(item):
+                bucket.acquire()
+            return place_call(item)
+        finally:
+            # Worker threads open their own DB connection - don't leak it
+            connection.close()
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as executor:
+        futures = [executor.submit(worker, item) for item in items]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    return results
@@ -0,0 +1,93 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .constants import (
+    HTTP_POOL_MAXSIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF,
+    RETRY_STATUS_CODES,
+)
+
+
+# Long-lived sessions shared by all threads of this process (one per API)
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _build_session(retry_methods):
+    """
+    Create a requests session with a keep-alive connection pool and retry adapter
+    Args:
+        retry_methods: HTTP methods that are safe to retry on 429/5xx
+    """
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(retry_methods),
+        respect_retry_after_header=True,
+        raise_on_status=False  # Return the last response, callers check status codes
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,  # Number of hosts kept in the pool cache
+        pool_maxsize=HTTP_POOL_MAXSIZE,  # Connections kept alive per host
+        pool_block=True,  # Never open more than HTTP_POOL_MAXSIZE connections per host
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _get_session(name, retry_methods):
+    session = _sessions.get(name)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _build_session(retry_methods)
+                _sessions[name] = session
+    return session
+
+
+def get_ithink_session():
+    """
+    Pooled session for iThink API
+    iThink endpoints are read-only queries sent as POST, so POST is retried too
+    """
+    return _get_session('ithink', ['GET', 'POST'])
+
+
+def get_vapi_session():
+    """
+    Pooled session for VAPI API
+    Only GET is retried - retrying POST /call/phone could dial the customer twice
+    """
+    return _get_session('vapi', ['GET'])
+
+
+def get_connection_stats():
+    """
+    Connection pool counters per API and host
+    Returns:
+        dict: {api: {host: {'requests', 'new_connections', 'reused_connections'}}}
+    """
+    stats = {}
+    for name, session in list(_sessions.items()):
+        adapter = session.get_adapter('https://')
+        pools = adapter.poolmanager.pools
+        hosts = {}
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[pool.host] = {
+                'requests': pool.num_requests,
+                'new_connections': pool.num_connections,
+                'reused_connections': max(pool.num_requests - pool.num_connections, 0)
+            }
+        stats[name] = hosts
+    return stats
@@ -0,0 +1,348 @@
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, time as dt_time, timedelta
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .constants import (
+    JOB_POLL_SECONDS,
+    JOB_MISFIRE_GRACE_MINUTES,
+    JOB_HEARTBEAT_SECONDS,
+    JOB_STALE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_HISTORY_DAYS,
+    JOB_INTERVAL_HISTORY_HOURS,
+)
+from .models import JobRun, ScheduledJob
+
+
+# Scheduled jobs run by whichever node claims the slot first: a JobRun row per (job, slot) -
+# the unique constraint makes the claim, so a 10:30 call session runs once even with
+# several gunicorn workers (or servers) running the runner.
+WORKER = f"{socket.gethostname()}:{os.getpid()}"
+
+# name -> {'func', 'times', 'every_minutes', 'long_running'} (registered in scheduler.py)
+_jobs = {}
+
+_stop = threading.Event()
+_thread = None
+
+# Long-running jobs started by this process: name -> thread
+_job_threads = {}
+
+
+def register(name, func, times=None, every_minutes=None, long_running=False):
+    """
+    Add a scheduled job
+    Args:
+        times: Default daily "HH:MM" slots (local time) - can be replaced with set_times()
+        every_minutes: Interval job instead (slots aligned to the clock)
+        long_running: Run on its own thread (e.g. a call session), so the runner keeps
+                      starting the short interval jobs on time meanwhile
+    """
+    _jobs[name] = {'func': func, 'times': list(times or []), 'every_minutes': every_minutes,
+                   'long_running': long_running}
+
+
+def parse_time(hhmm):
+    """'HH:MM' -> time (ValueError if invalid)"""
+    hours, minutes = str(hhmm).split(':')
+    return dt_time(int(hours), int(minutes))
+
+
+def _states():
+    """ScheduledJob rows of the registered jobs (created on first use)"""
+    states = {job.name: job for job in ScheduledJob.objects.filter(name__in=_jobs)}
+    missing = [ScheduledJob(name=name) for name in _jobs if name not in states]
+    if missing:
+        ScheduledJob.objects.bulk_create(missing, ignore_conflicts=True)
+        states.update({job.name: job for job in missing})
+    return states
+
+
+def job_times(name, state=None):
+    """Daily times of a job (override from the database, else the registered ones)"""
+    if state is not None and state.times:
+        return state.times
+    return _jobs[name]['times']
+
+
+def set_enabled(enabled, names=None):
+    """Enable/disable jobs for all nodes (all registered jobs by default)"""
+    _states()
+    ScheduledJob.objects.filter(name__in=names or list(_jobs)).update(enabled=enabled, updated_at=timezone.now())
+
+
+def set_times(name, times):
+    """Replace the daily times of a job (None = back to the registered ones)"""
+    if times is not None:
+        times = [parse_time(hhmm).strftime('%H:%M') for hhmm in times]
+    _states()
+    ScheduledJob.objects.filter(name=name).update(times=times, updated_at=timezone.now())
+
+
+def get_cursor(name):
+    """Saved progress of an incremental job (same on every node and after restarts), None if none yet"""
+    return ScheduledJob.objects.filter(name=name).values_list('cursor', flat=True).first()
+
+
+def advance_cursor(name, cursor):
+    """Save progress of an incremental job - only moves forward, so an older concurrent pass can't undo it"""
+    ScheduledJob.objects.bulk_create([ScheduledJob(name=name)], ignore_conflicts=True)
+    ScheduledJob.objects.filter(name=name).filter(
+        Q(cursor__isnull=True) | Q(cursor__lt=cursor)
+    ).update(cursor=cursor, updated_at=timezone.now())
+
+
+def _slot_time(day, hhmm):
+    return timezone.make_aware(datetime.combine(day, parse_time(hhmm)))
+
+
+def due_slot(name, state, now):
+    """
+    Latest slot of a job that should run now
+    Returns:
+        datetime or None: None if no slot is due (daily slots older than the grace time are skipped)
+    """
+    every_minutes = _jobs[name]['every_minutes']
+    if every_minutes:
+        step = every_minutes * 60
+        return datetime.fromtimestamp(int(now.timestamp()) // step * step, tz=now.tzinfo)
+
+    grace = timedelta(minutes=JOB_MISFIRE_GRACE_MINUTES)
+    due = None
+    for day in (now.date() - timedelta(days=1), now.date()):
+        for hhmm in job_times(name, state):
+            slot = _slot_time(day, hhmm)
+            if slot <= now < slot + grace and (due is None or slot > due):
+                due = slot
+    return due
+
+
+def next_run(name, state, now):
+    """Next slot of a job after now"""
+    every_minutes = _jobs[name]['every_minutes']
+    if every_minutes:
+        step = every_minutes * 60
+        return datetime.fromtimestamp((int(now.timestamp()) // step + 1) * step, tz=now.tzinfo)
+
+    slots = [
+        _slot_time(day, hhmm)
+        for day in (now.date(), now.date() + timedelta(days=1))
+        for hhmm in job_times(name, state)
+    ]
+    upcoming = [slot for slot in slots if slot > now]
+    return min(upcoming) if upcoming else None
+
+
+def _claim(name, slot):
+    """JobRun for the slot if this node got it, None if another node did"""
+    try:
+        with transaction.atomic():
+            return JobRun.objects.create(name=name, scheduled_for=slot, worker=WORKER)
+    except IntegrityError:
+        return None
+
+
+def _execute(run):
+    """Run a claimed job, touching its row every JOB_HEARTBEAT_SECONDS so other nodes know it's alive"""
+    stop_heartbeat = threading.Event()
+
+    def heartbeat():
+        try:
+            while not stop_heartbeat.wait(JOB_HEARTBEAT_SECONDS):
+                JobRun.objects.filter(id=run.id, worker=WORKER).update(heartbeat_at=timezone.now())
+        finally:
+            # Thread opened its own DB connection - don't leak it
+            connection.close()
+
+    threading.Thread(target=heartbeat, name=f'heartbeat-{run.name}', daemon=True).start()
+
+    print(f"[JOBS] ▶️ {run.name} (slot {timezone.localtime(run.scheduled_for):%H:%M}) on {WORKER}")
+    try:
+        _jobs[run.name]['func']()
+        run.status = 'done'
+    except Exception as e:
+        print(f"[JOBS] ❌ {run.name} failed: {e}")
+        run.status = 'failed'
+        run.error = traceback.format_exc()
+    finally:
+        stop_heartbeat.set()
+        run.finished_at = timezone.now()
+        run.heartbeat_at = run.finished_at
+        run.save(update_fields=['status', 'error', 'finished_at', 'heartbeat_at'])
+
+    return run
+
+
+def _busy(name):
+    """True if a long-running job is still running on this node (its next slot waits for it)"""
+    thread = _job_threads.get(name)
+    return bool(thread and thread.is_alive())
+
+
+def _start(run, inline=False):
+    """Run a claimed job - long-running ones on their own thread unless inline"""
+    if inline or not _jobs[run.name]['long_running']:
+        _execute(run)
+        return
+
+    def target():
+        try:
+            _execute(run)
+        finally:
+            # Thread opened its own DB connection - don't leak it
+            connection.close()
+
+    thread = threading.Thread(target=target, name=f'job-{run.name}', daemon=True)
+    _job_threads[run.name] = thread
+    thread.start()
+
+
+def _requeue_stale(inline=False):
+    """
+    Runs whose worker stopped heartbeating (restart/crash) - taken over by this node with a
+    conditional update (only one node wins), or marked failed once retrying is pointless
+    Returns:
+        list: Names of the jobs run again
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=JOB_STALE_SECONDS)
+    grace = timedelta(minutes=JOB_MISFIRE_GRACE_MINUTES)
+    rerun = []
+
+    for run in JobRun.objects.filter(status='running', heartbeat_at__lt=cutoff):
+        stale = JobRun.objects.filter(id=run.id, status='running', heartbeat_at__lt=cutoff)
+
+        if run.name in _jobs and run.attempts < JOB_MAX_ATTEMPTS and now < run.scheduled_for + grace:
+            if _busy(run.name):
+                continue
+            if stale.update(worker=WORKER, attempts=F('attempts') + 1, heartbeat_at=now):
+                run.refresh_from_db()
+                print(f"[JOBS] ⚠️ {run.name} stopped on another worker - running it again here "
+                      f"(attempt {run.attempts})")
+                _start(run, inline)
+                rerun.append(run.name)
+        else:
+            stale.update(status='failed', error='Worker stopped (no heartbeat)', finished_at=now)
+            print(f"[JOBS] ⚠️ {run.name} (slot {timezone.localtime(run.scheduled_for):%H:%M}) "
+                  f"stopped on {run.worker} - marked failed")
+
+    return rerun
+
+
+def run_pending(inline=False):
+    """
+    Claim and run the due jobs - interval jobs on this thread, long-running ones on their own
+    Args:
+        inline: Run every job on this thread and wait for it (run_jobs --once)
+    Returns:
+        list: Names of the jobs this node ran or started
+    """
+    ran = _requeue_stale(inline)
+
+    states = _states()
+    now = timezone.localtime()
+    for name in _jobs:
+        state = states[name]
+        if not state.enabled or _busy(name):
+            continue
+
+        slot = due_slot(name, state, now)
+        if slot is None:
+            continue
+
+        run = _claim(name, slot)
+        if run:
+            _start(run, inline)
+            ran.append(name)
+
+    return ran
+
+
+def prune_history():
+    """
+    Drop finished JobRun rows - interval jobs add one per slot, so their successful runs
+    are kept JOB_INTERVAL_HISTORY_HOURS, everything else JOB_HISTORY_DAYS
+    Returns:
+        int: Rows deleted
+    """
+    now = timezone.now()
+    interval_jobs = [name for name, job in _jobs.items() if job['every_minutes']]
+    deleted = JobRun.objects.filter(
+        name__in=interval_jobs, status='done',
+        scheduled_for__lt=now - timedelta(hours=JOB_INTERVAL_HISTORY_HOURS)
+    ).delete()[0]
+    deleted += JobRun.objects.filter(
+        scheduled_for__lt=now - timedelta(days=JOB_HISTORY_DAYS)
+    ).exclude(status='running').delete()[0]
+    return deleted
+
+
+def run_forever(stop_event=None):
+    """Runner loop (embedded thread or the run_jobs command)"""
+    from . import scheduler  # noqa: F401 (registers the jobs)
+
+    stop_event = stop_event or _stop
+    print(f"[JOBS] Job runner started on {WORKER} ({len(_jobs)} jobs, checking every {JOB_POLL_SECONDS}s)")
+
+    while not stop_event.is_set():
+        # Long-lived thread - drop connections the database closed meanwhile
+        close_old_connections()
+        try:
+            run_pending()
+        except Exception as e:
+            print(f"[JOBS] ⚠️ Job runner error: {e}")
+        stop_event.wait(JOB_POLL_SECONDS)
+
+    connection.close()
+    print(f"[JOBS] Job runner stopped on {WORKER}")
+
+
+def start_embedded():
+    """Run jobs in a daemon thread of this process (every worker may do this - claims keep runs unique)"""
+    global _thread
+    if _thread and _thread.is_alive():
+        return False
+
+    _stop.clear()
+    _thread = threading.Thread(target=run_forever, name='job-runner', daemon=True)
+    _thread.start()
+    return True
+
+
+def runner_alive():
+    return bool(_thread and _thread.is_alive())
+
+
+def status():
+    """
+    Scheduled jobs with their next run and latest run
+    Returns:
+        list: One dict per job
+    """
+    states = _states()
+    now = timezone.localtime()
+    result = []
+    for name, job in _jobs.items():
+        state = states[name]
+        # (name, scheduled_for) unique index - one index lookup per job
+        run = JobRun.objects.filter(name=name).order_by('-scheduled_for').first()
+        upcoming = next_run(name, state, now) if state.enabled else None
+        result.append({
+            'name': name,
+            'enabled': state.enabled,
+            'times': job_times(name, state),
+            'every_minutes': job['every_minutes'],
+            'next_run': timezone.localtime(upcoming).strftime('%Y-%m-%d %H:%M:%S') if upcoming else None,
+            'last_run': {
+                'scheduled_for': run.scheduled_for,
+                'status': run.status,
+                'worker': run.worker,
+                'attempts': run.attempts,
+                'finished_at': run.finished_at,
+            } if run else None,
+        })
+    return result
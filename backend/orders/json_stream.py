@@ -0,0 +1,123 @@
+import codecs
+import json
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+class _StreamBuffer:
+    """Text buffer over a byte chunk iterator, only keeps the unparsed tail in memory"""
+
+    def __init__(self, chunks, encoding='utf-8'):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk, returns False when nothing more could be read"""
+        if self.eof:
+            return False
+
+        # Drop everything already parsed
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+        for chunk in self._chunks:
+            if chunk:
+                text = self._text_decoder.decode(chunk)
+                if text:
+                    self.text += text
+                    return True
+
+        self.eof = True
+        tail = self._text_decoder.decode(b'', final=True)
+        self.text += tail
+        return bool(tail)
+
+    def peek(self):
+        """Next non-whitespace character (None at end of stream)"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid JSON stream: expected '{char}', found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # A number/literal that ends exactly at the buffer end may continue in the next chunk
+            if end == len(self.text) and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+
+def iter_object_items(chunks, key, meta=None):
+    """
+    Stream the members of one top-level JSON object, one (name, value) pair at a time
+    Only the member being decoded is held in memory, not the whole document.
+    Args:
+        chunks: Iterable of bytes (e.g. response.iter_content())
+        key: Top-level key of the object to stream (e.g. 'data')
+        meta: Optional dict filled with the other top-level members (e.g. 'status')
+    Yields:
+        tuple: (name, value) for each member of document[key]
+    """
+    if meta is None:
+        meta = {}
+
+    buffer = _StreamBuffer(chunks)
+    buffer.expect('{')
+    if buffer.peek() == '}':
+        return
+
+    while True:
+        name = buffer.value()
+        buffer.expect(':')
+
+        if name == key and buffer.peek() == '{':
+            buffer.pos += 1
+            if buffer.peek() == '}':
+                buffer.pos += 1
+            else:
+                while True:
+                    item_name = buffer.value()
+                    buffer.expect(':')
+                    yield item_name, buffer.value()
+
+                    separator = buffer.peek()
+                    buffer.pos += 1
+                    if separator == '}':
+                        break
+                    if separator != ',':
+                        raise ValueError(f"Invalid JSON stream: unexpected {separator!r} in '{key}'")
+        else:
+            meta[name] = buffer.value()
+
+        separator = buffer.peek()
+        buffer.pos += 1
+        if separator == '}':
+            return
+        if separator != ',':
+            raise ValueError(f"Invalid JSON stream: unexpected {separator!r}")
@@ -0,0 +1,60 @@
+import itertools
+import time
+from .constants import SESSION_EVENT_BUFFER, LONG_POLL_CHECK_SECONDS
+from .models import SessionEvent
+
+
+# Prune the buffer every N published events (not on every insert)
+PRUNE_EVERY = 50
+_published = itertools.count(1)
+
+
+def publish(kind, data):
+    """
+    Add an event for live dashboards - never raises (a missed event must not break a call session)
+    Args:
+        kind: 'log' (add_log entry), 'session' (counters) or 'calls' (call history changed)
+        data: JSON-serializable payload
+    """
+    try:
+        event = SessionEvent.objects.create(kind=kind, data=data)
+        if next(_published) % PRUNE_EVERY == 0:
+            SessionEvent.objects.filter(id__lte=event.id - SESSION_EVENT_BUFFER).delete()
+    except Exception as e:
+        print(f"[EVENTS] ⚠️ Could not publish {kind} event: {e}")
+
+
+def latest_id():
+    return SessionEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def can_resume(last_id):
+    """True if every event after last_id is still in the buffer"""
+    oldest = SessionEvent.objects.order_by('id').values_list('id', flat=True).first()
+    return oldest is None or last_id + 1 >= oldest
+
+
+def events_after(last_id, limit=SESSION_EVENT_BUFFER):
+    """Events with id > last_id, oldest first"""
+    return list(SessionEvent.objects.filter(id__gt=last_id).order_by('id')[:limit])
+
+
+def wait_for_events(last_id, timeout):
+    """Block until events after last_id exist or timeout passes, returns the events (maybe empty)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        events = events_after(last_id)
+        if events or time.monotonic() >= deadline:
+            return events
+        time.sleep(min(LONG_POLL_CHECK_SECONDS, max(0, deadline - time.monotonic())))
+
+
+def recent(kind, limit):
+    """Payloads of the latest events of a kind, oldest first"""
+    data = SessionEvent.objects.filter(kind=kind).order_by('-id').values_list('data', flat=True)[:limit]
+    return list(reversed(data))
+
+
+def serialize(event):
+    return {'id': event.id, 'kind': event.kind, 'data': event.data, 'time': event.created_at.isoformat()}
+
@@ -0,0 +1,105 @@
+"""
+Django management command to benchmark the pending-calls planner
+Runs AutoCallScheduler.get_pending_calls() against a throwaway test database
+filled with synthetic OFD/Undelivered orders and call history.
+Usage: python manage.py benchmark_pending_calls --sizes 1000 10000 100000
+"""
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models.functions import Mod
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from orders import read_model, tombstones
+from orders.models import CallHistory, Order
+from orders.scheduler import AutoCallScheduler
+
+
+class Command(BaseCommand):
+    help = 'Benchmark get_pending_calls() query count and latency on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+                            help='Number of OFD/Undelivered orders per run')
+        parser.add_argument('--runs', type=int, default=3, help='Timed runs per size (best is reported)')
+        parser.add_argument('--call-ratio', type=float, default=0.4,
+                            help='Share of orders that already have call history today')
+
+    def handle(self, *args, **options):
+        # Never touch the real database - work on a temporary test database
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write("\n" + "="*70)
+            self.stdout.write("PENDING CALLS PLANNER BENCHMARK")
+            self.stdout.write("="*70)
+            self.stdout.write(f"{'Orders':>10} {'Calls':>10} {'Pending':>10} {'Queries':>8} {'Best ms':>10}")
+
+            for size in options['sizes']:
+                self.populate(size, options['call_ratio'])
+                calls = CallHistory.objects.count()
+
+                scheduler = AutoCallScheduler()
+                timings = []
+                for _ in range(options['runs']):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        pending = scheduler.get_pending_calls()
+                        timings.append((time.perf_counter() - started) * 1000)
+
+                self.stdout.write(
+                    f"{size:>10} {calls:>10} {len(pending):>10} {len(queries):>8} {min(timings):>10.1f}"
+                )
+
+            self.stdout.write("="*70 + "\n")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def populate(self, size, call_ratio):
+        """Fresh synthetic orders + today's call history (not called / retry / success mix)"""
+        with read_model.batch():
+            tombstones.delete(CallHistory.objects.all(), 'call')
+            tombstones.delete(Order.objects.all(), 'order')
+
+        rng = random.Random(size)
+        Order.objects.bulk_create([
+            Order(
+                awb=f'BENCH{i:07d}',
+                order_type='OFD' if i % 3 else 'Undelivered',
+                customer_name=f'Customer {i}',
+                customer_mobile=f'9{i:09d}',
+                customer_address='Benchmark address',
+                customer_pincode='560001',
+                cod_amount=str(rng.randint(100, 5000)),
+                current_status='out for delivery'
+            )
+            for i in range(size)
+        ], batch_size=2000)
+
+        calls = []
+        for i in rng.sample(range(size), int(size * call_ratio)):
+            outcome = rng.random()
+            calls.append(CallHistory(
+                call_id=f'bench-call-{i}',
+                awb=f'BENCH{i:07d}',
+                customer_name=f'Customer {i}',
+                customer_phone=f'9{i:09d}',
+                order_type='OFD',
+                status='ended',
+                ended_reason='customer-busy' if outcome < 0.6 else 'customer-ended-call',
+                is_successful=outcome >= 0.6,
+                needs_retry=outcome < 0.6,
+                retry_count=rng.randint(0, 3)
+            ))
+        CallHistory.objects.bulk_create(calls, batch_size=2000)
+
+        # auto_now_add overrides created_at - spread call times over today afterwards
+        # (some inside the 2-hour cooldown, some earlier)
+        now = timezone.localtime()
+        minutes_today = now.hour * 60 + now.minute
+        buckets = 8
+        for bucket in range(buckets):
+            CallHistory.objects.annotate(bucket=Mod('id', buckets)).filter(bucket=bucket).update(
+                created_at=now - timedelta(minutes=minutes_today * bucket // buckets)
+            )
@@ -82,21 +82,17 @@ class Command(BaseCommand):
                 self.stdout.write(f"   Success: {latest_call.is_successful}")
                 self.stdout.write(f"   Created: {latest_call.created_at}")
 
-                # Count by status
-                from django.db.models import Count
-                status_counts = CallHistory.objects.values('ended_reason').annotate(count=Count('id'))
-
+                # Count and cost by ended reason
                 self.stdout.write("\n📈 Calls by Ended Reason:")
-                for item in status_counts:
+                for item in CallHistory.objects.cost_breakdown(group_by=('ended_reason',)):
                     reason = item['ended_reason'] or 'Pending'
-                    count = item['count']
-                    self.stdout.write(f"   {reason}: {count}")
+                    self.stdout.write(f"   {reason}: {item['calls']} (cost ${item['total_cost']:.4f})")
 
                 # Today's calls
-                from datetime import datetime, time
-                today_start = datetime.combine(datetime.now().date(), time.min)
-                today_calls = CallHistory.objects.filter(created_at__gte=today_start).count()
-                self.stdout.write(f"\n📅 Today's Calls: {today_calls}")
+                today = CallHistory.objects.today().cost_summary()
+                self.stdout.write(f"\n📅 Today's Calls: {today['calls']}")
+                self.stdout.write(f"   Successful: {today['successful']}")
+                self.stdout.write(f"   Total Cost: ${today['total_cost']:.4f}")
 
             else:
                 self.stdout.write(self.style.WARNING("   ⚠️  No call records found in database"))
@@ -2,19 +2,22 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from orders.models import Order, CallHistory
+from orders import read_model, tombstones
 
 
 class Command(BaseCommand):
     help = 'Delete old orders and call history - Run daily in morning'
 
     def handle(self, *args, **kwargs):
-        # Delete ALL call history (fresh start every morning)
-        call_deleted = CallHistory.objects.all().delete()[0]
+        # One tombstone insert + one version bump per table, dashboard rows refreshed once at the end
+        with read_model.batch():
+            # Delete ALL call history (fresh start every morning)
+            call_deleted = tombstones.delete(CallHistory.objects.all(), 'call')
 
-        # Delete all OFD/Undelivered orders to force fresh sync
-        order_deleted = Order.objects.filter(
-            order_type__in=['OFD', 'Undelivered']
-        ).delete()[0]
+            # Delete all OFD/Undelivered orders to force fresh sync
+            order_deleted = tombstones.delete(Order.objects.filter(
+                order_type__in=['OFD', 'Undelivered']
+            ), 'order')
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from orders import cache_versions, read_model
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed OFD dashboard rows from orders and call history'
+
+    def handle(self, *args, **kwargs):
+        written = read_model.rebuild_all()
+        cache_versions.bump(cache_versions.ORDERS)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} OFD dashboard rows'))
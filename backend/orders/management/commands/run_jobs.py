@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from orders import jobs
+
+
+class Command(BaseCommand):
+    help = ('Run the scheduled jobs (syncs, call sessions, cleanup, reconcile) as a separate process - '
+            'set EMBEDDED_JOB_RUNNER=false on the web service then')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the jobs due now and exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            from orders import scheduler  # noqa: F401 (registers the jobs)
+            ran = jobs.run_pending(inline=True)
+            self.stdout.write(self.style.SUCCESS(f"Ran {len(ran)} jobs: {', '.join(ran) or '-'}"))
+            return
+
+        try:
+            jobs.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Job runner stopped')
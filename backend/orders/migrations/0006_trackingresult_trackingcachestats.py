@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_remove_callhistory_recording_url_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackingCacheStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('hits', models.IntegerField(default=0)),
+                ('misses', models.IntegerField(default=0)),
+                ('api_requests', models.IntegerField(default=0)),
+                ('api_requests_saved', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Tracking Cache Stats',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TrackingResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('awb', models.CharField(max_length=100, unique=True)),
+                ('current_status', models.CharField(blank=True, max_length=100, null=True)),
+                ('data', models.JSONField()),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_trackingresult_trackingcachestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='source_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
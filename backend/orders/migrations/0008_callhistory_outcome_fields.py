@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:08
+
+from django.db import migrations, models
+
+OUTCOME_FIELDS = ['success_evaluation', 'summary', 'recording_url', 'transcript']
+
+
+def extract_vapi_fields(vapi_response):
+    """Copy of CallHistory.extract_vapi_fields as of this migration (the model may change later)"""
+    fields = {'success_evaluation': None, 'summary': None, 'recording_url': None, 'transcript': None}
+    if not vapi_response or not isinstance(vapi_response, dict):
+        return fields
+
+    analysis = vapi_response.get('analysis') or {}
+    if isinstance(analysis, dict):
+        success_eval = analysis.get('successEvaluation')
+        if success_eval is not None:
+            fields['success_evaluation'] = str(success_eval).lower()[:50]
+        fields['summary'] = analysis.get('summary')
+
+    # Recording URL (multiple possible locations)
+    artifact = vapi_response.get('artifact') or {}
+    recording = artifact.get('recording') if isinstance(artifact.get('recording'), dict) else {}
+    fields['recording_url'] = (
+        vapi_response.get('recordingUrl') or
+        vapi_response.get('stereoRecordingUrl') or
+        artifact.get('recordingUrl') or
+        artifact.get('stereoRecordingUrl') or
+        recording.get('combinedUrl') or
+        (recording.get('mono') or {}).get('combinedUrl')
+    )
+
+    fields['transcript'] = vapi_response.get('transcript') or artifact.get('transcript')
+    return fields
+
+
+def backfill_outcome_fields(apps, schema_editor):
+    """Fill the new columns from the stored vapi_response of existing calls"""
+    CallHistory = apps.get_model('orders', 'CallHistory')
+
+    batch = []
+    for call in CallHistory.objects.filter(vapi_response__isnull=False).only('id', 'vapi_response').iterator(chunk_size=500):
+        for field, value in extract_vapi_fields(call.vapi_response).items():
+            setattr(call, field, value)
+        batch.append(call)
+
+        if len(batch) >= 500:
+            CallHistory.objects.bulk_update(batch, OUTCOME_FIELDS)
+            batch = []
+
+    if batch:
+        CallHistory.objects.bulk_update(batch, OUTCOME_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_order_source_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callhistory',
+            name='recording_url',
+            field=models.URLField(blank=True, max_length=1000, null=True),
+        ),
+        migrations.AddField(
+            model_name='callhistory',
+            name='success_evaluation',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='callhistory',
+            name='summary',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callhistory',
+            name='transcript',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_outcome_fields, migrations.RunPython.noop),
+    ]
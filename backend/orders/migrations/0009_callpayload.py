@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:10
+
+import json
+import zlib
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def move_payloads(apps, schema_editor):
+    """Copy vapi_response JSON into compressed CallPayload rows"""
+    CallHistory = apps.get_model('orders', 'CallHistory')
+    CallPayload = apps.get_model('orders', 'CallPayload')
+
+    batch = []
+    for call_id, vapi_response in CallHistory.objects.filter(
+        vapi_response__isnull=False
+    ).values_list('id', 'vapi_response').iterator(chunk_size=500):
+        data = zlib.compress(json.dumps(vapi_response, separators=(',', ':'), default=str).encode('utf-8'))
+        batch.append(CallPayload(call_id=call_id, data=data))
+
+        if len(batch) >= 500:
+            CallPayload.objects.bulk_create(batch)
+            batch = []
+
+    if batch:
+        CallPayload.objects.bulk_create(batch)
+
+
+def restore_payloads(apps, schema_editor):
+    CallHistory = apps.get_model('orders', 'CallHistory')
+    CallPayload = apps.get_model('orders', 'CallPayload')
+
+    for payload in CallPayload.objects.iterator(chunk_size=500):
+        vapi_response = json.loads(zlib.decompress(payload.data).decode('utf-8'))
+        CallHistory.objects.filter(id=payload.call_id).update(vapi_response=vapi_response)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_callhistory_outcome_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallPayload',
+            fields=[
+                ('call', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='orders.callhistory')),
+                ('data', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(move_payloads, restore_payloads),
+        migrations.RemoveField(
+            model_name='callhistory',
+            name='vapi_response',
+        ),
+    ]
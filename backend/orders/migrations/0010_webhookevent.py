@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_callpayload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dedupe_key', models.CharField(max_length=64, unique=True)),
+                ('call_id', models.CharField(db_index=True, max_length=255)),
+                ('message_type', models.CharField(max_length=50)),
+                ('call_data', models.JSONField()),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
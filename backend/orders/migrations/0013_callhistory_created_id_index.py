@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0012_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='callhistory',
+            index=models.Index(fields=['-created_at', '-id'], name='orders_call_created_bee3c2_idx'),
+        ),
+    ]
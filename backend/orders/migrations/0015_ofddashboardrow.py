@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:25
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0014_cacheversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OFDDashboardRow',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_row', serialize=False, to='orders.order')),
+                ('order_type', models.CharField(max_length=50)),
+                ('order_updated_at', models.DateTimeField()),
+                ('order_data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('call_history', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-order_updated_at'],
+                'indexes': [models.Index(fields=['-order_updated_at'], name='orders_ofdd_order_u_e80745_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0017_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('stage', models.CharField(default='syncing', max_length=20)),
+                ('worker', models.CharField(max_length=100)),
+                ('resumed', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('calling_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CallSessionItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField()),
+                ('awb', models.CharField(max_length=100)),
+                ('call_data', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('dialing', 'Dialing'), ('successful', 'Successful'), ('failed', 'Failed'), ('skipped', 'Skipped'), ('interrupted', 'Interrupted')], default='pending', max_length=20)),
+                ('call_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.callsession')),
+            ],
+            options={
+                'ordering': ['session', 'position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='callsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'running')), fields=('status',), name='one_running_call_session'),
+        ),
+        migrations.AddIndex(
+            model_name='callsessionitem',
+            index=models.Index(fields=['session', 'status'], name='orders_call_session_a1ca8a_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='callsessionitem',
+            constraint=models.UniqueConstraint(fields=('session', 'awb'), name='one_item_per_session_awb'),
+        ),
+    ]
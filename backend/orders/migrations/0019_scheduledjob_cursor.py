@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0018_callsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduledjob',
+            name='cursor',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:30
+
+from django.db import migrations
+
+
+CALL_TEXT_FIELDS = ['summary', 'transcript']
+
+
+def strip_call_text(apps, schema_editor):
+    """Drop summary/transcript from the saved call_history blocks (loaded per call now)"""
+    OFDDashboardRow = apps.get_model('orders', 'OFDDashboardRow')
+
+    batch = []
+    for row in OFDDashboardRow.objects.only('order_id', 'call_history').iterator(chunk_size=500):
+        if any(field in (row.call_history or {}) for field in CALL_TEXT_FIELDS):
+            for field in CALL_TEXT_FIELDS:
+                row.call_history.pop(field, None)
+            batch.append(row)
+
+        if len(batch) >= 500:
+            OFDDashboardRow.objects.bulk_update(batch, ['call_history'])
+            batch = []
+
+    if batch:
+        OFDDashboardRow.objects.bulk_update(batch, ['call_history'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0020_webhookevent_claim'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_call_text, migrations.RunPython.noop),
+    ]
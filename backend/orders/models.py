@@ -1,6 +1,14 @@
 
+import hashlib
+import json
+import zlib
+from datetime import datetime, time as dt_time
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 
 class Order(models.Model):
@@ -26,6 +34,9 @@ class Order(models.Model):
     # Last scan information (JSON)
     last_scan = models.JSONField(null=True, blank=True)
 
+    # Hash of the iThink record at last sync (used to skip unchanged orders)
+    source_hash = models.CharField(max_length=64, null=True, blank=True)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -44,6 +55,67 @@ class Order(models.Model):
     def __str__(self):
         return f"{self.awb} - {self.order_type}"
 
+    @staticmethod
+    def compute_source_hash(order_data, order_type):
+        """Content hash of an iThink order record + the order type derived from it"""
+        content = json.dumps([order_type, order_data], sort_keys=True, default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class CallHistoryQuerySet(models.QuerySet):
+
+    def today(self):
+        """Calls created since local (TIME_ZONE) midnight"""
+        return self.filter(created_at__gte=timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min)))
+
+    def call_counts_by_awb(self, awbs=None):
+        """
+        Number of calls per AWB in one aggregate query
+        Args:
+            awbs: Optional list of AWBs to restrict the count to
+        Returns:
+            dict: {awb: call_count} (AWBs without calls are missing)
+        """
+        queryset = self if awbs is None else self.filter(awb__in=awbs)
+        return dict(
+            queryset.order_by().values('awb').annotate(call_count=Count('id')).values_list('awb', 'call_count')
+        )
+
+    @staticmethod
+    def _outcome_aggregates():
+        return {
+            'calls': Count('id'),
+            'successful': Count('id', filter=Q(is_successful=True)),
+            'needs_retry': Count('id', filter=Q(needs_retry=True)),
+            'total_cost': Coalesce(Sum('cost'), 0.0),
+            'total_duration': Coalesce(Sum('duration'), 0),
+            'avg_duration': Avg('duration'),
+        }
+
+    def cost_summary(self):
+        """
+        Totals computed by the database (no rows loaded)
+        Returns:
+            dict: calls, successful, needs_retry, total_cost, total_duration, avg_duration
+        """
+        return self.order_by().aggregate(**self._outcome_aggregates())
+
+    def cost_breakdown(self, group_by=('day', 'order_type', 'ended_reason')):
+        """
+        Same totals as cost_summary() grouped by day / order_type / ended_reason
+        Args:
+            group_by: Any of 'day', 'order_type', 'ended_reason'
+        Returns:
+            list: One dict per group (group keys + totals), newest day first
+        """
+        queryset = self.order_by()
+        if 'day' in group_by:
+            queryset = queryset.annotate(day=TruncDate('created_at'))
+
+        rows = queryset.values(*group_by).annotate(**self._outcome_aggregates())
+        ordering = ['-day' if field == 'day' else field for field in group_by]
+        return list(rows.order_by(*ordering))
+
 
 class CallHistory(models.Model):
     """Model to store VAPI call history"""
@@ -76,8 +148,18 @@ class CallHistory(models.Model):
     call_started_at = models.DateTimeField(null=True, blank=True)
     call_ended_at = models.DateTimeField(null=True, blank=True)
 
-    # Full VAPI response (JSON)
-    vapi_response = models.JSONField(null=True, blank=True)
+    # Call outcome extracted from vapi_response when it's written (see set_vapi_response)
+    success_evaluation = models.CharField(max_length=50, null=True, blank=True)  # 'true', 'false' or rubric value
+    summary = models.TextField(null=True, blank=True)
+    recording_url = models.URLField(max_length=1000, null=True, blank=True)
+    transcript = models.TextField(null=True, blank=True)
+
+    # Full VAPI response lives compressed in CallPayload (see vapi_response property)
+    _vapi_response = None
+    _vapi_response_loaded = False
+    _vapi_response_dirty = False
+
+    objects = CallHistoryQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
@@ -86,22 +168,125 @@ class CallHistory(models.Model):
         indexes = [
             models.Index(fields=['awb', '-created_at']),
             models.Index(fields=['customer_phone', '-created_at']),
+            models.Index(fields=['-created_at', '-id']),  # Call history pages (keyset)
         ]
 
     def __str__(self):
         return f"{self.awb} - {self.customer_phone} ({self.status})"
 
+    @staticmethod
+    def extract_vapi_fields(vapi_response):
+        """
+        Pull the outcome fields out of a VAPI call object
+        Returns:
+            dict: success_evaluation, summary, recording_url, transcript (None when missing)
+        """
+        fields = {'success_evaluation': None, 'summary': None, 'recording_url': None, 'transcript': None}
+        if not vapi_response or not isinstance(vapi_response, dict):
+            return fields
+
+        analysis = vapi_response.get('analysis') or {}
+        if isinstance(analysis, dict):
+            success_eval = analysis.get('successEvaluation')
+            if success_eval is not None:
+                fields['success_evaluation'] = str(success_eval).lower()[:50]
+            fields['summary'] = analysis.get('summary')
+
+        # Recording URL (multiple possible locations)
+        artifact = vapi_response.get('artifact') or {}
+        recording = artifact.get('recording') if isinstance(artifact.get('recording'), dict) else {}
+        fields['recording_url'] = (
+            vapi_response.get('recordingUrl') or
+            vapi_response.get('stereoRecordingUrl') or
+            artifact.get('recordingUrl') or
+            artifact.get('stereoRecordingUrl') or
+            recording.get('combinedUrl') or
+            (recording.get('mono') or {}).get('combinedUrl')
+        )
+
+        fields['transcript'] = vapi_response.get('transcript') or artifact.get('transcript')
+        return fields
+
+    @property
+    def vapi_response(self):
+        """Full VAPI call object, loaded from CallPayload on first access"""
+        if not self._vapi_response_loaded:
+            self._vapi_response_loaded = True
+            if self.pk:
+                try:
+                    self._vapi_response = self.payload.unpack()
+                except CallPayload.DoesNotExist:
+                    self._vapi_response = None
+        return self._vapi_response
+
+    @vapi_response.setter
+    def vapi_response(self, value):
+        self._vapi_response = value
+        self._vapi_response_loaded = True
+        self._vapi_response_dirty = True
+
+    def save(self, *args, **kwargs):
+        # vapi_response isn't a column - accept it in update_fields and store the payload instead
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'vapi_response' in update_fields:
+            kwargs['update_fields'] = [field for field in update_fields if field != 'vapi_response']
+
+        super().save(*args, **kwargs)
+
+        if self._vapi_response_dirty:
+            CallPayload.store_many([self])
+
+    def set_vapi_response(self, vapi_response):
+        """Store the VAPI call object and copy its outcome fields into their own columns"""
+        self.vapi_response = vapi_response
+        for field, value in self.extract_vapi_fields(vapi_response).items():
+            setattr(self, field, value)
+
+    def apply_vapi_call(self, call_data):
+        """
+        Copy a VAPI call object (webhook / GET /call) onto this row
+        Values missing from call_data keep their current value, so replaying the same
+        or an older partial update changes nothing.
+        Returns:
+            list: Changed field names, ready for save(update_fields=...) (empty if nothing changed)
+        """
+        values = {
+            'status': call_data.get('status') or self.status,
+            'duration': call_data.get('duration', self.duration),
+            'cost': call_data.get('cost', self.cost),
+            'ended_reason': call_data.get('endedReason') or self.ended_reason,
+        }
+        if call_data.get('startedAt'):
+            values['call_started_at'] = parse_datetime(call_data['startedAt'])
+        if call_data.get('endedAt'):
+            values['call_ended_at'] = parse_datetime(call_data['endedAt'])
+        for field, value in self.extract_vapi_fields(call_data).items():
+            if value is not None:
+                values[field] = value
+
+        changed = [field for field, value in values.items() if getattr(self, field) != value]
+        if not changed:
+            return []
+
+        for field in changed:
+            setattr(self, field, values[field])
+        self.vapi_response = call_data
+        return changed + ['vapi_response', 'updated_at']
+
+    @property
+    def success_evaluation_label(self):
+        """success_evaluation as shown on the dashboard ('pass' / 'fail' / rubric value)"""
+        if self.success_evaluation is None:
+            return None
+        return {'true': 'pass', 'false': 'fail'}.get(self.success_evaluation, self.success_evaluation)
+
     def update_retry_status(self):
         """Update retry flags based on call outcome"""
         # Check if call was successful
-        if self.vapi_response and isinstance(self.vapi_response, dict):
-            analysis = self.vapi_response.get('analysis', {})
-            if analysis:
-                success_eval = analysis.get('successEvaluation')
-                if success_eval is True or str(success_eval).lower() == 'true':
-                    self.is_successful = True
-                    self.needs_retry = False
-                    return
+        if self.success_evaluation == 'true':
+            self.is_successful = True
+            self.needs_retry = False
+            return
 
         # Check if needs retry based on ended_reason
         retry_reasons = ['busy', 'no-answer', 'voicemail', 'assistant-error', 'pipeline-error-openai-voice-failed']
@@ -110,3 +295,316 @@ class CallHistory(models.Model):
             self.is_successful = False
         else:
             self.needs_retry = False
+
+
+class CallPayload(models.Model):
+    """Raw VAPI call object of a CallHistory row, zlib compressed JSON (kept out of the hot table)"""
+
+    call = models.OneToOneField(CallHistory, on_delete=models.CASCADE, primary_key=True, related_name='payload')
+    data = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Payload of {self.call_id}"
+
+    @staticmethod
+    def pack(vapi_response):
+        return zlib.compress(json.dumps(vapi_response, separators=(',', ':'), default=str).encode('utf-8'))
+
+    def unpack(self):
+        return json.loads(zlib.decompress(self.data).decode('utf-8'))
+
+    @classmethod
+    def store_many(cls, calls):
+        """
+        Upsert the pending vapi_response of saved CallHistory rows in one query
+        (rows whose payload was set to None get it deleted)
+        """
+        calls = [call for call in calls if call.pk and call._vapi_response_dirty]
+        payloads = [
+            cls(call_id=call.pk, data=cls.pack(call._vapi_response))
+            for call in calls if call._vapi_response is not None
+        ]
+        empty = [call.pk for call in calls if call._vapi_response is None]
+
+        if payloads:
+            cls.objects.bulk_create(
+                payloads,
+                update_conflicts=True,
+                unique_fields=['call'],
+                update_fields=['data', 'updated_at']
+            )
+        if empty:
+            cls.objects.filter(call_id__in=empty).delete()
+
+        for call in calls:
+            call._vapi_response_dirty = False
+
+
+class WebhookEvent(models.Model):
+    """VAPI webhook delivery, stored first and applied to CallHistory in the background"""
+
+    dedupe_key = models.CharField(max_length=64, unique=True)  # sha256 of the delivery (retries collapse)
+    call_id = models.CharField(max_length=255, db_index=True)
+    message_type = models.CharField(max_length=50)  # status-update / end-of-call-report
+    call_data = models.JSONField()  # VAPI call object of the message
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    attempts = models.IntegerField(default=0)  # Consumer passes that couldn't find the call yet
+    last_error = models.CharField(max_length=255, null=True, blank=True)
+
+    # Consumer applying it right now (every worker runs one - the claim makes each event apply once)
+    claimed_by = models.CharField(max_length=255, null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.message_type} - {self.call_id}"
+
+
+class SessionEvent(models.Model):
+    """Live scheduler event (log line / counters / call changes) - id is the sequence number clients resume from"""
+
+    kind = models.CharField(max_length=20)  # log, session, calls
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.kind}"
+
+
+class Tombstone(models.Model):
+    """Deleted Order / CallHistory row, tells delta clients (OFDOrdersView ?since=) what to refresh or drop"""
+
+    kind = models.CharField(max_length=20)  # order, call
+    awb = models.CharField(max_length=100)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.awb} deleted {self.deleted_at}"
+
+
+class OFDDashboardRow(models.Model):
+    """
+    Precomputed OFD list entry of an active (OFD/Undelivered) order - order fields + latest call summary
+    Kept up to date by read_model.refresh_rows(), so OFDOrdersView only scans this table.
+    """
+
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, primary_key=True, related_name='dashboard_row')
+    order_type = models.CharField(max_length=50)
+    order_updated_at = models.DateTimeField()  # List order (same as Order: most recently updated first)
+    order_data = models.JSONField(encoder=DjangoJSONEncoder)  # read_model.order_to_dict()
+    call_history = models.JSONField(encoder=DjangoJSONEncoder)  # Latest call + call count block
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-order_updated_at']
+        indexes = [
+            models.Index(fields=['-order_updated_at']),  # OFD list scan
+        ]
+
+    def __str__(self):
+        return f"{self.order_id} - {self.order_type}"
+
+
+class SyncJob(models.Model):
+    """Background iThink sync (OFD fallback when the database is empty) with its progress"""
+
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)  # ofd_fallback
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    stage = models.CharField(max_length=50, default='starting')  # fetching_orders, tracking, done
+
+    # Progress
+    orders_fetched = models.IntegerField(default=0)  # Orders downloaded from Order Details API
+    awbs_total = models.IntegerField(default=0)  # AWBs to track
+    awbs_tracked = models.IntegerField(default=0)
+    orders_saved = models.IntegerField(default=0)  # OFD/Undelivered orders written so far
+    error = models.TextField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Heartbeat - a running job not updated for long is dead
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # One running sync per kind, whichever worker starts it
+            models.UniqueConstraint(fields=['kind'], condition=Q(status='running'), name='one_running_sync_job'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} - {self.status} ({self.stage})"
+
+    def progress(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'orders_fetched': self.orders_fetched,
+            'awbs_total': self.awbs_total,
+            'awbs_tracked': self.awbs_tracked,
+            'orders_saved': self.orders_saved,
+            'error': self.error,
+            'started_at': self.created_at,
+        }
+
+
+class ScheduledJob(models.Model):
+    """Scheduled job fired by the job runner (shared by all workers - start/stop changes it here)"""
+    name = models.CharField(max_length=50, primary_key=True)  # jobs.register() name
+    enabled = models.BooleanField(default=True)
+    times = models.JSONField(null=True, blank=True)  # Daily "HH:MM" replacing the registered ones (None = default)
+    cursor = models.DateTimeField(null=True, blank=True)  # Incremental job progress (reconcile watermark)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}{'' if self.enabled else ' (disabled)'}"
+
+
+class JobRun(models.Model):
+    """One run of a scheduled job - the row is the claim, so each slot runs on one node only"""
+
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=50)
+    scheduled_for = models.DateTimeField()  # Slot (e.g. today 10:30) - unique per job
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    worker = models.CharField(max_length=100)  # host:pid that claimed it
+    attempts = models.IntegerField(default=1)  # >1 when taken over from a dead worker
+    started_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(default=timezone.now)  # Touched while running
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-scheduled_for']
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'scheduled_for'], name='one_run_per_job_slot'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'heartbeat_at']),  # Stale run check
+        ]
+
+    def __str__(self):
+        return f"{self.name} @ {self.scheduled_for} - {self.status}"
+
+
+class CallSession(models.Model):
+    """Calling session - its plan and every call's status are saved as it goes, so it can be resumed"""
+
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    stage = models.CharField(max_length=20, default='syncing')  # syncing, planning, calling, done
+    worker = models.CharField(max_length=100)  # host:pid running it
+    resumed = models.IntegerField(default=0)  # Times picked up after its worker stopped
+    error = models.TextField(null=True, blank=True)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    calling_at = models.DateTimeField(null=True, blank=True)  # Plan saved, dialing started (throughput)
+    updated_at = models.DateTimeField(auto_now=True)  # Heartbeat - touched while the session runs
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        constraints = [
+            # One calling session at a time, whichever worker starts it
+            models.UniqueConstraint(fields=['status'], condition=Q(status='running'), name='one_running_call_session'),
+        ]
+
+    def __str__(self):
+        return f"Session #{self.id} - {self.status} ({self.stage})"
+
+
+class CallSessionItem(models.Model):
+    """One planned call of a session"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('dialing', 'Dialing'),  # VAPI request in flight
+        ('successful', 'Successful'),
+        ('failed', 'Failed'),
+        ('skipped', 'Skipped'),
+        ('interrupted', 'Interrupted'),  # Worker stopped while dialing - may have rung, never re-dialed
+    ]
+
+    session = models.ForeignKey(CallSession, on_delete=models.CASCADE, related_name='items')
+    position = models.IntegerField()  # Dial order
+    awb = models.CharField(max_length=100)
+    call_data = models.JSONField()  # Pending call as planned - resuming dials this without re-planning
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    call_id = models.CharField(max_length=255, null=True, blank=True)  # VAPI call placed for it
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['session', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'awb'], name='one_item_per_session_awb'),
+        ]
+        indexes = [
+            models.Index(fields=['session', 'status']),  # Progress counts, pending items
+        ]
+
+    def __str__(self):
+        return f"{self.awb} - {self.status}"
+
+
+class CacheVersion(models.Model):
+    """Change counter of a table - part of the cache keys, so every process sees an invalidation"""
+
+    name = models.CharField(max_length=50, primary_key=True)  # orders, calls
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class TrackingResult(models.Model):
+    """Cached iThink tracking result per AWB (used by IThinkService.track_orders)"""
+
+    awb = models.CharField(max_length=100, unique=True)
+    current_status = models.CharField(max_length=100, null=True, blank=True)
+    data = models.JSONField()  # Tracking info for this AWB as returned by Track API
+
+    fetched_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.awb} - {self.current_status}"
+
+
+class TrackingCacheStats(models.Model):
+    """Daily hit/miss counters of the tracking result cache"""
+
+    date = models.DateField(unique=True)
+    hits = models.IntegerField(default=0)  # AWBs served from cache
+    misses = models.IntegerField(default=0)  # AWBs sent to Track API
+    api_requests = models.IntegerField(default=0)  # Track API requests made
+    api_requests_saved = models.IntegerField(default=0)  # Track API requests avoided by cache hits
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'Tracking Cache Stats'
+
+    def __str__(self):
+        return f"{self.date} - {self.hits} hits / {self.misses} misses"
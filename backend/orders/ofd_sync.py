@@ -0,0 +1,222 @@
+import threading
+from datetime import datetime, timedelta
+from django.db import IntegrityError, connection
+from django.utils import timezone
+from .constants import OFD_FALLBACK_DAYS, OFD_SYNC_TRACK_CHUNK, SYNC_JOB_COOLDOWN_SECONDS, SYNC_JOB_STALE_SECONDS
+from .models import Order, SyncJob
+from .services import IThinkService
+from . import cache_versions, read_model
+
+
+KIND = 'ofd_fallback'
+
+
+def active_job():
+    """Running fallback sync (None if there is none or it died without finishing)"""
+    job = SyncJob.objects.filter(kind=KIND, status='running').first()
+    if job and timezone.now() - job.updated_at > timedelta(seconds=SYNC_JOB_STALE_SECONDS):
+        # Worker restarted mid-sync - free the slot so a new job can start
+        SyncJob.objects.filter(id=job.id, status='running').update(
+            status='failed', error='No progress - worker stopped', finished_at=timezone.now()
+        )
+        return None
+    return job
+
+
+def recently_finished():
+    """
+    Last sync if it finished (done or failed) less than SYNC_JOB_COOLDOWN_SECONDS ago
+    - an empty database right after a sync means there are no orders, not that we should sync again
+    """
+    last = SyncJob.objects.filter(kind=KIND).exclude(status='running').order_by('-created_at').first()
+    if last and last.finished_at and \
+            timezone.now() - last.finished_at < timedelta(seconds=SYNC_JOB_COOLDOWN_SECONDS):
+        return last
+    return None
+
+
+def enqueue():
+    """
+    Start the fallback sync in the background unless one is running already (in any worker)
+    Returns:
+        SyncJob: The running job (or the last one if it finished recently - not run again straight away)
+    """
+    job = active_job()
+    if job:
+        return job
+
+    last = recently_finished()
+    if last:
+        return last
+
+    try:
+        job = SyncJob.objects.create(kind=KIND)
+    except IntegrityError:
+        # Another worker started it at the same moment
+        return active_job()
+
+    print(f"[OFD SYNC] Started background sync job #{job.id}")
+    threading.Thread(target=_run_in_thread, args=(job.id,), name=f'ofd-sync-{job.id}', daemon=True).start()
+    return job
+
+
+def _run_in_thread(job_id):
+    try:
+        run(SyncJob.objects.get(id=job_id))
+    except Exception as e:
+        print(f"[OFD SYNC] ❌ Job #{job_id} failed: {e}")
+        SyncJob.objects.filter(id=job_id).update(status='failed', error=str(e), finished_at=timezone.now())
+    finally:
+        # Thread opened its own DB connection - don't leak it
+        connection.close()
+
+
+def _save_progress(job, **fields):
+    for field, value in fields.items():
+        setattr(job, field, value)
+    job.save(update_fields=list(fields) + ['updated_at'])
+
+
+def run(job):
+    """
+    Fetch the last OFD_FALLBACK_DAYS days of orders, track them and save OFD/Undelivered ones
+    Orders are saved after every OFD_SYNC_TRACK_CHUNK tracked AWBs, so the OFD list fills up
+    while the job runs.
+    """
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=OFD_FALLBACK_DAYS)).strftime('%Y-%m-%d')
+    print(f"[OFD SYNC] Fetching orders from {start_date} to {end_date}")
+    _save_progress(job, stage='fetching_orders')
+
+    # Collect all AWBs while the orders stream in
+    all_orders = []
+    report = {}
+    for record in IThinkService.iter_orders_by_date_range(start_date, end_date, report=report):
+        all_orders.append({
+            'awb': record['awb'],
+            'customer_name': record['customer_name'],
+            'customer_mobile': record['customer_mobile'],
+            'customer_address': record['customer_address'],
+            'customer_pincode': record['customer_pincode'],
+            'cod_amount': record['cod_amount'],
+            'weight': record['weight'],
+            'order_date': record['order_date'],
+            'tracking_url': record['tracking_url']
+        })
+        if len(all_orders) % 500 == 0:
+            _save_progress(job, orders_fetched=len(all_orders))
+
+    orders_error = IThinkService.date_range_error(report)
+    if orders_error:
+        error_msg = f"Failed to fetch orders from iThink API: {orders_error.get('error')}"
+        print(f"[OFD SYNC] ❌ {error_msg}")
+        _save_progress(job, status='failed', stage='fetching_orders', error=error_msg, finished_at=timezone.now())
+        cache_versions.bump(cache_versions.ORDERS)
+        return job
+
+    print(f"[OFD SYNC] Found {len(all_orders)} total orders in date range")
+    _save_progress(job, stage='tracking', orders_fetched=len(all_orders), awbs_total=len(all_orders))
+
+    saved = 0
+    for start in range(0, len(all_orders), OFD_SYNC_TRACK_CHUNK):
+        chunk = all_orders[start:start + OFD_SYNC_TRACK_CHUNK]
+        saved += _track_and_save(chunk)
+        _save_progress(job, awbs_tracked=start + len(chunk), orders_saved=saved)
+
+    print(f"[OFD SYNC] ✅ Job #{job.id} done: {saved} OFD/Undelivered orders saved")
+    _save_progress(job, status='done', stage='done', finished_at=timezone.now())
+    # The OFD list carries the sync state - make cached copies rebuild
+    cache_versions.bump(cache_versions.ORDERS)
+    return job
+
+
+def _track_and_save(orders):
+    """Track one chunk of orders (concurrent batches inside the service) and save the OFD/Undelivered ones"""
+    track_result = IThinkService.track_orders([order['awb'] for order in orders])
+    if track_result.get('status') != 'success' or 'data' not in track_result:
+        print(f"[OFD SYNC] Tracking failed: {track_result.get('error', 'Unknown error')} "
+              f"(status code {track_result.get('status_code', 'N/A')})")
+        return 0
+
+    tracking_data = track_result['data']
+    for failed_batch in track_result.get('failed_batches', []):
+        print(f"[OFD SYNC] Tracking batch failed ({len(failed_batch['awbs'])} AWBs): {failed_batch['error']}")
+
+    ofd_undelivered_orders = []
+    for order in orders:
+        track_info = tracking_data.get(order['awb'])
+        if not track_info:
+            continue
+        current_status = track_info.get('current_status', '').lower()
+
+        # Skip RTO orders
+        if 'rto' in current_status:
+            continue
+
+        # Check if OFD or Undelivered (but not RTO)
+        if 'out for delivery' in current_status:
+            order_type = 'OFD'
+        elif 'undelivered' in current_status:
+            order_type = 'Undelivered'
+        else:
+            continue
+
+        order['current_status'] = track_info.get('current_status')
+        order['last_scan'] = track_info.get('last_scan_details', {})
+        order['order_type'] = order_type
+        ofd_undelivered_orders.append(order)
+
+    if not ofd_undelivered_orders:
+        return 0
+
+    # Bulk save/update in one query each
+    existing_orders = {
+        order.awb: order
+        for order in Order.objects.filter(awb__in=[order['awb'] for order in ofd_undelivered_orders])
+    }
+
+    now = timezone.now()
+    orders_to_create = []
+    orders_to_update = []
+
+    for order in ofd_undelivered_orders:
+        awb = order['awb']
+        order_type = order['order_type']
+        current_status = order.get('current_status', 'N/A')
+
+        if awb in existing_orders:
+            # Update existing order if status changed
+            existing_order = existing_orders[awb]
+            if existing_order.order_type != order_type or existing_order.current_status != current_status:
+                existing_order.order_type = order_type
+                existing_order.current_status = current_status
+                existing_order.customer_mobile = order.get('customer_mobile', existing_order.customer_mobile)
+                existing_order.updated_at = now  # bulk_update skips auto_now - delta clients need it
+                orders_to_update.append(existing_order)
+        else:
+            orders_to_create.append(Order(
+                awb=awb,
+                order_type=order_type,
+                customer_name=order.get('customer_name', 'N/A'),
+                customer_mobile=order.get('customer_mobile', 'N/A'),
+                customer_address=order.get('customer_address', 'N/A'),
+                customer_pincode=order.get('customer_pincode', 'N/A'),
+                cod_amount=str(order.get('cod_amount', 'N/A')),
+                weight=str(order.get('weight', 'N/A')),
+                order_date=order.get('order_date', 'N/A'),
+                tracking_url=order.get('tracking_url', ''),
+                current_status=current_status,
+                last_scan=order.get('last_scan', {})
+            ))
+
+    if orders_to_create:
+        Order.objects.bulk_create(orders_to_create)
+    if orders_to_update:
+        Order.objects.bulk_update(orders_to_update, ['order_type', 'current_status', 'customer_mobile', 'updated_at'])
+
+    if orders_to_create or orders_to_update:
+        read_model.refresh_rows([order.awb for order in orders_to_create + orders_to_update])
+        cache_versions.bump(cache_versions.ORDERS)
+        print(f"[DB] Database sync: {len(orders_to_create)} new, {len(orders_to_update)} updated")
+
+    return len(ofd_undelivered_orders)
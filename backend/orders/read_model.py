@@ -0,0 +1,174 @@
+import threading
+from contextlib import contextmanager
+from django.utils.timezone import localtime
+from .models import CallHistory, OFDDashboardRow, Order
+
+
+OFD_ORDER_TYPES = ['OFD', 'Undelivered']
+
+# Long call texts - never read for lists, only for one call at a time
+CALL_TEXT_FIELDS = ['summary', 'transcript']
+
+
+def order_to_dict(db_order):
+    """OFD list entry of a saved Order (call_history is added by attach_call_history)"""
+    return {
+        'awb': db_order.awb,
+        'customer_name': db_order.customer_name,
+        'customer_mobile': db_order.customer_mobile,
+        'customer_address': db_order.customer_address,
+        'customer_pincode': db_order.customer_pincode,
+        'cod_amount': db_order.cod_amount,
+        'weight': db_order.weight,
+        'order_date': db_order.order_date,
+        'tracking_url': db_order.tracking_url,
+        'current_status': db_order.current_status,
+        'order_type': db_order.order_type,
+        'last_scan': db_order.last_scan or {}
+    }
+
+
+def attach_call_history(orders):
+    """
+    Add the call_history block (latest call + call count) to each order dict, one query for all
+    Summary/transcript text isn't part of it - the card loads it from CallDetailView when opened
+    """
+    all_awbs = [order['awb'] for order in orders]
+    all_call_histories = CallHistory.objects.filter(awb__in=all_awbs).defer(
+        *CALL_TEXT_FIELDS
+    ).order_by('awb', '-created_at')
+
+    # Group call histories by AWB
+    call_history_map = {}
+    for call in all_call_histories:
+        if call.awb not in call_history_map:
+            call_history_map[call.awb] = {'latest': call, 'count': 0}
+        call_history_map[call.awb]['count'] += 1
+
+    # Add call history for each order
+    for order in orders:
+        awb = order['awb']
+        call_data = call_history_map.get(awb)
+        call_history = call_data['latest'] if call_data else None
+        call_count = call_data['count'] if call_data else 0
+
+        if call_history:
+            # Format last call time
+            last_call_time = localtime(call_history.created_at).strftime('%b %d, %I:%M %p') if call_history.created_at else None
+
+            order['call_history'] = {
+                'has_been_called': True,
+                'call_count': call_count,
+                'last_call_time': last_call_time,
+                'call_id': call_history.call_id,
+                'status': call_history.status,
+                'duration': call_history.duration,
+                'cost': call_history.cost,
+                'ended_reason': call_history.ended_reason,
+                'success_evaluation': call_history.success_evaluation_label,
+                'recording_url': call_history.recording_url,
+                'call_started_at': call_history.call_started_at,
+                'call_ended_at': call_history.call_ended_at,
+                'retry_count': call_history.retry_count,
+                'is_successful': call_history.is_successful,
+                'needs_retry': call_history.needs_retry,
+                'created_at': call_history.created_at
+            }
+        else:
+            order['call_history'] = {
+                'has_been_called': False,
+                'call_count': 0,
+                'last_call_time': None,
+                'call_id': None,
+                'status': None,
+                'duration': None,
+                'cost': 0.0,
+                'ended_reason': None,
+                'success_evaluation': None,
+                'recording_url': None,
+                'call_started_at': None,
+                'call_ended_at': None,
+                'retry_count': 0,
+                'is_successful': False,
+                'needs_retry': False,
+                'created_at': None
+            }
+
+
+# Rows refreshed per query batch
+REFRESH_CHUNK_SIZE = 500
+
+_batch = threading.local()
+
+
+def refresh_rows(awbs):
+    """
+    Bring the OFD dashboard rows of these AWBs up to date (order data + latest call summary)
+    Active orders get their row inserted/updated, the others lose it. Call this after any
+    write signals don't see (bulk_create, bulk_update, queryset.update).
+    Returns:
+        int: Rows written
+    """
+    awbs = list(dict.fromkeys(awb for awb in awbs if awb))
+    if getattr(_batch, 'awbs', None) is not None:
+        # Inside batch() - refreshed once when the batch ends
+        _batch.awbs.update(awbs)
+        return 0
+
+    written = 0
+    for start in range(0, len(awbs), REFRESH_CHUNK_SIZE):
+        chunk = awbs[start:start + REFRESH_CHUNK_SIZE]
+
+        # Gone or no longer OFD/Undelivered
+        OFDDashboardRow.objects.filter(order__awb__in=chunk).exclude(order__order_type__in=OFD_ORDER_TYPES).delete()
+
+        db_orders = list(Order.objects.filter(awb__in=chunk, order_type__in=OFD_ORDER_TYPES))
+        if not db_orders:
+            continue
+
+        entries = [order_to_dict(db_order) for db_order in db_orders]
+        attach_call_history(entries)
+
+        rows = []
+        for db_order, entry in zip(db_orders, entries):
+            call_history = entry.pop('call_history')
+            rows.append(OFDDashboardRow(
+                order=db_order,
+                order_type=db_order.order_type,
+                order_updated_at=db_order.updated_at,
+                order_data=entry,
+                call_history=call_history
+            ))
+
+        OFDDashboardRow.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['order'],
+            update_fields=['order_type', 'order_updated_at', 'order_data', 'call_history', 'refreshed_at']
+        )
+        written += len(rows)
+
+    return written
+
+
+def rebuild_all():
+    """Rebuild every row (backfill / repair), returns rows written"""
+    OFDDashboardRow.objects.exclude(order__order_type__in=OFD_ORDER_TYPES).delete()
+    return refresh_rows(Order.objects.filter(order_type__in=OFD_ORDER_TYPES).values_list('awb', flat=True))
+
+
+@contextmanager
+def batch():
+    """Collect refresh_rows() calls (e.g. from per-row signals during a bulk delete) and run them once at the end"""
+    if getattr(_batch, 'awbs', None) is not None:
+        # Already batching - the outer batch refreshes
+        yield
+        return
+
+    _batch.awbs = set()
+    try:
+        yield
+    finally:
+        awbs, _batch.awbs = _batch.awbs, None
+        if awbs:
+            refresh_rows(awbs)
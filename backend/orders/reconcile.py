@@ -0,0 +1,141 @@
+from datetime import timedelta, timezone as dt_timezone
+from django.db.models import Min
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .constants import RECONCILE_MAX_PAGES
+from .models import CallHistory, CallPayload
+from .vapi_service import VAPIService
+from . import live_events, cache_versions, read_model, jobs
+
+
+# Watermark of full passes is kept on the reconcile job's ScheduledJob row
+CURSOR_NAME = 'reconcile_open_calls'
+
+
+def _open_calls():
+    """Today's calls that haven't ended yet (status unknown counts as open)"""
+    return CallHistory.objects.today().exclude(status='ended')
+
+
+def _to_vapi_time(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def fetch_calls_since(watermark, max_pages=RECONCILE_MAX_PAGES):
+    """
+    Page back through VAPI's call list from now to the watermark (100 calls per request)
+    Returns:
+        tuple: ({call_id: call_data}, pages, error or None)
+    """
+    calls = {}
+    created_at_le = None
+
+    for page in range(1, max_pages + 1):
+        result = VAPIService.list_calls(
+            limit=100,
+            created_at_gt=_to_vapi_time(watermark),
+            created_at_le=created_at_le
+        )
+        if isinstance(result, dict) and 'error' in result:
+            return calls, page, result['error']
+
+        new_calls = 0
+        for call_data in result:
+            if call_data.get('id'):
+                new_calls += call_data['id'] not in calls
+                calls[call_data['id']] = call_data
+
+        # Newest first - continue from the oldest call of this page. The bound is inclusive:
+        # calls sharing that createdAt may not all fit on this page (the repeats are de-duplicated)
+        created_times = [call_data['createdAt'] for call_data in result if call_data.get('createdAt')]
+        if len(result) < 100 or not created_times:
+            return calls, page, None
+        if not new_calls:
+            # A full page of calls we already have - all at one createdAt, paging can't get past it
+            return calls, page, f'More than 100 calls created at {created_at_le} - stopped paging'
+        created_at_le = min(created_times, key=parse_datetime)
+
+    return calls, max_pages, f'Stopped after {max_pages} pages'
+
+
+def _next_watermark(vapi_calls, started):
+    """Where the next full pass starts: the oldest listed call not ended yet, else a bit before this pass"""
+    open_times = [
+        parse_datetime(call_data['createdAt']) for call_data in vapi_calls.values()
+        if call_data.get('createdAt') and call_data.get('status') != 'ended'
+    ]
+    # createdAtGt is exclusive - start just before the open call so it's listed again
+    open_times = [created_at - timedelta(seconds=1) for created_at in open_times if created_at]
+    return min(open_times + [started - timedelta(minutes=5)])
+
+
+def reconcile_calls(call_ids=None, max_pages=RECONCILE_MAX_PAGES):
+    """
+    Update CallHistory from VAPI's call list instead of one GET /call/{id} per call
+    Args:
+        call_ids: Only reconcile these calls (default: every call of today not ended yet)
+    Returns:
+        dict: pages, fetched, updated, unchanged, not_found (call ids missing from
+              the listing), calls (updated CallHistory rows), error
+    """
+    open_calls = CallHistory.objects.filter(call_id__in=call_ids) if call_ids else _open_calls()
+    report = {'pages': 0, 'fetched': 0, 'updated': 0, 'unchanged': 0, 'not_found': list(call_ids or []),
+              'calls': [], 'error': None}
+
+    # Watermark = oldest call we still care about (VAPI createdAt is a bit earlier than our row)
+    oldest = open_calls.aggregate(oldest=Min(Coalesce('call_started_at', 'created_at')))['oldest']
+    if oldest is None:
+        return report
+    watermark = oldest - timedelta(minutes=5)
+
+    # Full passes continue from the saved watermark - calls VAPI never lists don't make every pass
+    # (or every restart / worker) page back to the start of the day
+    started = timezone.now()
+    if not call_ids:
+        saved = jobs.get_cursor(CURSOR_NAME)
+        if saved and saved > watermark:
+            watermark = saved
+
+    vapi_calls, report['pages'], report['error'] = fetch_calls_since(watermark, max_pages)
+    report['fetched'] = len(vapi_calls)
+
+    if not call_ids and not report['error']:
+        jobs.advance_cursor(CURSOR_NAME, _next_watermark(vapi_calls, started))
+
+    # Match the listing to our rows in one query
+    wanted = set(call_ids) if call_ids else None
+    ids = [call_id for call_id in vapi_calls if wanted is None or call_id in wanted]
+    rows = CallHistory.objects.in_bulk(ids, field_name='call_id')
+
+    changed_rows = []
+    changed_fields = set()
+    for call_id, call_history in rows.items():
+        changed = call_history.apply_vapi_call(vapi_calls[call_id])
+        if not changed:
+            report['unchanged'] += 1
+            continue
+
+        call_history.update_retry_status()
+        changed_rows.append(call_history)
+        changed_fields.update(changed)
+
+    if changed_rows:
+        now = timezone.now()
+        for call_history in changed_rows:
+            call_history.updated_at = now
+
+        changed_fields.discard('vapi_response')
+        changed_fields.update(['is_successful', 'needs_retry', 'updated_at'])
+        CallHistory.objects.bulk_update(changed_rows, sorted(changed_fields), batch_size=100)
+        CallPayload.store_many(changed_rows)
+        read_model.refresh_rows([call_history.awb for call_history in changed_rows])
+        cache_versions.bump(cache_versions.CALLS)
+        live_events.publish('calls', {'updated': len(changed_rows)})
+
+    report['updated'] = len(changed_rows)
+    report['calls'] = list(rows.values())
+    if call_ids:
+        report['not_found'] = [call_id for call_id in call_ids if call_id not in rows]
+
+    return report
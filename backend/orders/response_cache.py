@@ -0,0 +1,264 @@
+import hashlib
+import json
+import threading
+import time
+from django.core.cache import cache, caches
+from django.db import connection
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .constants import (
+    CACHE_REBUILD_LOCK_SECONDS,
+    CACHE_REBUILD_WAIT_SECONDS,
+    DASHBOARD_HOT_SECONDS,
+    DASHBOARD_REFRESH_AHEAD_SECONDS,
+)
+
+
+# Payloads live in this process (LocMem) and in the shared cache (DB table), so a payload built by
+# one gunicorn worker is served by all of them. Keys are versioned, so entries never go stale.
+shared_cache = caches['shared']
+_shared_failed = False
+
+# slot -> (version_fn, build_fn, timeout) kept warm by refresh_hot()
+_refreshers = {}
+
+
+def _shared(method, *args, default=None):
+    """Shared cache call that never raises (e.g. cache table not created yet) - we fall back to this process"""
+    global _shared_failed
+    try:
+        return getattr(shared_cache, method)(*args)
+    except Exception as e:
+        if not _shared_failed:
+            print(f"[CACHE] ⚠️ Shared cache unavailable ({e}) - caching in this process only")
+            _shared_failed = True
+        return default
+
+
+def _meta_key(cache_key):
+    return f'{cache_key}:meta'
+
+
+def _get(key):
+    """This process first, then the shared cache (copied here for the next request)"""
+    value = cache.get(key)
+    if value is None:
+        value = _shared('get', key)
+        if value is not None:
+            cache.set(key, value, DASHBOARD_HOT_SECONDS)
+    return value
+
+
+def _last_key(slot):
+    """
+    Cache key of the slot's last stored version - read from the shared cache when there is one,
+    so dropping it there reaches every worker
+    """
+    key = f'{slot}:last'
+    if _shared_failed:
+        return cache.get(key)
+    return _shared('get', key, default=cache.get(key))
+
+
+def drop_last(slot):
+    """Stop serving the previous version of a slot while it's rebuilt"""
+    cache.delete(f'{slot}:last')
+    _shared('delete', f'{slot}:last')
+
+
+def clear():
+    """Drop every cached payload - this process and the shared cache (nightly cleanup)"""
+    cache.clear()
+    _shared('clear')
+
+
+def make_validators(data):
+    """ETag (hash of the payload) and Last-Modified (now) for freshly built data"""
+    body = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return {
+        'etag': quote_etag(hashlib.md5(body).hexdigest()),
+        'last_modified': int(timezone.now().timestamp()),
+    }
+
+
+def store(cache_key, data, timeout, group=None, version=None):
+    """
+    Cache a payload together with its validators (computed once per build, not per request)
+    Args:
+        group/version: Entries of the group stored under another version are deleted
+                       (versioned keys would otherwise pile up until they expire)
+    Returns:
+        dict: etag, last_modified
+    """
+    meta = make_validators(data)
+    entries = {cache_key: data, _meta_key(cache_key): meta}
+    if group:
+        entries[f'{group}:last'] = cache_key  # Served while the next version is being built
+
+    cache.set_many(entries, timeout)
+    _shared('set_many', entries, timeout)
+
+    if group:
+        index_key = f'{group}:keys'
+        keys = _shared('get', index_key) or cache.get(index_key) or {}
+        stale = [key for key, key_version in keys.items() if key_version != version]
+        if stale:
+            stale_keys = stale + [_meta_key(key) for key in stale]
+            cache.delete_many(stale_keys)
+            _shared('delete_many', stale_keys)
+        keys = {key: key_version for key, key_version in keys.items() if key_version == version}
+        keys[cache_key] = version
+        cache.set(index_key, keys, timeout)
+        _shared('set', index_key, keys, timeout)
+
+    return meta
+
+
+def get_validators(cache_key):
+    return _get(_meta_key(cache_key))
+
+
+def is_not_modified(request, meta):
+    """True if the client's copy (If-None-Match / If-Modified-Since) is still current"""
+    if not meta:
+        return False
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # Weak comparison - proxies/gzip may hand our ETag back as W/"..."
+        etags = [etag[2:] if etag.startswith('W/') else etag for etag in parse_etags(if_none_match)]
+        return '*' in etags or meta['etag'] in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and meta['last_modified'] <= if_modified_since
+
+
+def with_validators(response, meta):
+    """Add ETag/Last-Modified - browsers then revalidate instead of downloading again"""
+    if meta:
+        response['ETag'] = meta['etag']
+        response['Last-Modified'] = http_date(meta['last_modified'])
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def respond(request, data, meta, status_code=status.HTTP_200_OK):
+    """Response for data served with validators, 304 if the client already has it"""
+    if is_not_modified(request, meta):
+        return with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), meta)
+    return with_validators(Response(data, status=status_code), meta)
+
+
+def _rebuild(slot, version, build, timeout):
+    """Run build() and cache a 200 result - the caller holds the slot lock, released here"""
+    try:
+        data, status_code = build()
+        meta = None
+        if status_code == status.HTTP_200_OK:
+            meta = store(f'{slot}:{version}', data, timeout, group=slot, version=version)
+        else:
+            # Not cacheable (e.g. 202 while syncing) - the previous version must not hide it
+            drop_last(slot)
+        return data, meta, status_code
+    finally:
+        _shared('delete', f'{slot}:lock')
+
+
+def _rebuild_in_background(slot, version, build, timeout):
+    def run():
+        try:
+            _rebuild(slot, version, build, timeout)
+        except Exception as e:
+            print(f"[CACHE] ⚠️ Background rebuild of {slot} failed: {e}")
+        finally:
+            # Thread opened its own DB connection - don't leak it
+            connection.close()
+
+    threading.Thread(target=run, name=f'rebuild-{slot}', daemon=True).start()
+
+
+def serve(request, slot, version, build, timeout):
+    """
+    Response for a cached dashboard payload (single-flight rebuild, stale-while-revalidate)
+    - 304 if the client already has the current version, cached copy if there is one
+    - on a miss only the worker holding the slot lock rebuilds, everyone gets the previous
+      version meanwhile - without one they wait for the rebuild
+    Args:
+        slot: Cache key prefix of the payload (e.g. 'ofd_orders_data')
+        version: Current data version (cache_versions.current)
+        build: Function returning (data, status_code) - only 200 results are cached
+    """
+    cache_key = f'{slot}:{version}'
+
+    # Remember the slot is in use so refresh_hot() keeps it warm (shared write at most once a minute)
+    if cache.add(f'{slot}:hot', True, 60):
+        _shared('set', f'{slot}:hot', True, DASHBOARD_HOT_SECONDS)
+
+    meta = get_validators(cache_key)
+    if is_not_modified(request, meta):
+        return respond(request, None, meta)
+
+    data = _get(cache_key)
+    if data is not None:
+        return respond(request, data, meta or make_validators(data))
+
+    # Miss - is another worker rebuilding already? (no shared cache: behave as if we got the lock)
+    got_lock = _shared('add', f'{slot}:lock', True, CACHE_REBUILD_LOCK_SECONDS, default=True)
+
+    previous_key = _last_key(slot)
+    previous = _get(previous_key) if previous_key else None
+    if previous is not None:
+        if got_lock:
+            print(f"[CACHE] {slot}: serving previous version, rebuilding {version} in background")
+            _rebuild_in_background(slot, version, build, timeout)
+        response = respond(request, previous, get_validators(previous_key) or make_validators(previous))
+        response['X-Cache'] = 'stale'
+        return response
+
+    if not got_lock:
+        # Nothing to serve meanwhile - wait for the other worker instead of building it again
+        deadline = time.monotonic() + CACHE_REBUILD_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(0.5)
+            data = _get(cache_key)
+            if data is not None:
+                return respond(request, data, get_validators(cache_key) or make_validators(data))
+        print(f"[CACHE] ⚠️ {slot}: rebuild by another worker is taking long, building here too")
+
+    data, meta, status_code = _rebuild(slot, version, build, timeout)
+    if meta is None:
+        return Response(data, status=status_code)
+    return respond(request, data, meta, status_code)
+
+
+def register_refresher(slot, version_fn, build, timeout):
+    """Keep a payload warm - refresh_hot() rebuilds it once the data changed or shortly before expiry"""
+    _refreshers[slot] = (version_fn, build, timeout)
+
+
+def refresh_hot():
+    """
+    Rebuild registered payloads that were requested recently and are missing or about to expire
+    Returns:
+        list: Slots rebuilt
+    """
+    rebuilt = []
+    for slot, (version_fn, build, timeout) in list(_refreshers.items()):
+        if not _shared('get', f'{slot}:hot', default=cache.get(f'{slot}:hot')):
+            continue
+
+        version = version_fn()
+        meta = get_validators(f'{slot}:{version}')
+        if meta and time.time() - meta['last_modified'] < timeout - DASHBOARD_REFRESH_AHEAD_SECONDS:
+            continue
+
+        if _shared('add', f'{slot}:lock', True, CACHE_REBUILD_LOCK_SECONDS, default=True):
+            try:
+                _rebuild(slot, version, build, timeout)
+                rebuilt.append(slot)
+            except Exception as e:
+                print(f"[CACHE] ⚠️ Refresh of {slot} failed: {e}")
+
+    return rebuilt
@@ -1,11 +1,52 @@
-import schedule
-import time
 import threading
-from datetime import datetime, time as dt_time
+from datetime import datetime, time as dt_time, timedelta
 from .vapi_service import VAPIService
-from .models import CallHistory, Order
+from .models import CallHistory, CallSession, CallSessionItem, Order, Tombstone, WebhookEvent
+from .http_client import get_connection_stats
+from .dispatcher import dispatch_calls
+from .call_buffer import CallHistoryBuffer
+from .reconcile import reconcile_calls
+from .constants import (
+    VAPI_MAX_CONCURRENT_CALLS,
+    VAPI_CALLS_PER_SECOND,
+    WEBHOOK_EVENT_RETENTION_DAYS,
+    RECONCILE_INTERVAL_MINUTES,
+    TOMBSTONE_RETENTION_HOURS,
+    DASHBOARD_REFRESH_ENABLED,
+    DASHBOARD_REFRESH_MINUTES,
+    JOB_HISTORY_DAYS,
+    CALL_SESSION_MAX_CALLS,
+)
+from . import tracking_cache, live_events, cache_versions, read_model, jobs, call_sessions, call_priority, tombstones
 from django.utils.dateparse import parse_datetime
-from django.db.models import Q
+from django.db.models import Q, Exists, OuterRef, Subquery
+from django.utils import timezone
+
+
+# Order fields written by sync_ofd_orders()
+ORDER_SYNC_FIELDS = [
+    'customer_name',
+    'customer_mobile',
+    'customer_address',
+    'customer_pincode',
+    'cod_amount',
+    'weight',
+    'order_date',
+    'current_status',
+    'order_type',
+    'source_hash',
+    'synced_at',
+]
+
+
+# Daily call sessions and the pre-sync 10 minutes before each
+CALL_TIMES = ['10:30', '11:00', '12:00', '13:00']
+PRE_SYNC_TIMES = ['10:20', '10:50', '11:50', '12:50']
+
+
+def is_valid_phone(phone):
+    """Phone is usable for calling (not empty, not 'N/A', at least 10 digits)"""
+    return bool(phone) and phone != 'N/A' and len(str(phone)) >= 10
 
 
 class AutoCallScheduler:
@@ -14,9 +55,9 @@ class AutoCallScheduler:
     """
 
     def __init__(self):
-        self.running = False
-        self.thread = None
-        self.hourly_mode = True  # Run hourly from 10 AM - 1 PM
+        self.last_sync_report = None  # inserted/updated/unchanged counts of last sync
+        self.session_lock = threading.Lock()  # Guards current_session while calls run concurrently
+        self.call_buffer = None  # CallHistoryBuffer of the running session
 
         # Live tracking variables
         self.current_session = {
@@ -33,98 +74,95 @@ class AutoCallScheduler:
 
     def get_pending_calls(self):
         """
-        Get pending calls list (Not Called + Retry Needed)
-        OPTIMIZED: Only calls that need calling, avoids duplicates
+        Get pending calls list (Not Called + Retry Needed), highest priority first
+        Planned with 2 SQL queries - call history checks run as subqueries
+        instead of per-order Python membership tests and Order lookups
         """
         from datetime import datetime, time as dt_time, timedelta
 
-        # Get all OFD/Undelivered orders
-        ofd_orders = Order.objects.filter(
-            Q(order_type='OFD') | Q(order_type='Undelivered')
-        )
-
-        # Get today's call history
-        today_start = datetime.combine(datetime.now().date(), dt_time.min)
-        today_end = datetime.combine(datetime.now().date(), dt_time.max)
+        # Today's call history
+        today_start = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+        today_end = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.max))
+        calls_today = CallHistory.objects.filter(created_at__range=(today_start, today_end))
 
-        # Get all AWBs that were called today successfully
-        successfully_called_awbs = CallHistory.objects.filter(
-            created_at__range=(today_start, today_end),
-            is_successful=True
-        ).values_list('awb', flat=True).distinct()
+        # OPTIMIZATION: Skip AWBs called in last 2 hours (avoid calling too frequently)
+        two_hours_ago = timezone.now() - timedelta(hours=2)
 
-        # OPTIMIZATION: Get AWBs called in last 2 hours (avoid calling too frequently)
-        two_hours_ago = datetime.now() - timedelta(hours=2)
-        recently_called_awbs = CallHistory.objects.filter(
-            created_at__gte=two_hours_ago
-        ).values_list('awb', flat=True).distinct()
-
-        # Get all AWBs that were called today (to check if called or not)
-        called_awbs = CallHistory.objects.filter(
-            created_at__range=(today_start, today_end)
-        ).values_list('awb', flat=True).distinct()
+        # 1. Not Called Orders - OFD/Undelivered orders that haven't been called today
+        # (no call today also means no successful call today)
+        not_called_orders = Order.objects.filter(
+            Q(order_type='OFD') | Q(order_type='Undelivered')
+        ).filter(
+            ~Exists(calls_today.filter(awb=OuterRef('awb'))),
+            ~Exists(CallHistory.objects.filter(awb=OuterRef('awb'), created_at__gte=two_hours_ago)),
+            # Dialed when a worker stopped (no call record) - may have rung, same cooldown
+            ~Exists(CallSessionItem.objects.filter(awb=OuterRef('awb'), status='interrupted',
+                                                   updated_at__gte=two_hours_ago))
+        ).values(
+            'awb', 'customer_name', 'customer_mobile', 'customer_address',
+            'customer_pincode', 'cod_amount', 'order_type', 'current_status',
+            'last_scan', 'created_at'
+        )
 
         pending_calls = []
-
-        # 1. Not Called Orders - OFD orders that haven't been called today
-        for order in ofd_orders:
-            # Skip if already called successfully
-            if order.awb in successfully_called_awbs:
-                continue
-
-            # OPTIMIZATION: Skip if called in last 2 hours (avoid spamming)
-            if order.awb in recently_called_awbs:
-                continue
-
-            if order.awb not in called_awbs:
-                pending_calls.append({
-                    'awb': order.awb,
-                    'customer_name': order.customer_name,
-                    'customer_mobile': order.customer_mobile,
-                    'customer_address': order.customer_address,
-                    'customer_pincode': order.customer_pincode,
-                    'cod_amount': order.cod_amount,
-                    'order_type': order.order_type,
-                    'current_status': order.current_status,
-                    'call_status': 'not_called',
-                    'retry_count': 0
-                })
-
-        # 2. Retry Needed Orders - Failed calls that need retry
-        retry_calls = CallHistory.objects.filter(
-            created_at__range=(today_start, today_end),
+        for order in not_called_orders:
+            last_scan = order.pop('last_scan')
+            first_seen = order.pop('created_at')
+            pending_calls.append({
+                **order,
+                'call_status': 'not_called',
+                'retry_count': 0,
+                # Out for delivery since the last scan (or since we first saw the order)
+                'out_since': call_priority.scan_time(last_scan) or first_seen
+            })
+
+        # 2. Retry Needed Orders - Failed calls that need retry, with order details joined in
+        order_row = Order.objects.filter(awb=OuterRef('awb'))
+        retry_calls = calls_today.filter(
+            Exists(order_row),
             needs_retry=True,
             is_successful=False,
             retry_count__lt=3  # Max 3 retries
-        ).exclude(awb__in=successfully_called_awbs).order_by('awb', '-created_at')
+        ).exclude(
+            awb__in=calls_today.filter(is_successful=True).values('awb')
+        ).annotate(
+            order_address=Subquery(order_row.values('customer_address')[:1]),
+            order_pincode=Subquery(order_row.values('customer_pincode')[:1]),
+            order_cod_amount=Subquery(order_row.values('cod_amount')[:1]),
+            order_current_status=Subquery(order_row.values('current_status')[:1]),
+            order_last_scan=Subquery(order_row.values('last_scan')[:1]),
+            order_created_at=Subquery(order_row.values('created_at')[:1])
+        ).order_by('awb', '-created_at').values(
+            'awb', 'customer_name', 'customer_phone', 'order_type', 'retry_count', 'ended_reason',
+            'order_address', 'order_pincode', 'order_cod_amount', 'order_current_status',
+            'order_last_scan', 'order_created_at', 'created_at'
+        )
 
         processed_awbs = set()
         for call in retry_calls:
             # Only take the latest call per AWB
-            if call.awb in processed_awbs:
+            if call['awb'] in processed_awbs:
                 continue
-            processed_awbs.add(call.awb)
-
-            # Get order details from Order model
-            try:
-                order = Order.objects.get(awb=call.awb)
-                pending_calls.append({
-                    'awb': call.awb,
-                    'customer_name': call.customer_name,
-                    'customer_mobile': call.customer_phone,
-                    'customer_address': order.customer_address,
-                    'customer_pincode': order.customer_pincode,
-                    'cod_amount': order.cod_amount,
-                    'order_type': call.order_type,
-                    'current_status': order.current_status,
-                    'call_status': 'retry_needed',
-                    'retry_count': call.retry_count,
-                    'last_call_reason': call.ended_reason
-                })
-            except Order.DoesNotExist:
-                continue
-
-        return pending_calls
+            processed_awbs.add(call['awb'])
+
+            pending_calls.append({
+                'awb': call['awb'],
+                'customer_name': call['customer_name'],
+                'customer_mobile': call['customer_phone'],
+                'customer_address': call['order_address'],
+                'customer_pincode': call['order_pincode'],
+                'cod_amount': call['order_cod_amount'],
+                'order_type': call['order_type'],
+                'current_status': call['order_current_status'],
+                'call_status': 'retry_needed',
+                'retry_count': call['retry_count'],
+                'last_call_reason': call['ended_reason'],
+                'out_since': call_priority.scan_time(call['order_last_scan']) or call['order_created_at'],
+                'last_attempt_at': call['created_at']
+            })
+
+        # Most valuable deliveries first (OFD, COD value, time out for delivery, retries)
+        return call_priority.rank(pending_calls)
 
     def add_log(self, message, log_type='info'):
         """Add log message to current session"""
@@ -133,16 +171,37 @@ class AutoCallScheduler:
             'message': message,
             'type': log_type  # 'info', 'success', 'error', 'warning'
         }
-        self.current_session['logs'].append(log_entry)
-        # Keep only last 20 logs
-        if len(self.current_session['logs']) > 20:
-            self.current_session['logs'] = self.current_session['logs'][-20:]
+        with self.session_lock:  # Called from dispatcher threads too
+            self.current_session['logs'].append(log_entry)
+            # Keep only last 20 logs
+            if len(self.current_session['logs']) > 20:
+                self.current_session['logs'] = self.current_session['logs'][-20:]
+
+        live_events.publish('log', log_entry)
+
+    def session_counters(self):
+        """current_session without the logs (what 'session' events carry)"""
+        with self.session_lock:
+            return {key: value for key, value in self.current_session.items() if key != 'logs'}
 
-    def sync_ofd_orders(self):
-        """Sync OFD/Undelivered orders from iThink API before calling"""
+    def publish_session(self):
+        """Push the live counters to dashboards"""
+        live_events.publish('session', self.session_counters())
+
+    def sync_ofd_orders(self, incremental=True):
+        """
+        Sync OFD/Undelivered orders from iThink API before calling
+        Incremental mode skips AWBs whose iThink record is unchanged since the
+        last run (same source_hash) - changed rows are written with one
+        bulk_create + one bulk_update.
+        Returns:
+            dict: Sync report with inserted/updated/unchanged counts
+        """
         from .services import IThinkService
         from datetime import timedelta
 
+        report = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+
         print(f"\n{'='*70}")
         print(f"PRE-SYNC: Fetching Fresh OFD/Undelivered Data - {datetime.now().strftime('%H:%M:%S')}")
         print(f"{'='*70}")
@@ -159,36 +218,18 @@ class AutoCallScheduler:
         print(f"[API] {msg}")
         self.add_log(msg, 'info')
 
-        result = IThinkService.get_orders_by_date_range(from_date, to_date)
-
-        if "error" in result:
-            msg = f"❌ Sync failed: {result.get('error')}"
-            print(f"[FAIL] {msg}")
-            self.add_log(msg, 'error')
-            return 0
-
-        if result.get('status') != 'success' or 'data' not in result:
-            msg = f"Sync failed: Invalid response"
-            print(f"[FAIL] {msg}")
-            self.add_log(msg, 'error')
-            return 0
-
-        orders_data = result['data']
-        new_count = 0
-        updated_count = 0
-
-        msg = f"✅ API Response received: {len(orders_data)} total orders found"
-        print(f"[API] {msg}")
-        self.add_log(msg, 'success')
-
-        # Collect OFD/Undelivered orders first (to avoid unnecessary Track API calls)
+        # Filter OFD/Undelivered orders while the response streams in
+        # (avoids holding the whole 7-day payload and unnecessary Track API calls)
         msg = "🔍 Filtering OFD/Undelivered orders..."
         print(f"[FILTER] {msg}")
         self.add_log(msg, 'info')
 
+        fetch_report = {}
+        total_orders = 0
         temp_ofd_orders = []
-        for awb, order in orders_data.items():
-            order_status = order.get('latest_courier_status', '').lower()
+        for record in IThinkService.iter_orders_by_date_range(from_date, to_date, report=fetch_report):
+            total_orders += 1
+            order_status = record['latest_courier_status'].lower()
 
             # Skip delivered and RTO
             if 'delivered' in order_status and 'undelivered' not in order_status:
@@ -203,92 +244,150 @@ class AutoCallScheduler:
             if is_ofd or is_undelivered:
                 order_type = 'OFD' if is_ofd else 'Undelivered'
                 temp_ofd_orders.append({
-                    'awb': awb,
-                    'order': order,
+                    'awb': record['awb'],
+                    'order': record['raw'],
                     'order_type': order_type,
-                    'order_status': order_status
+                    'order_status': order_status,
+                    'source_hash': Order.compute_source_hash(record['raw'], order_type)
                 })
 
-        msg = f"📦 Found {len(temp_ofd_orders)} OFD/Undelivered orders (filtered from {len(orders_data)})"
+        orders_error = IThinkService.date_range_error(fetch_report)
+        if orders_error:
+            msg = f"❌ Sync failed: {orders_error.get('error')}"
+            print(f"[FAIL] {msg}")
+            self.add_log(msg, 'error')
+            return report
+
+        msg = f"✅ API Response received: {total_orders} total orders found"
+        print(f"[API] {msg}")
+        self.add_log(msg, 'success')
+
+        if fetch_report['failed_days']:
+            msg = f"⚠️ Order Details API failed for {', '.join(fetch_report['failed_days'])} - those days are skipped this run"
+            print(f"[API] {msg}")
+            self.add_log(msg, 'warning')
+
+        msg = f"📦 Found {len(temp_ofd_orders)} OFD/Undelivered orders (filtered from {total_orders})"
         print(f"[SYNC] {msg}")
         self.add_log(msg, 'success')
 
+        # Load existing rows in one query and drop AWBs unchanged since last sync
+        existing_orders = {
+            existing.awb: existing
+            for existing in Order.objects.filter(awb__in=[item['awb'] for item in temp_ofd_orders])
+        }
+
+        changed_orders = []
+        for item in temp_ofd_orders:
+            existing = existing_orders.get(item['awb'])
+            # Rows without a phone stay "changed" so the phone lookup is retried
+            if (incremental and existing and existing.source_hash == item['source_hash']
+                    and is_valid_phone(existing.customer_mobile)):
+                report['unchanged'] += 1
+                continue
+            changed_orders.append(item)
+
+        msg = f"🧮 {len(changed_orders)} changed/new, {report['unchanged']} unchanged since last sync"
+        print(f"[SYNC] {msg}")
+        self.add_log(msg, 'info')
+
         # Get phone numbers from Track API for orders with missing/invalid phone
         awbs_to_track = []
-        for item in temp_ofd_orders:
+        for item in changed_orders:
             order = item['order']
+            existing = existing_orders.get(item['awb'])
             # Check BOTH customer_phone AND customer_mobile fields
             phone = order.get('customer_phone') or order.get('customer_mobile')
-            if not phone or phone == 'N/A' or phone == '' or len(phone) < 10:
+            if not is_valid_phone(phone) and not (existing and is_valid_phone(existing.customer_mobile)):
                 awbs_to_track.append(item['awb'])
 
-        # Fetch phone numbers from Track API in batches
+        # Fetch phone numbers from Track API (batched and concurrent inside the service)
         phone_map = {}
         if awbs_to_track:
             msg = f"📞 {len(awbs_to_track)} orders missing phone - calling Track API..."
             print(f"[SYNC] {msg}")
             self.add_log(msg, 'warning')
 
-            batch_size = 10  # iThink API limit: Maximum 10 AWBs per tracking request
-            for i in range(0, len(awbs_to_track), batch_size):
-                batch = awbs_to_track[i:i + batch_size]
-                msg = f"📡 API Call: Track API - Batch {i//batch_size + 1} ({len(batch)} AWBs)"
-                print(f"[API]   {msg}")
-                self.add_log(msg, 'info')
-
-                track_result = IThinkService.track_orders(batch)
-                if track_result.get('status') == 'success':
-                    track_data = track_result.get('data', {})
-                    for awb, track_info in track_data.items():
-                        customer_details = track_info.get('customer_details', {})
-                        phone = customer_details.get('customer_mobile') or customer_details.get('customer_phone')
-                        if phone and phone != 'N/A' and len(phone) >= 10:
-                            phone_map[awb] = phone
-                            print(f"[SYNC]     ✓ {awb}: {phone}")
-
-        # Now process and save orders with phone numbers
-        for item in temp_ofd_orders:
+            msg = f"📡 API Call: Track API - {len(awbs_to_track)} AWBs (concurrent batches)"
+            print(f"[API]   {msg}")
+            self.add_log(msg, 'info')
+
+            track_result = IThinkService.track_orders(awbs_to_track)
+            if track_result.get('status') == 'success':
+                track_data = track_result.get('data', {})
+                for awb, track_info in track_data.items():
+                    customer_details = track_info.get('customer_details', {})
+                    phone = customer_details.get('customer_mobile') or customer_details.get('customer_phone')
+                    if is_valid_phone(phone):
+                        phone_map[awb] = phone
+                        print(f"[SYNC]     ✓ {awb}: {phone}")
+
+                failed_batches = track_result.get('failed_batches', [])
+                if failed_batches:
+                    msg = f"⚠️ Track API: {len(failed_batches)} batches failed"
+                    print(f"[API]   {msg}")
+                    self.add_log(msg, 'warning')
+
+        # Build new/changed rows, then write them in bulk
+        now = timezone.now()
+        orders_to_create = []
+        orders_to_update = []
+
+        for item in changed_orders:
             awb = item['awb']
             order = item['order']
-            order_type = item['order_type']
-            order_status = item['order_status']
+            existing = existing_orders.get(awb)
 
-            # Get phone from Order Details first (check BOTH fields), then Track API
+            # Get phone from Order Details first (check BOTH fields), then Track API, then what we already have
             customer_mobile = order.get('customer_phone') or order.get('customer_mobile')
-            if not customer_mobile or customer_mobile == 'N/A' or customer_mobile == '' or len(customer_mobile) < 10:
-                customer_mobile = phone_map.get(awb, 'N/A')
+            if not is_valid_phone(customer_mobile):
+                customer_mobile = phone_map.get(awb)
+            if not is_valid_phone(customer_mobile):
+                customer_mobile = existing.customer_mobile if existing and is_valid_phone(existing.customer_mobile) else 'N/A'
+
+            fields = {
+                'customer_name': order.get('customer_name', 'N/A'),
+                'customer_mobile': customer_mobile,
+                'customer_address': order.get('customer_address', 'N/A'),
+                'customer_pincode': order.get('customer_pincode', 'N/A'),
+                'cod_amount': order.get('cod_amount', 0),
+                'weight': order.get('weight', 0),
+                'order_date': order.get('order_date'),
+                'current_status': item['order_status'],
+                'order_type': item['order_type'],
+                'source_hash': item['source_hash'],
+                'synced_at': now,
+            }
 
-            # Check if already exists
-            existing = Order.objects.filter(awb=awb).first()
+            phone_status = "✓" if customer_mobile != 'N/A' else "✗"
             if existing:
-                # Update if order type changed OR if phone was N/A and now we have valid phone
-                if existing.order_type != order_type or (existing.customer_mobile == 'N/A' and customer_mobile != 'N/A'):
-                    existing.order_type = order_type
-                    existing.current_status = order_status
-                    existing.customer_mobile = customer_mobile
-                    existing.save()
-                    updated_count += 1
-                    phone_status = "✓" if customer_mobile != 'N/A' else "✗"
-                    print(f"[SYNC] {phone_status} Updated: {awb} - {customer_mobile}")
+                for field, value in fields.items():
+                    setattr(existing, field, value)
+                existing.updated_at = now  # bulk_update() skips auto_now
+                orders_to_update.append(existing)
+                print(f"[SYNC] {phone_status} Updated: {awb} - {customer_mobile}")
             else:
-                Order.objects.create(
+                orders_to_create.append(Order(
                     awb=awb,
-                    customer_name=order.get('customer_name', 'N/A'),
-                    customer_mobile=customer_mobile,
-                    customer_address=order.get('customer_address', 'N/A'),
-                    customer_pincode=order.get('customer_pincode', 'N/A'),
-                    cod_amount=order.get('cod_amount', 0),
-                    weight=order.get('weight', 0),
-                    order_date=order.get('order_date'),
                     tracking_url=f'https://www.ithinklogistics.co.in/postship/tracking/{awb}',
-                    current_status=order_status,
-                    order_type=order_type
-                )
-                new_count += 1
-                phone_status = "✓" if customer_mobile != 'N/A' else "✗"
+                    **fields
+                ))
                 print(f"[SYNC] {phone_status} Created: {awb} - {customer_mobile}")
 
-        msg = f"✅ Database sync complete: {new_count} new orders, {updated_count} updated"
+        if orders_to_create:
+            Order.objects.bulk_create(orders_to_create)
+        if orders_to_update:
+            Order.objects.bulk_update(orders_to_update, ORDER_SYNC_FIELDS + ['updated_at'])
+        if orders_to_create or orders_to_update:
+            read_model.refresh_rows([order.awb for order in orders_to_create + orders_to_update])
+            cache_versions.bump(cache_versions.ORDERS)
+
+        report['inserted'] = len(orders_to_create)
+        report['updated'] = len(orders_to_update)
+        self.last_sync_report = report
+
+        msg = (f"✅ Database sync complete: {report['inserted']} new, {report['updated']} updated, "
+               f"{report['unchanged']} unchanged")
         print(f"[OK] {msg}")
         self.add_log(msg, 'success')
 
@@ -296,7 +395,7 @@ class AutoCallScheduler:
         print(f"[DB] {msg}")
         self.add_log(msg, 'info')
 
-        return new_count + updated_count
+        return report
 
     def make_calls_to_pending_orders(self):
         """Make calls to all pending orders (not called + retry needed)"""
@@ -313,6 +412,17 @@ class AutoCallScheduler:
             self.add_log(msg, 'warning')
             return
 
+        # A session whose worker stopped mid-way is finished from its saved plan (no re-sync, no re-plan)
+        session = call_sessions.take_over_stale()
+        resuming = session is not None
+        if not resuming:
+            session = call_sessions.start()
+            if session is None:
+                msg = "⚠️ A calling session is already running - not starting another one"
+                print(f"[SESSION] {msg}")
+                self.add_log(msg, 'warning')
+                return
+
         # Initialize session
         self.current_session = {
             'is_calling': True,
@@ -325,7 +435,37 @@ class AutoCallScheduler:
             'current_order': None,
             'logs': self.current_session.get('logs', [])  # Preserve old logs
         }
+        self.publish_session()
+
+        try:
+            with call_sessions.heartbeat(session):
+                if resuming:
+                    pending_calls = self.resume_session(session)
+                else:
+                    pending_calls = self.plan_session(session)
+
+                if pending_calls:
+                    self.dial_pending_calls(pending_calls)
+                else:
+                    msg = "No pending calls found. All orders called successfully!"
+                    print(f"[OK] {msg}")
+                    self.add_log(msg, 'success')
+                    self.current_session['is_calling'] = False
+                    self.publish_session()
+        except Exception as e:
+            call_sessions.finish(session, 'failed', error=str(e))
+            self.current_session['is_calling'] = False
+            self.publish_session()
+            raise
+
+        call_sessions.finish(session)
 
+    def plan_session(self, session):
+        """
+        Sync orders, pick the pending calls and save them as the session plan
+        Returns:
+            list: Pending calls to dial (each with its 'session_item_id')
+        """
         # STEP 1: Sync new OFD/Undelivered orders from iThink API
         msg = "🔄 STEP 1: Syncing fresh OFD/Undelivered orders from iThink..."
         print(f"[SESSION] {msg}")
@@ -333,315 +473,365 @@ class AutoCallScheduler:
         self.sync_ofd_orders()
 
         # STEP 2: Get all pending calls
+        call_sessions.set_stage(session, 'planning')
         msg = "📋 STEP 2: Identifying pending calls (not called + retry needed)..."
         print(f"[SESSION] {msg}")
         self.add_log(msg, 'info')
         pending_calls = self.get_pending_calls()
 
-        if not pending_calls:
-            msg = "No pending calls found. All orders called successfully!"
-            print(f"[OK] {msg}")
-            self.add_log(msg, 'success')
-            self.current_session['is_calling'] = False
-            return
+        if CALL_SESSION_MAX_CALLS and len(pending_calls) > CALL_SESSION_MAX_CALLS:
+            msg = (f"✂️ Session capped at {CALL_SESSION_MAX_CALLS} calls - "
+                   f"{len(pending_calls) - CALL_SESSION_MAX_CALLS} lower priority orders left for the next session")
+            print(f"[SESSION] {msg}")
+            self.add_log(msg, 'warning')
+            pending_calls = pending_calls[:CALL_SESSION_MAX_CALLS]
+
+        # Saved before the first call - a restart from here on resumes instead of dialing again
+        call_sessions.save_plan(session, pending_calls)
+        return call_sessions.pending_calls(session)
+
+    def resume_session(self, session):
+        """
+        Pick up a session left running by a stopped worker
+        Returns:
+            list: Its calls not made yet
+        """
+        interrupted = call_sessions.interrupt_in_flight(session)
+        recovered = call_sessions.recover_lost_calls(session)
+        pending_calls = call_sessions.pending_calls(session)
+
+        progress = call_sessions.progress(session)
+        with self.session_lock:
+            for key in ('total_to_call', 'completed', 'successful', 'failed', 'skipped'):
+                self.current_session[key] = progress[key]
+        self.publish_session()
+
+        msg = (f"♻️ Resuming session #{session.id} after a restart - {len(pending_calls)} calls left, "
+               f"{interrupted} interrupted calls not re-dialed, {recovered} call records recovered")
+        print(f"[SESSION] {msg}")
+        self.add_log(msg, 'warning')
+        return pending_calls
 
-        self.current_session['total_to_call'] = len(pending_calls)
+    def dial_pending_calls(self, pending_calls):
+        """STEP 3 - place the calls (dispatcher threads) and save them in bulk"""
+        if not self.current_session['total_to_call']:
+            self.current_session['total_to_call'] = len(pending_calls)
+        self.publish_session()
 
         not_called = [c for c in pending_calls if c['call_status'] == 'not_called']
         retry_needed = [c for c in pending_calls if c['call_status'] == 'retry_needed']
 
-        msg = f"📞 STEP 3: Making calls to {len(pending_calls)} orders ({len(not_called)} new + {len(retry_needed)} retry)"
+        msg = (f"📞 STEP 3: Making calls to {len(pending_calls)} orders ({len(not_called)} new + {len(retry_needed)} retry) "
+               f"- up to {VAPI_MAX_CONCURRENT_CALLS} at a time, {VAPI_CALLS_PER_SECOND}/sec")
         print(f"[CALL] {msg}")
         self.add_log(msg, 'info')
 
-        success_count = 0
-        failed_count = 0
-        skipped_count = 0
+        # Today's call counts per AWB are loaded once, rows are bulk inserted
+        self.call_buffer = CallHistoryBuffer(awbs=[c['awb'] for c in pending_calls])
+        try:
+            dispatch_calls(
+                pending_calls,
+                self.place_call,
+                max_concurrent=VAPI_MAX_CONCURRENT_CALLS,
+                calls_per_second=VAPI_CALLS_PER_SECOND,
+                should_dial=lambda call_data: is_valid_phone(call_data.get('customer_mobile'))
+            )
+        finally:
+            # Save whatever is still buffered, even if the session crashed
+            self.call_buffer.flush()
+
+        if self.call_buffer.failed:
+            msg = f"❌ {self.call_buffer.failed} call records could not be saved to database"
+            print(f"[DB ERROR] {msg}")
+            self.add_log(msg, 'error')
+            with self.session_lock:
+                self.current_session['successful'] -= self.call_buffer.failed
+                self.current_session['failed'] += self.call_buffer.failed
+            # Saved progress too - resumes and the dashboard read the items
+            call_sessions.mark_unsaved(self.call_buffer.failed_call_ids)
 
-        for call_data in pending_calls:
-            phone_number = call_data.get('customer_mobile')
+        success_count = self.current_session['successful']
+        failed_count = self.current_session['failed']
+        skipped_count = self.current_session['skipped']
 
-            # Update current order
+        # Session complete
+        self.current_session['is_calling'] = False
+        self.current_session['current_order'] = None
+        self.publish_session()
+
+        total_cost = CallHistory.objects.today().cost_summary()['total_cost']
+
+        summary = f"🎉 Session Complete! Success: {success_count} | Failed: {failed_count} | Skipped: {skipped_count} | Total Cost: ${total_cost:.4f}"
+        print(f"\n{'='*70}")
+        print(f"[STATS] {summary}")
+        print(f"{'='*70}\n")
+        self.add_log(summary, 'success')
+
+    def record_call_result(self, outcome):
+        """Bump live session counters ('successful', 'failed' or 'skipped') - safe across dispatcher threads"""
+        with self.session_lock:
+            self.current_session[outcome] += 1
+            self.current_session['completed'] += 1
+        self.publish_session()
+
+    def place_call(self, call_data):
+        """
+        Place one call and save it to CallHistory (runs on a dispatcher thread)
+        Returns:
+            str: 'successful', 'failed' or 'skipped'
+        """
+        phone_number = call_data.get('customer_mobile')
+
+        # Update current order (latest call started)
+        with self.session_lock:
             self.current_session['current_order'] = {
                 'awb': call_data.get('awb'),
                 'customer_name': call_data.get('customer_name'),
                 'retry_count': call_data.get('retry_count', 0)
             }
 
-            if not phone_number or phone_number == 'N/A':
-                msg = f"Skipping {call_data['awb']} - No phone number"
-                print(f"[SKIP] {msg}")
-                self.add_log(msg, 'warning')
-                skipped_count += 1
-                self.current_session['skipped'] = skipped_count
-                self.current_session['completed'] += 1
-                continue
-
-            retry_label = f"Retry #{call_data['retry_count']}" if call_data['retry_count'] > 0 else "First Call"
-            msg = f"📞 Calling {call_data['awb']} - {call_data['customer_name']} ({retry_label})"
-            print(f"[CALL] {msg}")
-            self.add_log(msg, 'info')
-
-            # Make call using VAPI
-            msg = f"📡 API Call: VAPI - Making call to {phone_number}"
-            print(f"[API] {msg}")
-            self.add_log(msg, 'info')
-
-            result = VAPIService.make_ofd_call(phone_number, call_data)
+        item_id = call_data.get('session_item_id')
 
-            # DEBUG: Log full VAPI response
-            print(f"[VAPI RESPONSE] Full response: {result}")
-            print(f"[VAPI RESPONSE] Has 'id'? {('id' in result)}")
-            print(f"[VAPI RESPONSE] Call ID: {result.get('id', 'MISSING!')}")
+        if not is_valid_phone(phone_number):
+            msg = f"Skipping {call_data['awb']} - No phone number"
+            print(f"[SKIP] {msg}")
+            self.add_log(msg, 'warning')
+            call_sessions.mark(item_id, 'skipped')
+            self.record_call_result('skipped')
+            return 'skipped'
 
-            if "error" in result:
-                msg = f"❌ Call failed for {call_data['awb']}: {result.get('error')}"
-                print(f"   [FAIL] {msg}")
-                self.add_log(msg, 'error')
-                failed_count += 1
-                self.current_session['failed'] = failed_count
-                self.current_session['completed'] += 1
-                continue
+        retry_label = f"Retry #{call_data['retry_count']}" if call_data['retry_count'] > 0 else "First Call"
+        msg = f"📞 Calling {call_data['awb']} - {call_data['customer_name']} ({retry_label})"
+        print(f"[CALL] {msg}")
+        self.add_log(msg, 'info')
 
-            # Check if call_id exists
-            if not result.get('id'):
-                msg = f"❌ VAPI response missing 'id' field for {call_data['awb']}"
-                print(f"   [FAIL] {msg}")
-                self.add_log(msg, 'error')
-                failed_count += 1
-                self.current_session['failed'] = failed_count
-                self.current_session['completed'] += 1
-                continue
+        # Make call using VAPI
+        msg = f"📡 API Call: VAPI - Making call to {phone_number}"
+        print(f"[API] {msg}")
+        self.add_log(msg, 'info')
 
-            # Save to database with retry count
-            msg = f"💾 Saving call record to database (Call ID: {result.get('id')[:12]}...)"
-            print(f"[DB] {msg}")
-            self.add_log(msg, 'info')
+        # Checkpoint first - if the worker stops during the request, this call is never dialed again
+        call_sessions.mark(item_id, 'dialing')
+        result = VAPIService.make_ofd_call(phone_number, call_data)
 
-            try:
-                previous_calls = CallHistory.objects.filter(
-                    awb=call_data.get('awb'),
-                    created_at__gte=datetime.combine(datetime.now().date(), dt_time.min)
-                ).count()
-
-                CallHistory.objects.create(
-                    call_id=result.get('id'),
-                    awb=call_data.get('awb', 'N/A'),
-                    customer_name=call_data.get('customer_name', 'N/A'),
-                    customer_phone=phone_number,
-                    order_type=call_data.get('order_type', 'OFD'),
-                    assistant_id=result.get('assistantId'),
-                    phone_number_id=result.get('phoneNumberId'),
-                    status=result.get('status'),
-                    call_type=result.get('type'),
-                    cost=result.get('cost', 0),
-                    ended_reason=result.get('endedReason'),
-                    retry_count=previous_calls,
-                    call_started_at=parse_datetime(result.get('createdAt')) if result.get('createdAt') else None,
-                    vapi_response=result
-                )
-                print(f"[DB] ✅ CallHistory record created successfully in database!")
-                msg = f"✅ Call successful: {call_data['awb']} | Call ID: {result.get('id')[:12]}... | Cost: ${result.get('cost', 0)}"
-                print(f"   [OK] {msg}")
-                self.add_log(msg, 'success')
-                success_count += 1
-                self.current_session['successful'] = success_count
-                self.current_session['completed'] += 1
-            except Exception as e:
-                import traceback
-                error_traceback = traceback.format_exc()
-                msg = f"❌ Database save FAILED for {call_data['awb']}: {str(e)}"
-                print(f"   [DB ERROR] {msg}")
-                print(f"   [DB ERROR] Full traceback:\n{error_traceback}")
-                self.add_log(msg, 'error')
-                failed_count += 1
-                self.current_session['failed'] = failed_count
-                self.current_session['completed'] += 1
-
-            # Small delay between calls
-            time.sleep(2)
+        # DEBUG: Log full VAPI response
+        print(f"[VAPI RESPONSE] Full response: {result}")
+        print(f"[VAPI RESPONSE] Has 'id'? {('id' in result)}")
+        print(f"[VAPI RESPONSE] Call ID: {result.get('id', 'MISSING!')}")
 
-        # Session complete
-        self.current_session['is_calling'] = False
-        self.current_session['current_order'] = None
+        if "error" in result:
+            msg = f"❌ Call failed for {call_data['awb']}: {result.get('error')}"
+            print(f"   [FAIL] {msg}")
+            self.add_log(msg, 'error')
+            call_sessions.mark(item_id, 'failed')
+            self.record_call_result('failed')
+            return 'failed'
+
+        # Check if call_id exists
+        if not result.get('id'):
+            msg = f"❌ VAPI response missing 'id' field for {call_data['awb']}"
+            print(f"   [FAIL] {msg}")
+            self.add_log(msg, 'error')
+            call_sessions.mark(item_id, 'failed')
+            self.record_call_result('failed')
+            return 'failed'
 
-        total_cost = sum([call.cost for call in CallHistory.objects.filter(
-            created_at__gte=datetime.combine(datetime.now().date(), dt_time.min)
-        )])
+        # Call placed - its id is saved right away so a restart can recover the buffered record
+        call_sessions.mark(item_id, 'successful', call_id=result.get('id'))
 
-        summary = f"🎉 Session Complete! Success: {success_count} | Failed: {failed_count} | Skipped: {skipped_count} | Total Cost: ${total_cost:.4f}"
-        print(f"\n{'='*70}")
-        print(f"[STATS] {summary}")
-        print(f"{'='*70}\n")
-        self.add_log(summary, 'success')
+        # Queue call record for the next bulk insert
+        msg = f"💾 Saving call record to database (Call ID: {result.get('id')[:12]}...)"
+        print(f"[DB] {msg}")
+        self.add_log(msg, 'info')
 
-    def run_scheduler(self):
-        """Run the scheduler in background"""
-        while self.running:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        try:
+            self.call_buffer.add(CallHistory(
+                call_id=result.get('id'),
+                awb=call_data.get('awb', 'N/A'),
+                customer_name=call_data.get('customer_name', 'N/A'),
+                customer_phone=phone_number,
+                order_type=call_data.get('order_type', 'OFD'),
+                assistant_id=result.get('assistantId'),
+                phone_number_id=result.get('phoneNumberId'),
+                status=result.get('status'),
+                call_type=result.get('type'),
+                cost=result.get('cost', 0),
+                ended_reason=result.get('endedReason'),
+                retry_count=self.call_buffer.next_retry_count(call_data.get('awb')),
+                call_started_at=parse_datetime(result.get('createdAt')) if result.get('createdAt') else None,
+                vapi_response=result
+            ))
+            msg = f"✅ Call successful: {call_data['awb']} | Call ID: {result.get('id')[:12]}... | Cost: ${result.get('cost', 0)}"
+            print(f"   [OK] {msg}")
+            self.add_log(msg, 'success')
+            self.record_call_result('successful')
+            return 'successful'
+        except Exception as e:
+            import traceback
+            error_traceback = traceback.format_exc()
+            msg = f"❌ Database save FAILED for {call_data['awb']}: {str(e)}"
+            print(f"   [DB ERROR] {msg}")
+            print(f"   [DB ERROR] Full traceback:\n{error_traceback}")
+            self.add_log(msg, 'error')
+            self.record_call_result('failed')
+            return 'failed'
 
     def cleanup_daily_data(self):
         """Delete all orders and call history - Fresh start every night at 11:00 PM"""
-        from django.core.cache import cache
+        from .response_cache import clear as clear_response_cache
 
         print("\n" + "="*70)
         print("DAILY CLEANUP - 11:00 PM")
         print("="*70)
 
-        # Delete ALL call history
-        call_deleted = CallHistory.objects.all().delete()[0]
+        # One tombstone insert + one version bump per table, dashboard rows refreshed once at the end
+        with read_model.batch():
+            # Delete ALL call history
+            call_deleted = tombstones.delete(CallHistory.objects.all(), 'call')
 
-        # Delete all OFD/Undelivered orders
-        order_deleted = Order.objects.filter(
-            order_type__in=['OFD', 'Undelivered']
+            # Delete all OFD/Undelivered orders
+            order_deleted = tombstones.delete(Order.objects.filter(
+                order_type__in=['OFD', 'Undelivered']
+            ), 'order')
+
+        # Clear ALL Django cache - this process and the shared cache every worker serves from
+        clear_response_cache()
+
+        # Drop expired tracking results
+        tracking_deleted = tracking_cache.delete_expired()
+
+        # Drop processed webhook events
+        webhook_deleted = WebhookEvent.objects.filter(
+            processed_at__lt=timezone.now() - timedelta(days=WEBHOOK_EVENT_RETENTION_DAYS)
+        ).delete()[0]
+
+        # Drop deletion records delta clients can no longer ask about
+        tombstone_deleted = Tombstone.objects.filter(
+            deleted_at__lt=timezone.now() - timedelta(hours=TOMBSTONE_RETENTION_HOURS)
         ).delete()[0]
 
-        # Clear ALL Django cache
-        cache.clear()
+        # Drop old job run and call session history
+        job_runs_deleted = jobs.prune_history()
+        CallSession.objects.filter(
+            started_at__lt=timezone.now() - timedelta(days=JOB_HISTORY_DAYS)
+        ).exclude(status='running').delete()
 
         print(f"✓ Deleted {order_deleted} orders")
         print(f"✓ Deleted {call_deleted} call history records")
         print(f"✓ Cleared all cache (OFD orders, call history, etc.)")
+        print(f"✓ Deleted {tracking_deleted} expired tracking results")
+        print(f"✓ Deleted {webhook_deleted} processed webhook events")
+        print(f"✓ Deleted {tombstone_deleted} old tombstones")
+        print(f"✓ Deleted {job_runs_deleted} old job runs")
         print(f"✓ Fresh start! Ready for new day")
         print(f"   Next cleanup: Tomorrow 11:00 PM")
         print("="*70 + "\n")
 
-    def extract_missing_recordings(self):
-        """
-        Extract recordings from vapi_response for calls that don't have recording_url yet
-        This is a fallback in case webhooks don't catch recordings
-        """
-        # NOTE: recording_url field doesn't exist in CallHistory model yet
-        # This function is placeholder for future enhancement
-        return
-
-        # Find calls with vapi_response but no recording_url
-        calls = CallHistory.objects.filter(
-            vapi_response__isnull=False
-        )
-
-        if calls.count() == 0:
-            return
-
-        print(f"\n[EXTRACT RECORDINGS] Found {calls.count()} calls")
-
-        updated_count = 0
-        for call in calls:
-            # Extract recording URL (check multiple locations)
-            recording_url = (
-                call.vapi_response.get('recordingUrl') or
-                call.vapi_response.get('stereoRecordingUrl') or
-                call.vapi_response.get('artifact', {}).get('recordingUrl') or
-                call.vapi_response.get('artifact', {}).get('stereoRecordingUrl') or
-                call.vapi_response.get('artifact', {}).get('recording', {}).get('mono', {}).get('combinedUrl')
-            )
-
-            # Extract transcript
-            transcript = (
-                call.vapi_response.get('transcript') or
-                call.vapi_response.get('artifact', {}).get('transcript')
-            )
-
-            if recording_url or transcript:
-                if recording_url:
-                    call.recording_url = recording_url
-                if transcript:
-                    call.transcript = transcript
-
-                call.save()
-                updated_count += 1
-                print(f"[EXTRACT] Updated {call.awb} - Recording: {'Yes' if recording_url else 'No'} | Transcript: {'Yes' if transcript else 'No'}")
-
-        if updated_count > 0:
-            print(f"[EXTRACT RECORDINGS] Extracted {updated_count} recordings")
+    def reconcile_open_calls(self):
+        """Update today's not-ended calls from VAPI's call list"""
+        report = reconcile_calls()
+        if report['fetched'] or report['error']:
+            msg = (f"🔄 Reconciled calls: {report['updated']} updated, {report['unchanged']} unchanged "
+                   f"({report['pages']} VAPI list requests)")
+            if report['error']:
+                msg += f" - {report['error']}"
+            print(f"[RECONCILE] {msg}")
+        return report
+
+    def refresh_dashboard_caches(self):
+        """Rebuild hot dashboard payloads (OFD list, call history) so requests don't wait for it"""
+        from . import views  # noqa: F401 (registers the payload builders)
+        from .response_cache import refresh_hot
+
+        rebuilt = refresh_hot()
+        if rebuilt:
+            print(f"[CACHE] Refreshed {', '.join(rebuilt)}")
+        return rebuilt
 
     def start_hourly_scheduler(self):
         """Start hourly scheduler - calls 4 times per day (10:30 AM, 11 AM, 12 PM, 1 PM)"""
-        if self.running:
-            print("⚠ Scheduler already running")
-            return
-
-        schedule.clear()
-
-        # Schedule daily cleanup at 11:00 PM (night time to avoid data loss during working hours)
-        schedule.every().day.at("23:00").do(self.cleanup_daily_data)
-
-        # Pre-sync jobs: 10 minutes before each call session
-        # This fetches fresh OFD/Undelivered data before calls start
-        schedule.every().day.at("10:20").do(self.sync_ofd_orders)  # 10 min before 10:30
-        schedule.every().day.at("10:50").do(self.sync_ofd_orders)  # 10 min before 11:00
-        schedule.every().day.at("11:50").do(self.sync_ofd_orders)  # 10 min before 12:00
-        schedule.every().day.at("12:50").do(self.sync_ofd_orders)  # 10 min before 1:00
-
-        # Schedule calls at 10:30 AM, 11 AM, 12 PM, 1 PM
-        # Smart filtering prevents duplicate/spam calls
-        schedule.every().day.at("10:30").do(self.make_calls_to_pending_orders)
-        schedule.every().day.at("11:00").do(self.make_calls_to_pending_orders)
-        schedule.every().day.at("12:00").do(self.make_calls_to_pending_orders)
-        schedule.every().day.at("13:00").do(self.make_calls_to_pending_orders)
-
-        # Extract missing recordings every 10 minutes (fallback if webhook misses)
-        schedule.every(10).minutes.do(self.extract_missing_recordings)
-
-        self.running = True
-        self.thread = threading.Thread(target=self.run_scheduler, daemon=True)
-        self.thread.start()
+        # Jobs live in the database - this turns them on for every node running the job runner
+        jobs.set_times('make_calls', None)
+        jobs.set_enabled(True)
 
         print(f"[OK] Hourly Auto Call Scheduler Started")
         print(f"   Daily cleanup: 11:00 PM (auto delete all data)")
         print(f"   Pre-sync times: 10:20 AM, 10:50 AM, 11:50 AM, 12:50 PM (10 min before calls)")
         print(f"   Calling times: 10:30 AM, 11:00 AM, 12:00 PM, 1:00 PM (4 sessions)")
-        print(f"   Recording extraction: Every 10 minutes (auto-extract missing recordings)")
         print(f"   Smart filtering: 2-hour cooldown + duplicate prevention")
         print(f"   Current time: {datetime.now().strftime('%H:%M:%S')}")
 
     def start(self, time_str=None):
         """
         Start the scheduler
-        If time_str is provided, schedule once at that time
+        If time_str is provided, calls run once a day at that time
         Otherwise, start hourly scheduler (10 AM - 1 PM)
         """
         if time_str:
-            # Legacy mode - single time
-            if self.running:
-                print("⚠ Scheduler already running")
-                return
-
-            schedule.clear()
-            schedule.every().day.at(time_str).do(self.make_calls_to_pending_orders)
-            self.running = True
-            self.thread = threading.Thread(target=self.run_scheduler, daemon=True)
-            self.thread.start()
+            # Legacy mode - single call time (ValueError if not HH:MM)
+            jobs.set_times('make_calls', [time_str])
+            jobs.set_enabled(True)
             print(f"[OK] Scheduler started - Calls at {time_str} daily")
         else:
             # Hourly mode (10 AM - 1 PM)
             self.start_hourly_scheduler()
 
     def stop(self):
-        """Stop the scheduler"""
-        self.running = False
-        schedule.clear()
+        """Stop the scheduler (all scheduled jobs, on every node)"""
+        jobs.set_enabled(False)
         print("[OK] Auto call scheduler stopped")
 
     def get_status(self):
         """Get scheduler status with live session data"""
-        next_runs = []
-        for job in schedule.jobs:
-            next_runs.append(str(job.next_run))
+        scheduled_jobs = jobs.status()
+        next_runs = sorted(job['next_run'] for job in scheduled_jobs if job['next_run'])
+        make_calls = next(job for job in scheduled_jobs if job['name'] == 'make_calls')
+
+        # Today's session as saved in the database - the same whichever worker answers
+        live_session = call_sessions.live_session()
+        if live_session is None:
+            # No session today - this worker's logs (e.g. outside calling hours)
+            # Snapshot so dispatcher threads can't change it while it's serialized
+            with self.session_lock:
+                live_session = dict(self.current_session, logs=list(self.current_session['logs']))
 
         return {
-            'running': self.running,
-            'mode': 'hourly' if self.hourly_mode else 'single',
+            'running': any(job['enabled'] for job in scheduled_jobs),
+            'mode': 'hourly' if make_calls['times'] == CALL_TIMES else 'single',
             'cleanup_time': '23:00',  # Daily cleanup at 11:00 PM
-            'scheduled_times': ['10:30', '11:00', '12:00', '13:00'] if self.hourly_mode else [],
+            'scheduled_times': make_calls['times'],
             'next_runs': next_runs,
+            'jobs': scheduled_jobs,  # Per job: enabled, times, next run, last run (which node, status)
+            'job_runner': {'worker': jobs.WORKER, 'embedded': jobs.runner_alive()},
             'current_time': datetime.now().strftime('%H:%M:%S'),
 
             # Live session data
-            'live_session': self.current_session
+            'live_session': live_session,
+            'last_sync_report': self.last_sync_report,
+
+            # HTTP connection pool reuse (iThink / VAPI)
+            'http_connections': get_connection_stats(),
+
+            # Tracking cache hits/misses (today first)
+            'tracking_cache': tracking_cache.get_stats(days=7)
         }
 
 
 # Global scheduler instance
 auto_call_scheduler = AutoCallScheduler()
+
+# Scheduled jobs (run by jobs.run_forever - embedded in the web workers or the run_jobs command)
+# Daily cleanup at 11:00 PM (night time to avoid data loss during working hours)
+jobs.register('cleanup_daily_data', auto_call_scheduler.cleanup_daily_data, times=['23:00'], long_running=True)
+# Pre-sync jobs: 10 minutes before each call session (fresh OFD/Undelivered data before calls start)
+jobs.register('sync_ofd_orders', auto_call_scheduler.sync_ofd_orders, times=PRE_SYNC_TIMES, long_running=True)
+# Calls at 10:30 AM, 11 AM, 12 PM, 1 PM - smart filtering prevents duplicate/spam calls
+jobs.register('make_calls', auto_call_scheduler.make_calls_to_pending_orders, times=CALL_TIMES,
+              long_running=True)
+# Catch up on call updates the webhook missed (one VAPI list request per 100 calls)
+jobs.register('reconcile_open_calls', auto_call_scheduler.reconcile_open_calls,
+              every_minutes=RECONCILE_INTERVAL_MINUTES)
+# Keep dashboard caches warm
+if DASHBOARD_REFRESH_ENABLED:
+    jobs.register('refresh_dashboard_caches', auto_call_scheduler.refresh_dashboard_caches,
+                  every_minutes=DASHBOARD_REFRESH_MINUTES)
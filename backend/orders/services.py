@@ -1,22 +1,223 @@
+import queue
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from .constants import (
+    BATCH_SIZE,
+    TRACK_MAX_WORKERS,
+    ORDER_DETAILS_MAX_WORKERS,
+    ORDER_DETAILS_RETRIES,
+    ORDER_DETAILS_QUEUE_SIZE,
+    STREAM_CHUNK_SIZE,
+    ITHINK_CONNECT_TIMEOUT,
+    ITHINK_API_TIMEOUT,
+)
+from .http_client import get_ithink_session
+from . import tracking_cache
+from .json_stream import iter_object_items
+
+
+# (connect, read) timeout for iThink requests
+ITHINK_TIMEOUT = (ITHINK_CONNECT_TIMEOUT, ITHINK_API_TIMEOUT)
 
 
 class IThinkService:
     """Service to interact with iThink Logistics API"""
 
     @staticmethod
-    def get_orders_by_date_range(start_date, end_date):
+    def get_orders_by_date_range(start_date, end_date, max_workers=ORDER_DETAILS_MAX_WORKERS):
         """
         Get orders for a date range from iThink Order Details API
+        Fetched in parallel one-day windows (see iter_orders_by_date_range).
+        Prefer iter_orders_by_date_range() when the caller filters the orders -
+        this method keeps every order of the range in memory.
         Args:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
+            max_workers: Maximum number of days fetched at the same time
         Returns:
-            dict: API response data with order details
+            dict: Merged API response data with order details,
+                  'failed_days' lists the days that could not be fetched
         """
-        payload = {
+        report = {}
+        data = dict(IThinkService._iter_order_details(start_date, end_date, max_workers, report))
+        return IThinkService._date_range_result(report, data=data)
+
+    @staticmethod
+    def iter_orders_by_date_range(start_date, end_date, max_workers=ORDER_DETAILS_MAX_WORKERS, report=None):
+        """
+        Stream orders for a date range from iThink Order Details API
+        The range is split into one-day windows downloaded concurrently; each
+        response is decoded one AWB at a time while it downloads, so callers can
+        filter without holding the full payload. Failed days are retried on their
+        own, so one slow day doesn't fail the whole range.
+        Args:
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            max_workers: Maximum number of days downloaded at the same time
+            report: Optional dict, filled with 'days' and 'failed_days' when done
+        Yields:
+            dict: Normalized order record (see normalize_order_record)
+        """
+        for awb, order in IThinkService._iter_order_details(start_date, end_date, max_workers, report):
+            yield IThinkService.normalize_order_record(awb, order)
+
+    @staticmethod
+    def date_range_error(report):
+        """
+        Error dict for a streamed date range where every day failed
+        Returns:
+            dict or None: Same shape as a failed get_orders_by_date_range() call
+        """
+        return IThinkService._date_range_result(report) if IThinkService._all_days_failed(report) else None
+
+    @staticmethod
+    def normalize_order_record(awb, order):
+        """Common field names for an Order Details API record ('raw' keeps the original)"""
+        return {
+            'awb': awb,
+            'customer_name': order.get('customer_name', 'N/A'),
+            'customer_mobile': order.get('customer_phone') or order.get('customer_mobile') or 'N/A',
+            'customer_address': order.get('customer_address', 'N/A'),
+            'customer_pincode': order.get('customer_pincode', 'N/A'),
+            'order_date': order.get('order_date', 'N/A'),
+            'awb_created_date': order.get('awb_created_date'),
+            'pickup_type': order.get('pickup_type'),
+            'latest_courier_status': order.get('latest_courier_status') or '',
+            'cod_amount': order.get('total_amount', 'N/A'),
+            'weight': order.get('phy_weight', 'N/A'),
+            'tracking_url': f'https://www.ithinklogistics.co.in/postship/tracking/{awb}',
+            'raw': order
+        }
+
+    @staticmethod
+    def _all_days_failed(report):
+        return bool(report.get('days')) and len(report.get('failed_days', [])) == len(report['days'])
+
+    @staticmethod
+    def _date_range_result(report, data=None):
+        """Build the get_orders_by_date_range() response from a stream report"""
+        if IThinkService._all_days_failed(report):
+            # Every day failed - surface the error like a single failed request
+            error_detail = dict(report.get('first_error') or {})
+            error_detail.setdefault('error', error_detail.get('message') or 'Order details request failed')
+            error_detail['failed_days'] = report['failed_days']
+            return error_detail
+
+        return {
+            'status': 'success',
+            'data': data if data is not None else {},
+            'failed_days': report.get('failed_days', [])
+        }
+
+    @staticmethod
+    def _split_days(start_date, end_date):
+        """One (start, end) window per day of the range - whole range if dates can't be parsed"""
+        try:
+            first_day = datetime.strptime(start_date, '%Y-%m-%d').date()
+            last_day = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return [(start_date, end_date)]
+
+        days = []
+        for offset in range((last_day - first_day).days + 1):
+            day = (first_day + timedelta(days=offset)).strftime('%Y-%m-%d')
+            days.append((day, day))
+        return days or [(start_date, end_date)]
+
+    @staticmethod
+    def _iter_order_details(start_date, end_date, max_workers, report=None):
+        """
+        Yield raw (awb, order) pairs for the range, downloading day windows concurrently
+        At most ORDER_DETAILS_QUEUE_SIZE decoded orders wait between the download
+        threads and the caller, which caps memory held while streaming.
+        """
+        if report is None:
+            report = {}
+
+        windows = IThinkService._split_days(start_date, end_date)
+        report['days'] = [window[0] for window in windows]
+        report['failed_days'] = []
+
+        seen_awbs = set()  # A retried day may re-send AWBs already yielded
+        pending_windows = windows
+        failed_windows = []
+
+        for attempt in range(ORDER_DETAILS_RETRIES + 1):
+            records = queue.Queue(maxsize=ORDER_DETAILS_QUEUE_SIZE)
+            stop = threading.Event()
+
+            def put(item):
+                # Give up waiting if the caller stopped iterating
+                while not stop.is_set():
+                    try:
+                        records.put(item, timeout=1)
+                        return True
+                    except queue.Full:
+                        continue
+                return False
+
+            def download(window):
+                meta = {}
+                response = None
+                try:
+                    response = get_ithink_session().post(
+                        settings.ITHINK_ORDER_LIST_URL,
+                        json=IThinkService._order_details_payload(*window),
+                        timeout=ITHINK_TIMEOUT,
+                        stream=True
+                    )
+                    response.raise_for_status()
+                    chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                    for awb, order in iter_object_items(chunks, 'data', meta):
+                        if not put(('order', awb, order)):
+                            return
+                    error = None if meta.get('status') == 'success' else (meta or {'error': 'Invalid response'})
+                except Exception as e:  # Any failure must still report 'done' to the consumer
+                    error = {"error": str(e), "status_code": 500}
+                finally:
+                    if response is not None:
+                        response.close()
+                put(('done', window, error))
+
+            failed_windows = []
+            executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending_windows))))
+            try:
+                for window in pending_windows:
+                    executor.submit(download, window)
+
+                remaining = len(pending_windows)
+                while remaining:
+                    item = records.get()
+                    if item[0] == 'order':
+                        _, awb, order = item
+                        if awb not in seen_awbs:
+                            seen_awbs.add(awb)
+                            yield awb, order
+                        continue
+
+                    _, window, error = item
+                    remaining -= 1
+                    if error:
+                        report.setdefault('first_error', error)
+                        failed_windows.append(window)
+            finally:
+                stop.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+
+            if not failed_windows:
+                break
+
+            print(f"[IThink API] Order details failed for {sorted(w[0] for w in failed_windows)} (attempt {attempt + 1})")
+            pending_windows = failed_windows
+
+        report['failed_days'] = sorted(window[0] for window in failed_windows)
+
+    @staticmethod
+    def _order_details_payload(start_date, end_date):
+        return {
             "data": {
                 "start_date": start_date,
                 "end_date": end_date,
@@ -25,13 +226,6 @@ class IThinkService:
             }
         }
 
-        try:
-            response = requests.post(settings.ITHINK_ORDER_LIST_URL, json=payload, timeout=60)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"error": str(e), "status_code": 500}
-
     @staticmethod
     def get_today_orders():
         """
@@ -52,34 +246,101 @@ class IThinkService:
         }
 
         try:
-            response = requests.post(settings.ITHINK_ORDER_LIST_URL, json=payload, timeout=60)
+            response = get_ithink_session().post(settings.ITHINK_ORDER_LIST_URL, json=payload, timeout=ITHINK_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return {"error": str(e), "status_code": 500}
 
     @staticmethod
-    def track_orders(awb_numbers):
+    def track_orders(awb_numbers, max_workers=TRACK_MAX_WORKERS, use_cache=True):
         """
         Track orders using iThink API
+        Fresh results are served from the tracking cache; only cache misses are
+        split into batches of BATCH_SIZE (iThink limit) and tracked concurrently,
+        so any number of AWBs can be passed in.
         Args:
             awb_numbers: List of AWB numbers or comma-separated string
+            max_workers: Maximum number of batches tracked at the same time
+            use_cache: Serve/store results from the tracking cache
         Returns:
-            dict: API response data
+            dict: Merged API response - 'data' holds tracking info of all AWBs,
+                  'failed_batches' lists the batches that could not be tracked
         """
-        if isinstance(awb_numbers, list):
-            awb_numbers = ','.join(awb_numbers)
+        if isinstance(awb_numbers, str):
+            awb_numbers = awb_numbers.split(',')
+
+        # Remove blanks and duplicates, keep original order
+        awb_numbers = list(dict.fromkeys(str(awb).strip() for awb in awb_numbers if str(awb).strip()))
+
+        cached_data = tracking_cache.get_fresh(awb_numbers) if use_cache else {}
+        misses = [awb for awb in awb_numbers if awb not in cached_data]
+        batches = [misses[i:i + BATCH_SIZE] for i in range(0, len(misses), BATCH_SIZE)]
+
+        if len(batches) == 1:
+            results = [(batches[0], IThinkService._track_batch(batches[0]))]
+        elif batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+                futures = {executor.submit(IThinkService._track_batch, batch): batch for batch in batches}
+                results = [(futures[future], future.result()) for future in as_completed(futures)]
+        else:
+            results = []
+
+        fetched_data = {}
+        failed_batches = []
+        first_error = None
+
+        for batch, result in results:
+            if "error" in result or result.get('status') != 'success':
+                first_error = first_error or result
+                failed_batches.append({
+                    'awbs': batch,
+                    'error': result.get('error') or result.get('message') or 'Unknown error',
+                    'status_code': result.get('status_code')
+                })
+                continue
+            fetched_data.update(result.get('data') or {})
+
+        if use_cache and awb_numbers:
+            tracking_cache.store(fetched_data)
+            tracking_cache.record_stats(hits=len(cached_data), misses=len(misses), api_requests=len(batches))
+
+        if failed_batches:
+            print(f"[IThink API] {len(failed_batches)}/{len(batches)} tracking batches failed")
 
+        # Nothing cached and every batch failed - surface the error like a single failed request
+        if batches and len(failed_batches) == len(batches) and not cached_data:
+            error_detail = dict(first_error)
+            error_detail.setdefault('error', error_detail.get('message') or 'Tracking failed')
+            error_detail['failed_batches'] = failed_batches
+            return error_detail
+
+        return {
+            'status': 'success',
+            'status_code': 200,
+            'data': {**cached_data, **fetched_data},
+            'failed_batches': failed_batches
+        }
+
+    @staticmethod
+    def _track_batch(awb_numbers):
+        """
+        Track a single batch of AWBs (max BATCH_SIZE) with one iThink API request
+        Args:
+            awb_numbers: List of AWB numbers
+        Returns:
+            dict: Raw API response data or error detail
+        """
         payload = {
             "data": {
-                "awb_number_list": awb_numbers,
+                "awb_number_list": ','.join(awb_numbers),
                 "access_token": settings.ITHINK_ACCESS_TOKEN,
                 "secret_key": settings.ITHINK_SECRET_KEY
             }
         }
 
         try:
-            response = requests.post(settings.ITHINK_API_URL, json=payload, timeout=60)
+            response = get_ithink_session().post(settings.ITHINK_API_URL, json=payload, timeout=ITHINK_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.HTTPError as e:
@@ -212,60 +473,61 @@ class IThinkService:
         }
 
     @staticmethod
-    def filter_undelivered_orders(orders_list, batch_size=10):
+    def filter_undelivered_orders(orders_list):
         """
         Filter out delivered orders by checking their status via Track API
-        Process in batches for efficiency
+        All AWBs are tracked in one concurrent batched call
         Returns only undelivered orders
         """
         undelivered_orders = []
 
-        # Process in batches
-        for i in range(0, len(orders_list), batch_size):
-            batch = orders_list[i:i + batch_size]
-            awb_numbers = [order['awb'] for order in batch]
+        track_result = IThinkService.track_orders([order['awb'] for order in orders_list])
 
-            # Track this batch
-            track_result = IThinkService.track_orders(awb_numbers)
+        if "error" in track_result:
+            # If tracking fails, include all orders (safer to show than hide)
+            return list(orders_list)
 
-            if "error" in track_result or track_result.get('status') != 'success':
-                # If tracking fails, include all orders in batch (safer to show than hide)
-                undelivered_orders.extend(batch)
-                continue
+        # Get tracking data
+        tracking_data = track_result.get('data', {})
 
-            # Get tracking data
-            tracking_data = track_result.get('data', {})
+        # AWBs whose batch failed are kept as-is (safer to show than hide)
+        failed_awbs = {awb for batch in track_result.get('failed_batches', []) for awb in batch['awbs']}
+
+        # Check each order
+        for order in orders_list:
+            awb = order['awb']
+
+            if awb in failed_awbs:
+                undelivered_orders.append(order)
+                continue
 
-            # Check each order in the batch
-            for order in batch:
-                awb = order['awb']
-                track_info = tracking_data.get(awb, {})
+            track_info = tracking_data.get(awb, {})
 
-                # Get current status
-                current_status = track_info.get('current_status', '').lower().strip()
+            # Get current status
+            current_status = track_info.get('current_status', '').lower().strip()
 
-                # Statuses to filter out (Delivered, RTO, Lost, Damaged, Cancelled)
-                # Check if status starts with rto or contains rto, or is delivered
-                is_rto = 'rto' in current_status
-                is_delivered = 'delivered' in current_status
-                is_lost = 'lost' in current_status
-                is_damaged = 'damaged' in current_status
-                is_cancelled = 'cancel' in current_status
-                is_destroyed = 'destroyed' in current_status or 'disposed' in current_status
+            # Statuses to filter out (Delivered, RTO, Lost, Damaged, Cancelled)
+            # Check if status starts with rto or contains rto, or is delivered
+            is_rto = 'rto' in current_status
+            is_delivered = 'delivered' in current_status
+            is_lost = 'lost' in current_status
+            is_damaged = 'damaged' in current_status
+            is_cancelled = 'cancel' in current_status
+            is_destroyed = 'destroyed' in current_status or 'disposed' in current_status
 
-                # Only include if NOT in any ignore category
-                should_ignore = is_rto or is_delivered or is_lost or is_damaged or is_cancelled or is_destroyed
+            # Only include if NOT in any ignore category
+            should_ignore = is_rto or is_delivered or is_lost or is_damaged or is_cancelled or is_destroyed
 
-                if not should_ignore:
-                    # Add tracking info to order
-                    order['current_status'] = track_info.get('current_status', 'Unknown')
+            if not should_ignore:
+                # Add tracking info to order
+                order['current_status'] = track_info.get('current_status', 'Unknown')
 
-                    # Add scan history if available
-                    if 'track_history' in track_info:
-                        order['scan_history'] = track_info['track_history']
-                        if track_info['track_history']:
-                            order['last_scan'] = track_info['track_history'][0]
+                # Add scan history if available
+                if 'track_history' in track_info:
+                    order['scan_history'] = track_info['track_history']
+                    if track_info['track_history']:
+                        order['last_scan'] = track_info['track_history'][0]
 
-                    undelivered_orders.append(order)
+                undelivered_orders.append(order)
 
         return undelivered_orders
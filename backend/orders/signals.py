@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import cache_versions, read_model, tombstones
+from .models import CallHistory, Order, Tombstone
+
+
+# Single-instance deletes - bulk deletes go through tombstones.delete() (one insert + one bump)
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    """Remember deleted orders so delta clients remove them (the dashboard row is deleted with the order)"""
+    if tombstones.in_bulk_delete():
+        return
+    Tombstone.objects.create(kind='order', awb=instance.awb)
+    cache_versions.bump(cache_versions.ORDERS)
+
+
+@receiver(post_delete, sender=CallHistory)
+def call_deleted(sender, instance, **kwargs):
+    """Remember deleted calls so delta clients refresh the order's call history"""
+    if tombstones.in_bulk_delete():
+        return
+    Tombstone.objects.create(kind='call', awb=instance.awb)
+    read_model.refresh_rows([instance.awb])
+    cache_versions.bump(cache_versions.CALLS)
+
+
+# Bulk writes (bulk_create/bulk_update/update) don't send these - they call
+# read_model.refresh_rows() and cache_versions.bump() themselves
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, **kwargs):
+    read_model.refresh_rows([instance.awb])
+    cache_versions.bump(cache_versions.ORDERS)
+
+
+@receiver(post_save, sender=CallHistory)
+def call_saved(sender, instance, **kwargs):
+    read_model.refresh_rows([instance.awb])
+    cache_versions.bump(cache_versions.CALLS)
@@ -0,0 +1,374 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+from .constants import (
+    JOB_MAX_ATTEMPTS,
+    JOB_STALE_SECONDS,
+    SYNC_JOB_COOLDOWN_SECONDS,
+    TOMBSTONE_RETENTION_HOURS,
+    WEBHOOK_CLAIM_STALE_SECONDS,
+)
+from .models import CallHistory, JobRun, OFDDashboardRow, Order, SyncJob, WebhookEvent
+from .views import make_cursor
+from . import cache_versions, jobs, ofd_sync, reconcile, response_cache, tombstones, webhook_queue
+
+
+class VAPIWebhookTests(TestCase):
+    """end-of-call-report deliveries applied by the webhook consumer"""
+
+    def setUp(self):
+        self.client = APIClient()
+        CallHistory.objects.create(
+            call_id='call-1', awb='AWB1', customer_name='Test', customer_phone='9999999999',
+            order_type='OFD', status='queued'
+        )
+
+    def post_end_of_call_report(self, call):
+        # No consumer thread in tests - events are applied with process_pending() below
+        with mock.patch.object(webhook_queue, 'start_consumer'):
+            response = self.client.post('/api/orders/vapi-webhook/', {
+                'message': {'type': 'end-of-call-report', 'call': {'id': 'call-1', 'status': 'ended', **call}}
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        report = webhook_queue.process_pending()
+        self.assertEqual(report['calls_updated'], 1)
+        return CallHistory.objects.get(call_id='call-1')
+
+    def test_successful_call_sets_retry_flags(self):
+        call = self.post_end_of_call_report({
+            'endedReason': 'customer-ended-call',
+            'analysis': {'successEvaluation': True, 'summary': 'Customer will accept the delivery'},
+        })
+        self.assertEqual(call.success_evaluation, 'true')
+        self.assertTrue(call.is_successful)
+        self.assertFalse(call.needs_retry)
+
+    def test_busy_call_needs_retry(self):
+        call = self.post_end_of_call_report({'endedReason': 'customer-busy'})
+        self.assertFalse(call.is_successful)
+        self.assertTrue(call.needs_retry)
+
+
+class WebhookQueueTests(TestCase):
+    """Each worker runs a consumer - every event must still be applied once"""
+
+    def setUp(self):
+        for n in (1, 2):
+            CallHistory.objects.create(call_id=f'call-{n}', awb=f'AWB{n}', customer_name='Test',
+                                       customer_phone='9999999999', order_type='OFD', status='queued')
+        with mock.patch.object(webhook_queue, 'start_consumer'):
+            for n in (1, 2):
+                webhook_queue.enqueue({'message': {'type': 'status-update',
+                                                   'call': {'id': f'call-{n}', 'status': 'in-progress'}}})
+
+    def test_claimed_events_are_not_taken_by_another_consumer(self):
+        with mock.patch.object(webhook_queue, 'WORKER', 'worker-a'):
+            claimed = webhook_queue._claim(10)
+        with mock.patch.object(webhook_queue, 'WORKER', 'worker-b'):
+            self.assertEqual(webhook_queue._claim(10), [])
+            self.assertEqual(webhook_queue.process_pending()['events'], 0)
+        self.assertEqual(len(claimed), 2)
+
+    def test_stale_claims_are_taken_over(self):
+        with mock.patch.object(webhook_queue, 'WORKER', 'worker-a'):
+            webhook_queue._claim(10)
+        WebhookEvent.objects.update(claimed_at=timezone.now() - timedelta(seconds=WEBHOOK_CLAIM_STALE_SECONDS + 1))
+
+        report = webhook_queue.process_pending()
+        self.assertEqual(report['calls_updated'], 2)
+        self.assertFalse(WebhookEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_cache_version_bumped_once_per_batch(self):
+        before = cache_versions.current(cache_versions.CALLS)
+        self.assertEqual(webhook_queue.process_pending()['calls_updated'], 2)
+        self.assertEqual(int(cache_versions.current(cache_versions.CALLS)), int(before) + 1)
+        self.assertEqual(CallHistory.objects.get(call_id='call-2').status, 'in-progress')
+
+
+class OFDSyncFallbackTests(TestCase):
+    """Empty database -> background iThink sync, but not again right after one finished"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user('staff', password='x'))
+
+    def finished_job(self, status, seconds_ago):
+        return SyncJob.objects.create(
+            kind=ofd_sync.KIND, status=status, stage='done',
+            finished_at=timezone.now() - timedelta(seconds=seconds_ago)
+        )
+
+    def get_orders(self):
+        # Sync thread not started - only whether a job is enqueued matters here
+        with mock.patch.object(ofd_sync.threading, 'Thread') as thread:
+            response = self.client.get('/api/orders/ofd/')
+        return response, thread
+
+    def test_done_with_no_orders_does_not_reenqueue(self):
+        self.finished_job('done', seconds_ago=5)
+
+        response, thread = self.get_orders()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['orders'], [])
+        self.assertNotIn('syncing', response.data)
+        thread.assert_not_called()
+        self.assertEqual(SyncJob.objects.count(), 1)
+
+    def test_failed_sync_is_not_retried_within_cooldown(self):
+        self.finished_job('failed', seconds_ago=5)
+
+        response, thread = self.get_orders()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['sync']['status'], 'failed')
+        thread.assert_not_called()
+
+    def test_enqueues_after_cooldown(self):
+        self.finished_job('done', seconds_ago=SYNC_JOB_COOLDOWN_SECONDS + 5)
+
+        response, thread = self.get_orders()
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.data['syncing'])
+        thread.assert_called_once()
+        self.assertEqual(SyncJob.objects.filter(status='running').count(), 1)
+
+
+class ResponseCacheTests(TestCase):
+    """Previous version served while rebuilding - but never after it's gone or uncacheable"""
+
+    def setUp(self):
+        response_cache.clear()
+        response_cache.store('slot:1', {'orders': ['old']}, 60, group='slot', version='1')
+
+    def test_uncacheable_rebuild_drops_previous_version(self):
+        data, meta, status_code = response_cache._rebuild('slot', '2', lambda: ({'syncing': True}, 202), 60)
+        self.assertEqual(status_code, 202)
+        self.assertIsNone(meta)
+        self.assertIsNone(response_cache._last_key('slot'))
+
+    def test_cleanup_clears_shared_cache(self):
+        # Another worker's copy lives in the shared cache only
+        response_cache.cache.clear()
+        self.assertEqual(response_cache._last_key('slot'), 'slot:1')
+
+        response_cache.clear()
+        self.assertIsNone(response_cache._last_key('slot'))
+        self.assertIsNone(response_cache.shared_cache.get('slot:1'))
+
+
+class ReconcilePagingTests(TestCase):
+    """Paging back through VAPI's call list (100 per page, newest first)"""
+
+    def setUp(self):
+        self.now = timezone.now().replace(microsecond=0)
+        tied = self.now - timedelta(minutes=10)
+        # 60 newer calls, 60 sharing one createdAt across the page boundary, 20 older
+        self.vapi_calls = (
+            [self.vapi_call(f'new-{n}', self.now - timedelta(seconds=n + 1)) for n in range(60)] +
+            [self.vapi_call(f'tied-{n}', tied) for n in range(60)] +
+            [self.vapi_call(f'old-{n}', tied - timedelta(seconds=n + 1)) for n in range(20)]
+        )
+
+    @staticmethod
+    def vapi_call(call_id, created_at):
+        return {'id': call_id, 'status': 'ended', 'endedReason': 'customer-ended-call',
+                'createdAt': reconcile._to_vapi_time(created_at)}
+
+    def list_calls(self, limit=100, created_at_gt=None, created_at_lt=None, created_at_le=None):
+        """Fake VAPI GET /call - filters on createdAt like the API, newest first"""
+        def created(call):
+            return parse_datetime(call['createdAt'])
+        result = [call for call in self.vapi_calls
+                  if (not created_at_gt or created(call) > parse_datetime(created_at_gt)) and
+                  (not created_at_lt or created(call) < parse_datetime(created_at_lt)) and
+                  (not created_at_le or created(call) <= parse_datetime(created_at_le))]
+        return sorted(result, key=created, reverse=True)[:limit]
+
+    def test_calls_sharing_the_page_boundary_are_all_fetched(self):
+        with mock.patch.object(reconcile.VAPIService, 'list_calls', side_effect=self.list_calls):
+            calls, pages, error = reconcile.fetch_calls_since(self.now - timedelta(hours=1))
+        self.assertIsNone(error)
+        self.assertEqual(pages, 2)
+        self.assertEqual(len(calls), 140)
+
+    def test_full_page_of_ties_stops_with_an_error(self):
+        tied = self.now - timedelta(minutes=10)
+        self.vapi_calls = [self.vapi_call(f'tied-{n}', tied) for n in range(150)]
+        with mock.patch.object(reconcile.VAPIService, 'list_calls', side_effect=self.list_calls):
+            calls, pages, error = reconcile.fetch_calls_since(self.now - timedelta(hours=1))
+        self.assertIsNotNone(error)
+
+    def test_full_pass_updates_open_calls_and_saves_cursor(self):
+        CallHistory.objects.create(call_id='tied-59', awb='AWB1', customer_name='Test',
+                                   customer_phone='9999999999', order_type='OFD', status='queued',
+                                   call_started_at=self.now - timedelta(minutes=10))
+        with mock.patch.object(reconcile.VAPIService, 'list_calls', side_effect=self.list_calls):
+            report = reconcile.reconcile_calls()
+
+        self.assertEqual(report['updated'], 1)
+        self.assertEqual(CallHistory.objects.get(call_id='tied-59').status, 'ended')
+        # Everything listed has ended - the next pass starts shortly before this one
+        self.assertGreater(jobs.get_cursor(reconcile.CURSOR_NAME), self.now - timedelta(minutes=6))
+
+
+class JobRunnerTests(TestCase):
+    """Each slot of a scheduled job runs on one node - and again on another if that node dies"""
+
+    def setUp(self):
+        self.runs = []
+        # Only the test job is registered while these tests run
+        patcher = mock.patch.dict(jobs._jobs, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        jobs.register('test_job', lambda: self.runs.append(jobs.WORKER),
+                      times=[timezone.localtime().strftime('%H:%M')])
+        self.slot = jobs.due_slot('test_job', None, timezone.localtime())
+
+    def stale_run(self, attempts=1):
+        return JobRun.objects.create(
+            name='test_job', scheduled_for=self.slot, worker='dead-host:1', attempts=attempts,
+            heartbeat_at=timezone.now() - timedelta(seconds=JOB_STALE_SECONDS + 1)
+        )
+
+    def test_slot_is_claimed_once(self):
+        self.assertIsNotNone(jobs._claim('test_job', self.slot))
+        self.assertIsNone(jobs._claim('test_job', self.slot))
+
+    def test_due_job_runs_once_per_slot(self):
+        self.assertEqual(jobs.run_pending(inline=True), ['test_job'])
+        self.assertEqual(jobs.run_pending(inline=True), [])
+        self.assertEqual(len(self.runs), 1)
+        self.assertEqual(JobRun.objects.get(name='test_job').status, 'done')
+
+    def test_stale_run_is_taken_over(self):
+        self.stale_run()
+
+        self.assertEqual(jobs._requeue_stale(inline=True), ['test_job'])
+        run = JobRun.objects.get(name='test_job')
+        self.assertEqual((run.status, run.worker, run.attempts), ('done', jobs.WORKER, 2))
+        self.assertEqual(len(self.runs), 1)
+
+    def test_stale_run_out_of_attempts_is_marked_failed(self):
+        self.stale_run(attempts=JOB_MAX_ATTEMPTS)
+
+        self.assertEqual(jobs._requeue_stale(inline=True), [])
+        self.assertEqual(JobRun.objects.get(name='test_job').status, 'failed')
+        self.assertEqual(self.runs, [])
+
+
+class OFDDeltaTests(TestCase):
+    """GET /api/orders/ofd/?since=<cursor> - changed orders plus AWBs to remove"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user('staff', password='x'))
+        for awb in ('AWB1', 'AWB2', 'AWB3', 'AWB4'):
+            Order.objects.create(awb=awb, order_type='OFD', customer_name='Test', customer_mobile='9999999999')
+        CallHistory.objects.create(call_id='call-3', awb='AWB3', customer_name='Test',
+                                   customer_phone='9999999999', order_type='OFD', status='ended')
+        # Everything so far happened well before the cursor
+        long_ago = timezone.now() - timedelta(hours=1)
+        Order.objects.update(updated_at=long_ago)
+        CallHistory.objects.update(updated_at=long_ago)
+        self.since = make_cursor(timezone.now() - timedelta(minutes=10))
+
+    def get_delta(self, since):
+        response = self.client.get('/api/orders/ofd/', {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_changes_and_deletions_since_cursor(self):
+        tombstones.delete(Order.objects.filter(awb='AWB1'), 'order')  # Bulk delete
+        Order.objects.get(awb='AWB2').delete()  # Single delete (post_delete tombstone)
+        tombstones.delete(CallHistory.objects.filter(awb='AWB3'), 'call')  # Order stays, call is gone
+        Order.objects.create(awb='AWB5', order_type='Undelivered', customer_name='New')
+
+        data = self.get_delta(self.since)
+        self.assertFalse(data['full_resync'])
+        self.assertEqual(data['removed'], ['AWB1', 'AWB2'])
+        self.assertEqual(sorted(order['awb'] for order in data['orders']), ['AWB3', 'AWB5'])
+        self.assertEqual((data['total_count'], data['ofd_count'], data['undelivered_count']), (3, 2, 1))
+
+    def test_order_no_longer_ofd_is_removed(self):
+        order = Order.objects.get(awb='AWB4')
+        order.order_type = 'Delivered'
+        order.save()
+
+        data = self.get_delta(self.since)
+        self.assertEqual(data['removed'], ['AWB4'])
+        self.assertEqual(data['orders'], [])
+
+    def test_cursor_older_than_tombstones_asks_for_full_resync(self):
+        data = self.get_delta(make_cursor(timezone.now() - timedelta(hours=TOMBSTONE_RETENTION_HOURS + 1)))
+        self.assertTrue(data['full_resync'])
+        self.assertNotIn('orders', data)
+
+
+class CallHistoryPagingTests(TestCase):
+    """Keyset pages of today's calls - no call skipped or repeated, even with equal created_at"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user('staff', password='x'))
+        for n in range(5):
+            CallHistory.objects.create(call_id=f'call-{n}', awb=f'AWB{n}', customer_name='Test',
+                                       customer_phone='9999999999', order_type='OFD', status='ended')
+        # Three calls share a created_at - pages must be split on the id as well
+        same_time = CallHistory.objects.get(call_id='call-1').created_at
+        CallHistory.objects.filter(call_id__in=['call-1', 'call-2', 'call-3']).update(created_at=same_time)
+
+    def get_page(self, **params):
+        response = self.client.get('/api/orders/call-history/', {'fields': 'call_id', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_cover_every_call_once(self):
+        call_ids = []
+        params = {'limit': 2}
+        while True:
+            data = self.get_page(**params)
+            self.assertEqual(data['count'], 5)
+            call_ids += [call['call_id'] for call in data['calls']]
+            if not data['has_more']:
+                break
+            params['cursor'] = data['next_cursor']
+
+        self.assertEqual(len(call_ids), 5)
+        self.assertEqual(set(call_ids), {f'call-{n}' for n in range(5)})
+        self.assertIsNone(data['next_cursor'])
+
+    def test_only_requested_fields_are_returned(self):
+        data = self.get_page(limit=1)
+        self.assertEqual(list(data['calls'][0]), ['call_id'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/orders/call-history/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CallTextTests(TestCase):
+    """Summary/transcript stay out of the dashboard rows - loaded for one call at a time"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user('staff', password='x'))
+        Order.objects.create(awb='AWB1', order_type='OFD', customer_name='Test', customer_mobile='9999999999')
+        CallHistory.objects.create(call_id='call-1', awb='AWB1', customer_name='Test', customer_phone='9999999999',
+                                   order_type='OFD', status='ended', summary='Will accept', transcript='AI: Hello')
+
+    def test_dashboard_row_has_no_call_text(self):
+        call_history = OFDDashboardRow.objects.get(order__awb='AWB1').call_history
+        self.assertEqual(call_history['call_id'], 'call-1')
+        self.assertNotIn('transcript', call_history)
+        self.assertNotIn('summary', call_history)
+
+    def test_call_detail_returns_call_text(self):
+        response = self.client.get('/api/orders/call-history/call-1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'call_id': 'call-1', 'summary': 'Will accept', 'transcript': 'AI: Hello'})
+
+        self.assertEqual(self.client.get('/api/orders/call-history/missing/').status_code, 404)
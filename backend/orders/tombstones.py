@@ -0,0 +1,44 @@
+import threading
+from django.db import transaction
+from .models import Tombstone
+from . import cache_versions, read_model
+
+
+_bulk = threading.local()
+
+
+def in_bulk_delete():
+    """True while delete() runs - post_delete receivers leave the bookkeeping to it"""
+    return getattr(_bulk, 'active', False)
+
+
+def delete(queryset, kind):
+    """
+    Delete Order / CallHistory rows as one operation: tombstones in one bulk_create and one
+    version bump, instead of a tombstone + bump (+ dashboard refresh) per row from post_delete
+    Args:
+        queryset: Order or CallHistory rows to delete
+        kind: 'order' or 'call'
+    Returns:
+        int: Rows of the queryset's model deleted
+    """
+    with transaction.atomic():
+        awbs = set(queryset.values_list('awb', flat=True))
+        if not awbs:
+            return 0
+
+        _bulk.active = True
+        try:
+            deleted = queryset.delete()[1].get(queryset.model._meta.label, 0)
+        finally:
+            _bulk.active = False
+
+        Tombstone.objects.bulk_create([Tombstone(kind=kind, awb=awb) for awb in awbs], batch_size=500)
+
+    if kind == 'call':
+        read_model.refresh_rows(awbs)
+        cache_versions.bump(cache_versions.CALLS)
+    else:
+        # Dashboard rows are deleted with their orders
+        cache_versions.bump(cache_versions.ORDERS)
+    return deleted
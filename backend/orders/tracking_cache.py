@@ -0,0 +1,94 @@
+import math
+from datetime import timedelta
+from django.db.models import F
+from django.utils import timezone
+from .models import TrackingResult, TrackingCacheStats
+from .constants import (
+    BATCH_SIZE,
+    CLEANUP_STATUSES,
+    TRACKING_CACHE_TTL_TERMINAL,
+    TRACKING_CACHE_TTL_OFD,
+    TRACKING_CACHE_TTL_DEFAULT,
+)
+
+
+def ttl_for_status(current_status):
+    """Cache lifetime (seconds) for a tracking result with this status"""
+    status_lower = (current_status or '').lower()
+
+    # Check OFD/undelivered first - 'undelivered' also contains 'delivered'
+    if 'out for delivery' in status_lower or 'undelivered' in status_lower or 'ofd' in status_lower:
+        return TRACKING_CACHE_TTL_OFD
+    if any(terminal in status_lower for terminal in CLEANUP_STATUSES):
+        return TRACKING_CACHE_TTL_TERMINAL
+    return TRACKING_CACHE_TTL_DEFAULT
+
+
+def get_fresh(awb_numbers):
+    """
+    Get cached tracking info that has not expired yet
+    Returns:
+        dict: {awb: tracking info} for cache hits only
+    """
+    if not awb_numbers:
+        return {}
+
+    rows = TrackingResult.objects.filter(
+        awb__in=awb_numbers,
+        expires_at__gt=timezone.now()
+    ).values_list('awb', 'data')
+    return dict(rows)
+
+
+def store(tracking_data):
+    """Save fresh tracking info ({awb: tracking info}) with a status based TTL"""
+    now = timezone.now()
+    rows = []
+    for awb, track_info in tracking_data.items():
+        # Only cache real tracking results, not per-AWB error messages
+        if not isinstance(track_info, dict) or not track_info.get('current_status'):
+            continue
+        current_status = track_info.get('current_status')
+        rows.append(TrackingResult(
+            awb=awb,
+            current_status=current_status[:100],
+            data=track_info,
+            fetched_at=now,
+            expires_at=now + timedelta(seconds=ttl_for_status(current_status))
+        ))
+
+    if rows:
+        TrackingResult.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['awb'],
+            update_fields=['current_status', 'data', 'fetched_at', 'expires_at']
+        )
+
+
+def record_stats(hits, misses, api_requests):
+    """Add one track_orders() call to today's hit/miss counters"""
+    # Requests that would have been needed without the cache
+    requests_without_cache = math.ceil((hits + misses) / BATCH_SIZE)
+
+    today = timezone.localdate()
+    TrackingCacheStats.objects.bulk_create([TrackingCacheStats(date=today)], ignore_conflicts=True)
+    TrackingCacheStats.objects.filter(date=today).update(
+        hits=F('hits') + hits,
+        misses=F('misses') + misses,
+        api_requests=F('api_requests') + api_requests,
+        api_requests_saved=F('api_requests_saved') + max(requests_without_cache - api_requests, 0)
+    )
+
+
+def get_stats(days=7):
+    """Hit/miss counters for the last few days (most recent first)"""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return list(TrackingCacheStats.objects.filter(date__gte=since).values(
+        'date', 'hits', 'misses', 'api_requests', 'api_requests_saved'
+    ))
+
+
+def delete_expired():
+    """Remove expired tracking results, returns number of rows deleted"""
+    return TrackingResult.objects.filter(expires_at__lte=timezone.now()).delete()[0]
@@ -8,10 +8,13 @@ from .views import (
     OFDOrdersView,
     MakeCallView,
     CallHistoryView,
+    CallDetailView,
     SchedulerControlView,
     VAPIWebhookView,
     CleanupDeliveredView,
-    PollCallStatusView
+    PollCallStatusView,
+    ReconcileCallsView,
+    SchedulerEventsView
 )
 from .auth_views import (
     RegisterView,
@@ -36,9 +39,13 @@ urlpatterns = [
     path('orders/track/', TrackOrderView.as_view(), name='track-order'),
     path('orders/make-call/', MakeCallView.as_view(), name='make-call'),
     path('orders/call-history/', CallHistoryView.as_view(), name='call-history'),
+    path('orders/call-history/<str:call_id>/', CallDetailView.as_view(), name='call-detail'),
     path('orders/scheduler/', SchedulerControlView.as_view(), name='scheduler-control'),
+    # Live session progress by long-poll (?after=<event id>&wait=<seconds>)
+    path('orders/scheduler/events/', SchedulerEventsView.as_view(), name='scheduler-events'),
     path('orders/cleanup-delivered/', CleanupDeliveredView.as_view(), name='cleanup-delivered'),
     path('orders/poll-call-status/', PollCallStatusView.as_view(), name='poll-call-status'),
+    path('orders/reconcile-calls/', ReconcileCallsView.as_view(), name='reconcile-calls'),
 
     # Public endpoints (no auth required)
     path('orders/vapi-webhook/', VAPIWebhookView.as_view(), name='vapi-webhook'),
@@ -1,6 +1,12 @@
 import requests
 import os
 from django.conf import settings
+from .constants import VAPI_CONNECT_TIMEOUT, VAPI_API_TIMEOUT
+from .http_client import get_vapi_session
+
+
+# (connect, read) timeout for VAPI requests
+VAPI_TIMEOUT = (VAPI_CONNECT_TIMEOUT, VAPI_API_TIMEOUT)
 
 
 class VAPIService:
@@ -56,11 +62,11 @@ class VAPIService:
             }
 
         try:
-            response = requests.post(
+            response = get_vapi_session().post(
                 VAPIService.VAPI_API_URL,
                 json=payload,
                 headers=headers,
-                timeout=30
+                timeout=VAPI_TIMEOUT
             )
 
             # Check response status
@@ -137,10 +143,10 @@ class VAPIService:
         }
 
         try:
-            response = requests.get(
+            response = get_vapi_session().get(
                 f'https://api.vapi.ai/call/{call_id}',
                 headers=headers,
-                timeout=30
+                timeout=VAPI_TIMEOUT
             )
 
             if response.status_code != 200:
@@ -159,13 +165,15 @@ class VAPIService:
             return {'error': f'Unexpected error: {str(e)}'}
 
     @staticmethod
-    def list_calls(limit=100, created_at_gt=None):
+    def list_calls(limit=100, created_at_gt=None, created_at_lt=None, created_at_le=None):
         """
-        Get list of calls from VAPI API (batch fetch)
+        Get list of calls from VAPI API (batch fetch, newest first)
 
         Args:
             limit: Number of calls to fetch (max 100)
             created_at_gt: ISO timestamp to filter calls created after
+            created_at_lt: ISO timestamp to filter calls created before
+            created_at_le: ISO timestamp to filter calls created at or before (for paging back)
 
         Returns:
             list: List of call objects
@@ -186,13 +194,17 @@ class VAPIService:
 
         if created_at_gt:
             params['createdAtGt'] = created_at_gt
+        if created_at_lt:
+            params['createdAtLt'] = created_at_lt
+        if created_at_le:
+            params['createdAtLe'] = created_at_le
 
         try:
-            response = requests.get(
+            response = get_vapi_session().get(
                 'https://api.vapi.ai/call',
                 headers=headers,
                 params=params,
-                timeout=30
+                timeout=VAPI_TIMEOUT
             )
 
             if response.status_code != 200:
@@ -4,15 +4,30 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny
 from .services import IThinkService
 from .vapi_service import VAPIService
-from .models import CallHistory, Order
+from .models import CallHistory, OFDDashboardRow, Order, Tombstone
+from . import read_model, ofd_sync
+from .read_model import OFD_ORDER_TYPES, CALL_TEXT_FIELDS
 from .scheduler import auto_call_scheduler
+from . import webhook_queue
+from .reconcile import reconcile_calls
+from . import live_events
+from . import response_cache, cache_versions
 from .demo_data import get_demo_ready_to_dispatch, get_demo_in_transit
-from datetime import datetime, timedelta
+from .constants import (
+    LONG_POLL_MAX_SECONDS, LONG_POLL_MAX_WAITERS,
+    DELTA_OVERLAP_SECONDS, TOMBSTONE_RETENTION_HOURS, CALL_HISTORY_PAGE_SIZE, CALL_HISTORY_MAX_PAGE_SIZE,
+    CACHE_TIMEOUT_OFD, CACHE_TIMEOUT_CALL_HISTORY
+)
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from django.core.cache import cache
-from django.db.models import Q
+import base64
+import hashlib
+import json
+import threading
+from django.db.models import Count, Q
 
 
 class TodayOrdersView(APIView):
@@ -44,23 +59,15 @@ class ReadyToDispatchView(APIView):
         # Check if user wants verified (filtered) data
         verified = request.GET.get('verified', 'false').lower() == 'true'
 
-        orders_result = IThinkService.get_orders_by_date_range(start_date, end_date)
-
-        if "error" in orders_result:
-            return Response(get_demo_ready_to_dispatch(), status=status.HTTP_200_OK)
-
-        # Order Details API returns data as dict with AWB as keys
-        if orders_result.get('status') != 'success' or 'data' not in orders_result:
-            return Response(get_demo_ready_to_dispatch(), status=status.HTTP_200_OK)
-
-        orders_data = orders_result['data']
-
-        # Collect only Manifested orders (not all forward orders)
+        # Collect only Manifested orders (not all forward orders) while the orders stream in
         manifested_orders = []
+        report = {}
+
+        for record in IThinkService.iter_orders_by_date_range(start_date, end_date, report=report):
+            awb = record['awb']
 
-        for awb, order in orders_data.items():
             # Get order date and check if within last 5 days
-            order_date_str = order.get('order_date', '')
+            order_date_str = record['raw'].get('order_date', '')
             if order_date_str:
                 try:
                     order_date = datetime.strptime(order_date_str[:10], '%Y-%m-%d').date()
@@ -74,62 +81,61 @@ class ReadyToDispatchView(APIView):
                     continue
 
             # Only include forward orders (exclude RTO, reverse, etc.)
-            if order.get('pickup_type') == 'forward':
+            if record['pickup_type'] == 'forward':
                 manifested_orders.append({
                     'awb': awb,
-                    'tracking_url': f'https://www.ithinklogistics.co.in/postship/tracking/{awb}',
+                    'tracking_url': record['tracking_url'],
                     'status': 'Manifested',
-                    'customer_name': order.get('customer_name', 'N/A'),
-                    'customer_mobile': order.get('customer_phone', 'N/A'),
-                    'customer_address': order.get('customer_address', 'N/A'),
-                    'customer_pincode': order.get('customer_pincode', 'N/A'),
-                    'order_date': order.get('order_date', 'N/A'),
-                    'weight': order.get('phy_weight', 'N/A'),
-                    'cod_amount': order.get('total_amount', 'N/A'),
+                    'customer_name': record['customer_name'],
+                    'customer_mobile': record['customer_mobile'],
+                    'customer_address': record['customer_address'],
+                    'customer_pincode': record['customer_pincode'],
+                    'order_date': record['order_date'],
+                    'weight': record['weight'],
+                    'cod_amount': record['cod_amount'],
                     'last_scan': {}
                 })
 
+        if IThinkService.date_range_error(report):
+            return Response(get_demo_ready_to_dispatch(), status=status.HTTP_200_OK)
+
         # Track orders to filter only Manifested status
         if verified and manifested_orders:
             manifested_only = []
-            batch_size = 30  # Increased from 10 to 30 for fewer API calls
-
-            for i in range(0, len(manifested_orders), batch_size):
-                batch = manifested_orders[i:i + batch_size]
-                awb_numbers = [order['awb'] for order in batch]
-
-                track_result = IThinkService.track_orders(awb_numbers)
-
-                if track_result.get('status') == 'success' and 'data' in track_result:
-                    tracking_data = track_result['data']
-
-                    for order in batch:
-                        awb = order['awb']
-                        if awb in tracking_data:
-                            track_info = tracking_data[awb]
-                            current_status = track_info.get('current_status', '').lower()
-
-                            # Debug: Print actual status from tracking API
-                            print(f"AWB: {awb} | Status: {track_info.get('current_status')}")
-
-                            # Only include if status is strictly "manifested" - not in transit, not out for delivery, not delivered
-                            # Status should only contain "manifest" keyword, nothing else like "transit", "delivery", "pickup", etc.
-                            is_manifested = (
-                                'manifest' in current_status and
-                                'transit' not in current_status and
-                                'delivery' not in current_status and
-                                'delivered' not in current_status and
-                                'pickup' not in current_status and
-                                'ofd' not in current_status and
-                                'rto' not in current_status
-                            )
-
-                            if is_manifested:
-                                order['current_status'] = track_info.get('current_status')
-                                order['last_scan'] = track_info.get('last_scan_details', {})
-                                manifested_only.append(order)
-                            else:
-                                print(f"  [X] Rejected - is_manifested = False")
+
+            # Track all AWBs at once - batched and concurrent inside the service
+            track_result = IThinkService.track_orders([order['awb'] for order in manifested_orders])
+
+            if track_result.get('status') == 'success' and 'data' in track_result:
+                tracking_data = track_result['data']
+
+                for order in manifested_orders:
+                    awb = order['awb']
+                    if awb in tracking_data:
+                        track_info = tracking_data[awb]
+                        current_status = track_info.get('current_status', '').lower()
+
+                        # Debug: Print actual status from tracking API
+                        print(f"AWB: {awb} | Status: {track_info.get('current_status')}")
+
+                        # Only include if status is strictly "manifested" - not in transit, not out for delivery, not delivered
+                        # Status should only contain "manifest" keyword, nothing else like "transit", "delivery", "pickup", etc.
+                        is_manifested = (
+                            'manifest' in current_status and
+                            'transit' not in current_status and
+                            'delivery' not in current_status and
+                            'delivered' not in current_status and
+                            'pickup' not in current_status and
+                            'ofd' not in current_status and
+                            'rto' not in current_status
+                        )
+
+                        if is_manifested:
+                            order['current_status'] = track_info.get('current_status')
+                            order['last_scan'] = track_info.get('last_scan_details', {})
+                            manifested_only.append(order)
+                        else:
+                            print(f"  [X] Rejected - is_manifested = False")
 
             result = {
                 'count': len(manifested_only),
@@ -165,29 +171,20 @@ class InTransitView(APIView):
         # Check if user wants verified (filtered) data
         verified = request.GET.get('verified', 'false').lower() == 'true'
 
-        orders_result = IThinkService.get_orders_by_date_range(start_date, end_date)
-
-        if "error" in orders_result:
-            return Response(get_demo_in_transit(), status=status.HTTP_200_OK)
-
-        # Order Details API returns data as dict with AWB as keys
-        if orders_result.get('status') != 'success' or 'data' not in orders_result:
-            return Response(get_demo_in_transit(), status=status.HTTP_200_OK)
-
-        orders_data = orders_result['data']
-
-        # Process all orders and show them as "In Transit"
+        # Process orders while they stream in - only delayed orders are kept
+        # (both the quick and the verified response show delayed orders only)
         transit_orders = []
+        report = {}
 
-        for awb, order in orders_data.items():  # Process all orders
+        for record in IThinkService.iter_orders_by_date_range(start_date, end_date, report=report):
             # Calculate estimated delivery
             is_delayed = False
             estimated_delivery = 'N/A'
 
             # Try to parse awb_created_date as estimated delivery (assume 3 days)
-            if order.get('awb_created_date'):
+            if record['awb_created_date']:
                 try:
-                    created = datetime.strptime(order['awb_created_date'][:10], '%Y-%m-%d')
+                    created = datetime.strptime(record['awb_created_date'][:10], '%Y-%m-%d')
                     estimated = created + timedelta(days=3)
                     estimated_delivery = estimated.strftime('%Y-%m-%d')
                     if estimated.date() < today:
@@ -195,23 +192,29 @@ class InTransitView(APIView):
                 except ValueError:
                     pass
 
+            if not is_delayed:
+                continue
+
             transit_orders.append({
-                'awb': awb,
-                'tracking_url': f'https://www.ithinklogistics.co.in/postship/tracking/{awb}',
+                'awb': record['awb'],
+                'tracking_url': record['tracking_url'],
                 'status': 'In Transit',
-                'customer_name': order.get('customer_name', 'N/A'),
-                'customer_mobile': order.get('customer_phone', 'N/A'),
-                'customer_address': order.get('customer_address', 'N/A'),
-                'customer_pincode': order.get('customer_pincode', 'N/A'),
-                'order_date': order.get('order_date', 'N/A'),
+                'customer_name': record['customer_name'],
+                'customer_mobile': record['customer_mobile'],
+                'customer_address': record['customer_address'],
+                'customer_pincode': record['customer_pincode'],
+                'order_date': record['order_date'],
                 'estimated_delivery_date': estimated_delivery,
                 'is_delayed': is_delayed,
-                'weight': order.get('phy_weight', 'N/A'),
-                'cod_amount': order.get('total_amount', 'N/A'),
+                'weight': record['weight'],
+                'cod_amount': record['cod_amount'],
                 'last_scan': {},
                 'scan_history': []
             })
 
+        if IThinkService.date_range_error(report):
+            return Response(get_demo_in_transit(), status=status.HTTP_200_OK)
+
         # If verified=false, return quick unfiltered data
         if not verified:
             # Only show delayed orders (but not verified for delivery status yet)
@@ -225,7 +228,7 @@ class InTransitView(APIView):
             return Response(result, status=status.HTTP_200_OK)
 
         # If verified=true, filter out delivered orders using Track API
-        undelivered_orders = IThinkService.filter_undelivered_orders(transit_orders, batch_size=30)
+        undelivered_orders = IThinkService.filter_undelivered_orders(transit_orders)
 
         # Only keep delayed orders (estimated delivery passed but not delivered)
         delayed_undelivered = [
@@ -247,6 +250,15 @@ class InTransitView(APIView):
         return Response(result, status=status.HTTP_200_OK)
 
 
+def ofd_orders_version():
+    return cache_versions.current(cache_versions.ORDERS, cache_versions.CALLS)
+
+
+def make_cursor(moment):
+    """Delta cursor = epoch milliseconds of the moment the data was read"""
+    return int(moment.timestamp() * 1000)
+
+
 class OFDOrdersView(APIView):
     """
     API endpoint to get Out For Delivery (OFD) and Undelivered orders
@@ -254,454 +266,162 @@ class OFDOrdersView(APIView):
     """
 
     def get(self, request):
-        # OPTION 1: Check if user wants to bypass cache with ?refresh=true
-        bypass_cache = request.GET.get('refresh', 'false').lower() == 'true'
+        # Only what changed since a cursor of an earlier response
+        if 'since' in request.GET:
+            return self.get_delta(request)
 
-        # Check cache first (30 minutes cache - increased from 5)
-        cache_key = 'ofd_orders_data'
+        # Empty database - the answer depends on the background sync, not on cached versions
+        if not Order.objects.filter(order_type__in=OFD_ORDER_TYPES).exists():
+            result, status_code = self.build()
+            return Response(result, status=status_code)
 
-        if not bypass_cache:
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                print("[OFD] Returning cached data")
-                return Response(cached_data, status=status.HTTP_200_OK)
+        # OPTION 1: Check if user wants to bypass cache with ?refresh=true
+        bypass_cache = request.GET.get('refresh', 'false').lower() == 'true'
 
-        print(f"[OFD] {'Cache bypassed - ' if bypass_cache else ''}Fetching fresh data from database...")
+        # Cache key changes whenever orders or calls change
+        version = ofd_orders_version()
+
+        if bypass_cache:
+            print("[OFD] Cache bypassed - rebuilding")
+            result, status_code = self.build()
+            if status_code != status.HTTP_200_OK:
+                return Response(result, status=status_code)
+            meta = response_cache.store(f'ofd_orders_data:{version}', result, CACHE_TIMEOUT_OFD,
+                                        group='ofd_orders_data', version=version)
+            return response_cache.respond(request, result, meta)
+
+        # Cached copy / single-flight rebuild (others get the previous list meanwhile)
+        return response_cache.serve(request, 'ofd_orders_data', version, self.build, CACHE_TIMEOUT_OFD)
+
+    @staticmethod
+    def build():
+        """
+        Build the OFD/Undelivered list from the database (202 + sync progress while the background
+        iThink sync fills an empty database)
+        Returns:
+            tuple: (result, status_code)
+        """
+        print("[OFD] Fetching fresh data from database...")
+
+        # Taken before reading so changes made while we build the list are sent again as deltas
+        cursor = make_cursor(timezone.now())
 
         # STEP 1: First, try to get from DATABASE (saved by scheduler)
         db_orders = Order.objects.filter(Q(order_type='OFD') | Q(order_type='Undelivered'))
 
-        if db_orders.exists():
-            print(f"[OFD] Found {db_orders.count()} orders in database")
-            # Use database orders (already filtered and saved by scheduler)
-            ofd_undelivered_orders = []
-            ofd_count = 0
-            undelivered_count = 0
-
-            for db_order in db_orders:
-                order_dict = {
-                    'awb': db_order.awb,
-                    'customer_name': db_order.customer_name,
-                    'customer_mobile': db_order.customer_mobile,
-                    'customer_address': db_order.customer_address,
-                    'customer_pincode': db_order.customer_pincode,
-                    'cod_amount': db_order.cod_amount,
-                    'weight': db_order.weight,
-                    'order_date': db_order.order_date,
-                    'tracking_url': db_order.tracking_url,
-                    'current_status': db_order.current_status,
-                    'order_type': db_order.order_type,
-                    'last_scan': db_order.last_scan or {}
-                }
-
-                ofd_undelivered_orders.append(order_dict)
-
-                if db_order.order_type == 'OFD':
-                    ofd_count += 1
-                else:
-                    undelivered_count += 1
-
-            # Add call history (keep existing logic)
-            all_awbs = [order['awb'] for order in ofd_undelivered_orders]
-            all_call_histories = CallHistory.objects.filter(awb__in=all_awbs).order_by('awb', '-created_at')
-
-            # Group call histories by AWB
-            call_history_map = {}
-            for call in all_call_histories:
-                if call.awb not in call_history_map:
-                    call_history_map[call.awb] = {'latest': call, 'count': 0}
-                call_history_map[call.awb]['count'] += 1
-
-            # Add call history for each order
-            for order in ofd_undelivered_orders:
-                awb = order['awb']
-                call_data = call_history_map.get(awb)
-                call_history = call_data['latest'] if call_data else None
-                call_count = call_data['count'] if call_data else 0
-
-                if call_history:
-                    # Extract data from VAPI response
-                    success_evaluation = None
-                    recording_url = None
-                    transcript = None
-                    summary = None
-
-                    if call_history.vapi_response and isinstance(call_history.vapi_response, dict):
-                        vapi_resp = call_history.vapi_response
-
-                        # Extract success evaluation
-                        analysis = vapi_resp.get('analysis', {})
-                        if analysis and isinstance(analysis, dict):
-                            success_evaluation = analysis.get('successEvaluation')
-                            summary = analysis.get('summary')
-
-                        # Extract recording URL
-                        recording_url = (
-                            vapi_resp.get('recordingUrl') or
-                            vapi_resp.get('stereoRecordingUrl') or
-                            vapi_resp.get('artifact', {}).get('recordingUrl') or
-                            vapi_resp.get('artifact', {}).get('stereoRecordingUrl') or
-                            vapi_resp.get('artifact', {}).get('recording', {}).get('combinedUrl')
-                        )
-
-                        # Extract transcript
-                        transcript = (
-                            vapi_resp.get('transcript') or
-                            vapi_resp.get('artifact', {}).get('transcript')
-                        )
+        # A background sync (DB was empty) saves orders as it goes - show what it has so far
+        job = ofd_sync.active_job()
 
-                    # Format last call time
-                    from django.utils.timezone import localtime
-                    last_call_time = localtime(call_history.created_at).strftime('%b %d, %I:%M %p') if call_history.created_at else None
-
-                    # Convert success_evaluation to pass/fail format
-                    success_eval_formatted = None
-                    if success_evaluation is not None:
-                        eval_str = str(success_evaluation).lower()
-                        if eval_str == 'true':
-                            success_eval_formatted = 'pass'
-                        elif eval_str == 'false':
-                            success_eval_formatted = 'fail'
-                        else:
-                            success_eval_formatted = eval_str
-
-                    order['call_history'] = {
-                        'has_been_called': True,
-                        'call_count': call_count,
-                        'last_call_time': last_call_time,
-                        'call_id': call_history.call_id,
-                        'status': call_history.status,
-                        'duration': call_history.duration,
-                        'cost': call_history.cost,
-                        'ended_reason': call_history.ended_reason,
-                        'success_evaluation': success_eval_formatted,
-                        'recording_url': recording_url,
-                        'transcript': transcript,
-                        'summary': summary,
-                        'call_started_at': call_history.call_started_at,
-                        'call_ended_at': call_history.call_ended_at,
-                        'retry_count': call_history.retry_count,
-                        'is_successful': call_history.is_successful,
-                        'needs_retry': call_history.needs_retry,
-                        'created_at': call_history.created_at
-                    }
+        if not db_orders.exists() and not job:
+            # STEP 2: Database is empty - sync from the iThink API in the background, never in the request
+            # (unless a sync just finished - then there simply are no orders, shown until the cooldown passes)
+            job = ofd_sync.recently_finished() or ofd_sync.enqueue()
+            if job and job.status != 'running':
+                if job.status == 'failed':
+                    print(f"[OFD ERROR] Background sync failed: {job.error}")
                 else:
-                    order['call_history'] = {
-                        'has_been_called': False,
-                        'call_count': 0,
-                        'last_call_time': None,
-                        'call_id': None,
-                        'status': None,
-                        'duration': None,
-                        'cost': 0.0,
-                        'ended_reason': None,
-                        'success_evaluation': None,
-                        'recording_url': None,
-                        'transcript': None,
-                        'summary': None,
-                        'call_started_at': None,
-                        'call_ended_at': None,
-                        'retry_count': 0,
-                        'is_successful': False,
-                        'needs_retry': False,
-                        'created_at': None
-                    }
-
-            result = {
-                'total_count': len(ofd_undelivered_orders),
-                'ofd_count': ofd_count,
-                'undelivered_count': undelivered_count,
-                'orders': ofd_undelivered_orders,
-                'source': 'database'  # Indicate data source
-            }
-
-            # Cache for 30 minutes
-            cache.set(cache_key, result, 1800)
-            print(f"[OFD] Returning {len(ofd_undelivered_orders)} orders from database (cached)")
-
-            return Response(result, status=status.HTTP_200_OK)
-
-        # STEP 2: If database is empty, fall back to API (old logic)
-        print(f"[OFD] Database empty - fetching from iThink API...")
-
-        # Get last 5 days orders (reduced from 10 to prevent timeout/memory issues)
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d')
-
-        print(f"[OFD] Fetching orders from {start_date} to {end_date}")
-        orders_result = IThinkService.get_orders_by_date_range(start_date, end_date)
-
-        if "error" in orders_result:
-            error_msg = orders_result.get('error')
-            print(f"[OFD ERROR] iThink API Error: {error_msg}")
-            return Response({
-                'error': f'Failed to fetch orders from iThink API: {error_msg}',
-                'total_count': 0,
-                'ofd_count': 0,
-                'undelivered_count': 0,
-                'orders': []
-
-
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        if orders_result.get('status') != 'success' or 'data' not in orders_result:
-            print(f"[OFD ERROR] Invalid response structure: {orders_result}")
-            return Response({
-                'error': 'Invalid response from iThink API',
-                'total_count': 0,
-                'ofd_count': 0,
-                'undelivered_count': 0,
-                'orders': []
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        orders_data = orders_result['data']
-        print(f"[OFD] Found {len(orders_data)} total orders in date range")
-
-        # Collect all AWBs
-        all_orders = []
-        for awb, order in orders_data.items():
-            all_orders.append({
-                'awb': awb,
-                'customer_name': order.get('customer_name', 'N/A'),
-                'customer_mobile': order.get('customer_phone', 'N/A'),
-                'customer_address': order.get('customer_address', 'N/A'),
-                'customer_pincode': order.get('customer_pincode', 'N/A'),
-                'cod_amount': order.get('total_amount', 'N/A'),
-                'weight': order.get('phy_weight', 'N/A'),
-                'order_date': order.get('order_date', 'N/A'),
-                'tracking_url': f'https://www.ithinklogistics.co.in/postship/tracking/{awb}'
-            })
-
-        # Track orders in batches to get OFD and Undelivered status
+                    print(f"[OFD] Database empty - last sync found no orders, not syncing again yet")
+                return {
+                    'total_count': 0,
+                    'ofd_count': 0,
+                    'undelivered_count': 0,
+                    'orders': [],
+                    'source': 'database',
+                    'cursor': cursor,
+                    'sync': job.progress()
+                }, status.HTTP_200_OK
+            print(f"[OFD] Database empty - started background sync from iThink API...")
+
+        if db_orders.exists() and not OFDDashboardRow.objects.exists():
+            # Rows are kept up to date on every write - only missing right after they were introduced
+            print(f"[OFD] Dashboard rows missing - rebuilt {read_model.rebuild_all()}")
+
+        # One scan of the precomputed rows (order + latest call summary)
         ofd_undelivered_orders = []
         ofd_count = 0
         undelivered_count = 0
-        batch_size = 10  # iThink API limit: Maximum 10 AWBs per tracking request
-
-        print(f"[OFD] Starting to track {len(all_orders)} orders in batches of {batch_size}")
-
-        for i in range(0, len(all_orders), batch_size):
-            batch = all_orders[i:i + batch_size]
-            awb_numbers = [order['awb'] for order in batch]
-
-            print(f"[OFD] Tracking batch {i//batch_size + 1}: {len(awb_numbers)} AWBs")
-            track_result = IThinkService.track_orders(awb_numbers)
-
-            if track_result.get('status') == 'success' and 'data' in track_result:
-                tracking_data = track_result['data']
-                print(f"[OFD] Batch {i//batch_size + 1} tracking successful, got {len(tracking_data)} results")
-
-                for order in batch:
-                    awb = order['awb']
-                    if awb in tracking_data:
-                        track_info = tracking_data[awb]
-                        current_status = track_info.get('current_status', '').lower()
 
-                        # Skip RTO orders
-                        if 'rto' in current_status:
-                            print(f"[OFD] Skipping RTO order: {awb}")
-                            continue
+        for order_type, order_data, call_history in OFDDashboardRow.objects.values_list(
+                'order_type', 'order_data', 'call_history'):
+            order_data['call_history'] = call_history
+            ofd_undelivered_orders.append(order_data)
 
-                        # Check if OFD or Undelivered (but not RTO)
-                        if 'out for delivery' in current_status:
-                            order['current_status'] = track_info.get('current_status')
-                            order['last_scan'] = track_info.get('last_scan_details', {})
-                            order['order_type'] = 'OFD'
-                            ofd_undelivered_orders.append(order)
-                            ofd_count += 1
-                            print(f"[OFD] Found OFD order: {awb} - {track_info.get('current_status')}")
-                        elif 'undelivered' in current_status:
-                            order['current_status'] = track_info.get('current_status')
-                            order['last_scan'] = track_info.get('last_scan_details', {})
-                            order['order_type'] = 'Undelivered'
-                            ofd_undelivered_orders.append(order)
-                            undelivered_count += 1
-                            print(f"[OFD] Found Undelivered order: {awb} - {track_info.get('current_status')}")
-                    else:
-                        print(f"[OFD] No tracking data for AWB: {awb}")
-            else:
-                error_msg = track_result.get('error', 'Unknown error')
-                status_code = track_result.get('status_code', 'N/A')
-                print(f"[OFD] Batch {i//batch_size + 1} tracking failed:")
-                print(f"[OFD]   Error: {error_msg}")
-                print(f"[OFD]   Status Code: {status_code}")
-                print(f"[OFD]   Full Response: {track_result}")
-
-        print(f"[OFD] Final results: Total={len(ofd_undelivered_orders)}, OFD={ofd_count}, Undelivered={undelivered_count}")
-
-        # ✅ OPTIMIZED: Bulk save/update OFD/Undelivered orders to database
-        saved_count = 0
-        updated_count = 0
-
-        # Fetch all existing orders in one query
-        existing_awbs = [order['awb'] for order in ofd_undelivered_orders]
-        existing_orders = {order.awb: order for order in Order.objects.filter(awb__in=existing_awbs)}
-
-        orders_to_create = []
-        orders_to_update = []
-
-        for order in ofd_undelivered_orders:
-            awb = order['awb']
-            order_type = order.get('order_type', 'OFD')
-            current_status = order.get('current_status', 'N/A')
-
-            if awb in existing_orders:
-                # Update existing order if status changed
-                existing_order = existing_orders[awb]
-                if existing_order.order_type != order_type or existing_order.current_status != current_status:
-                    existing_order.order_type = order_type
-                    existing_order.current_status = current_status
-                    existing_order.customer_mobile = order.get('customer_mobile', existing_order.customer_mobile)
-                    orders_to_update.append(existing_order)
-            else:
-                # Prepare new order for bulk create
-                orders_to_create.append(Order(
-                    awb=awb,
-                    order_type=order_type,
-                    customer_name=order.get('customer_name', 'N/A'),
-                    customer_mobile=order.get('customer_mobile', 'N/A'),
-                    customer_address=order.get('customer_address', 'N/A'),
-                    customer_pincode=order.get('customer_pincode', 'N/A'),
-                    cod_amount=str(order.get('cod_amount', 'N/A')),
-                    weight=str(order.get('weight', 'N/A')),
-                    order_date=order.get('order_date', 'N/A'),
-                    tracking_url=order.get('tracking_url', ''),
-                    current_status=current_status,
-                    last_scan=order.get('last_scan', {})
-                ))
-
-        # Bulk create new orders
-        if orders_to_create:
-            Order.objects.bulk_create(orders_to_create)
-            saved_count = len(orders_to_create)
-
-        # Bulk update existing orders
-        if orders_to_update:
-            Order.objects.bulk_update(orders_to_update, ['order_type', 'current_status', 'customer_mobile'])
-            updated_count = len(orders_to_update)
-
-        if saved_count > 0 or updated_count > 0:
-            print(f"[DB] Database sync complete: {saved_count} new, {updated_count} updated")
-
-        # ✅ OPTIMIZED: Fetch all call histories in one query instead of per-order queries
-        all_awbs = [order['awb'] for order in ofd_undelivered_orders]
-        all_call_histories = CallHistory.objects.filter(awb__in=all_awbs).order_by('awb', '-created_at')
-
-        # Group call histories by AWB
-        call_history_map = {}
-        for call in all_call_histories:
-            if call.awb not in call_history_map:
-                call_history_map[call.awb] = {'latest': call, 'count': 0}
-            call_history_map[call.awb]['count'] += 1
-
-        # Add call history for each order
-        for order in ofd_undelivered_orders:
-            awb = order['awb']
-
-            call_data = call_history_map.get(awb)
-            call_history = call_data['latest'] if call_data else None
-            call_count = call_data['count'] if call_data else 0
-
-            if call_history:
-                # Extract data from VAPI response
-                success_evaluation = None
-                recording_url = None
-                transcript = None
-                summary = None
-
-                if call_history.vapi_response and isinstance(call_history.vapi_response, dict):
-                    vapi_resp = call_history.vapi_response
-
-                    # Extract success evaluation
-                    analysis = vapi_resp.get('analysis', {})
-                    if analysis and isinstance(analysis, dict):
-                        success_evaluation = analysis.get('successEvaluation')
-                        summary = analysis.get('summary')
-
-                    # Extract recording URL (multiple possible locations)
-                    recording_url = (
-                        vapi_resp.get('recordingUrl') or
-                        vapi_resp.get('stereoRecordingUrl') or
-                        vapi_resp.get('artifact', {}).get('recordingUrl') or
-                        vapi_resp.get('artifact', {}).get('stereoRecordingUrl') or
-                        vapi_resp.get('artifact', {}).get('recording', {}).get('combinedUrl')
-                    )
-
-                    # Extract transcript
-                    transcript = (
-                        vapi_resp.get('transcript') or
-                        vapi_resp.get('artifact', {}).get('transcript')
-                    )
-
-                # Format last call time
-                from django.utils.timezone import localtime
-                last_call_time = localtime(call_history.created_at).strftime('%b %d, %I:%M %p') if call_history.created_at else None
-
-                # Convert success_evaluation to pass/fail format
-                success_eval_formatted = None
-                if success_evaluation is not None:
-                    eval_str = str(success_evaluation).lower()
-                    if eval_str == 'true':
-                        success_eval_formatted = 'pass'
-                    elif eval_str == 'false':
-                        success_eval_formatted = 'fail'
-                    else:
-                        success_eval_formatted = eval_str
-
-                order['call_history'] = {
-                    'has_been_called': True,
-                    'call_count': call_count,
-                    'last_call_time': last_call_time,
-                    'call_id': call_history.call_id,
-                    'status': call_history.status,
-                    'duration': call_history.duration,
-                    'cost': call_history.cost,
-                    'ended_reason': call_history.ended_reason,
-                    'success_evaluation': success_eval_formatted,
-                    'recording_url': recording_url,
-                    'transcript': transcript,
-                    'summary': summary,
-                    'call_started_at': call_history.call_started_at,
-                    'call_ended_at': call_history.call_ended_at,
-                    'retry_count': call_history.retry_count,
-                    'is_successful': call_history.is_successful,
-                    'needs_retry': call_history.needs_retry,
-                    'created_at': call_history.created_at
-                }
+            if order_type == 'OFD':
+                ofd_count += 1
             else:
-                order['call_history'] = {
-                    'has_been_called': False,
-                    'call_count': 0,
-                    'last_call_time': None,
-                    'call_id': None,
-                    'status': None,
-                    'duration': None,
-                    'cost': 0.0,
-                    'ended_reason': None,
-                    'success_evaluation': None,
-                    'recording_url': None,
-                    'transcript': None,
-                    'summary': None,
-                    'call_started_at': None,
-                    'call_ended_at': None,
-                    'retry_count': 0,
-                    'is_successful': False,
-                    'needs_retry': False,
-                    'created_at': None
-                }
+                undelivered_count += 1
+
+        print(f"[OFD] Found {len(ofd_undelivered_orders)} orders in database")
 
         result = {
             'total_count': len(ofd_undelivered_orders),
             'ofd_count': ofd_count,
             'undelivered_count': undelivered_count,
-            'orders': ofd_undelivered_orders
+            'orders': ofd_undelivered_orders,
+            'source': 'database',  # Indicate data source
+            'cursor': cursor  # Pass back as ?since= to get only changes
         }
 
-        # Cache for 30 minutes (1800 seconds) - increased from 5 minutes
-        cache.set(cache_key, result, 1800)
-        print(f"[OFD] Cached data for 30 minutes")
+        if job:
+            # Partial list - 202 is not cached, the client polls until the sync is done
+            result['syncing'] = True
+            result['sync'] = job.progress()
+            return result, status.HTTP_202_ACCEPTED
+
+        print(f"[OFD] Returning {len(ofd_undelivered_orders)} orders from database")
+
+        return result, status.HTTP_200_OK
 
-        return Response(result, status=status.HTTP_200_OK)
+
+    def get_delta(self, request):
+        """
+        GET ?since=<cursor> - orders added/changed (order or call history) since the cursor
+        Returns:
+            orders (full entries to add or replace), removed (AWBs to drop), counts and a new cursor.
+            full_resync=True means the cursor is too old - fetch the full list again.
+        """
+        try:
+            since = datetime.fromtimestamp(int(request.GET['since']) / 1000, tz=dt_timezone.utc)
+        except (ValueError, OverflowError, OSError):
+            return Response({'error': 'since must be a cursor from an earlier response'}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        cursor = make_cursor(now)
+
+        # Deletions older than this are forgotten
+        if now - since > timedelta(hours=TOMBSTONE_RETENTION_HOURS):
+            return Response({'full_resync': True, 'cursor': cursor}, status=status.HTTP_200_OK)
+
+        window_start = since - timedelta(seconds=DELTA_OVERLAP_SECONDS)
+        affected = set(Order.objects.filter(updated_at__gte=window_start).values_list('awb', flat=True))
+        affected.update(CallHistory.objects.filter(updated_at__gte=window_start).values_list('awb', flat=True))
+        affected.update(Tombstone.objects.filter(deleted_at__gte=window_start).values_list('awb', flat=True))
+
+        orders = []
+        if affected:
+            for order_data, call_history in OFDDashboardRow.objects.filter(order__awb__in=affected).values_list(
+                    'order_data', 'call_history'):
+                order_data['call_history'] = call_history
+                orders.append(order_data)
+
+        # Deleted, or no longer OFD/Undelivered
+        removed = sorted(affected - {order['awb'] for order in orders})
+
+        counts = Order.objects.filter(order_type__in=OFD_ORDER_TYPES).aggregate(
+            total_count=Count('id'),
+            ofd_count=Count('id', filter=Q(order_type='OFD')),
+            undelivered_count=Count('id', filter=Q(order_type='Undelivered'))
+        )
+
+        print(f"[OFD] Delta since {since.isoformat()}: {len(orders)} changed, {len(removed)} removed")
+        return Response({
+            **counts,
+            'orders': orders,
+            'removed': removed,
+            'cursor': cursor,
+            'full_resync': False,
+            'source': 'database'
+        }, status=status.HTTP_200_OK)
 
 
 class TrackOrderView(APIView):
@@ -779,74 +499,133 @@ class MakeCallView(APIView):
         return Response(result, status=status.HTTP_200_OK)
 
 
+# Columns used by the call history list (skips summary/transcript text)
+CALL_HISTORY_LIST_FIELDS = [
+    'id', 'call_id', 'awb', 'customer_name', 'customer_phone', 'order_type', 'assistant_id',
+    'phone_number_id', 'status', 'call_type', 'duration', 'cost', 'ended_reason',
+    'success_evaluation', 'created_at', 'updated_at', 'call_started_at', 'call_ended_at',
+]
+
+
+def encode_call_cursor(created_at, call_pk):
+    """Opaque keyset cursor of the last call on a page"""
+    raw = json.dumps([created_at.isoformat(), call_pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_call_cursor(cursor):
+    """Returns (created_at, id), raises ValueError for anything that isn't one of our cursors"""
+    try:
+        created_at, call_pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('invalid cursor')
+    created_at = parse_datetime(created_at) if isinstance(created_at, str) else None
+    if created_at is None or not isinstance(call_pk, int):
+        raise ValueError('invalid cursor')
+    return created_at, call_pk
+
+
 class CallHistoryView(APIView):
     """
     API endpoint to get call history
-    GET request - returns all call history
+    GET request - today's calls, newest first, one page at a time
+    Query params:
+        limit: Calls per page (default CALL_HISTORY_PAGE_SIZE, max CALL_HISTORY_MAX_PAGE_SIZE)
+        cursor: next_cursor of the previous page
+        fields: Comma separated subset of CALL_HISTORY_LIST_FIELDS (default all of them)
     """
 
     def get(self, request):
-        # Check cache first (cache for 2 minutes - increased from 30 seconds)
-        cache_key = 'call_history_data'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(cached_data, status=status.HTTP_200_OK)
-
-        # Delete old call history (older than today) - keep only today's calls
-        from datetime import datetime, time
-        today_start = datetime.combine(datetime.now().date(), time.min)
-
-        # Delete all calls before today
-        deleted_count = CallHistory.objects.filter(created_at__lt=today_start).delete()[0]
-        if deleted_count > 0:
-            print(f"Deleted {deleted_count} old call history records")
-
-        # Get today's call history ordered by most recent first
-        today_end = datetime.combine(datetime.now().date(), time.max)
-        call_history = CallHistory.objects.filter(
-            created_at__range=(today_start, today_end)
-        ).order_by('-created_at')
-
-        history_data = []
-        for call in call_history:
-            # Extract success evaluation from VAPI response
-            success_evaluation = None
-            if call.vapi_response and isinstance(call.vapi_response, dict):
-                analysis = call.vapi_response.get('analysis', {})
-                if analysis and isinstance(analysis, dict):
-                    success_evaluation = analysis.get('successEvaluation')
-
-            history_data.append({
-                'id': call.id,
-                'call_id': call.call_id,
-                'awb': call.awb,
-                'customer_name': call.customer_name,
-                'customer_phone': call.customer_phone,
-                'order_type': call.order_type,
-                'assistant_id': call.assistant_id,
-                'phone_number_id': call.phone_number_id,
-                'status': call.status,
-                'call_type': call.call_type,
-                'duration': call.duration,
-                'cost': call.cost,
-                'ended_reason': call.ended_reason,
-                'success_evaluation': success_evaluation,
-                'created_at': call.created_at,
-                'updated_at': call.updated_at,
-                'call_started_at': call.call_started_at,
-                'call_ended_at': call.call_ended_at,
-            })
+        try:
+            limit = min(int(request.GET.get('limit', CALL_HISTORY_PAGE_SIZE)), CALL_HISTORY_MAX_PAGE_SIZE)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({'error': f'limit must be between 1 and {CALL_HISTORY_MAX_PAGE_SIZE}'}, status=status.HTTP_400_BAD_REQUEST)
 
-        response_data = {
-            'count': len(history_data),
-            'calls': history_data
-        }
+        cursor = request.GET.get('cursor') or None
+        try:
+            after = decode_call_cursor(cursor) if cursor else None
+        except ValueError:
+            return Response({'error': 'cursor must be a next_cursor from an earlier page'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Cache for 2 minutes (120 seconds) - increased from 30 seconds
-        cache.set(cache_key, response_data, 120)
+        fields = [field.strip() for field in request.GET.get('fields', '').split(',') if field.strip()] or CALL_HISTORY_LIST_FIELDS
+        unknown = [field for field in fields if field not in CALL_HISTORY_LIST_FIELDS]
+        if unknown:
+            return Response({
+                'error': f"Unknown fields: {', '.join(unknown)}",
+                'allowed_fields': CALL_HISTORY_LIST_FIELDS
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(response_data, status=status.HTTP_200_OK)
+        # One cache slot per page, the key changes whenever calls change
+        return response_cache.serve(
+            request, call_history_slot(limit, cursor, fields), cache_versions.current(cache_versions.CALLS),
+            lambda: self.build(limit, after, fields), CACHE_TIMEOUT_CALL_HISTORY
+        )
+
+    @staticmethod
+    def build(limit, after, fields):
+        """
+        One page of today's calls
+        Returns:
+            tuple: (response data, status_code)
+        """
+        # Today's calls (older ones are removed by the nightly cleanup, not here)
+        today_calls = CallHistory.objects.today()
+
+        page = today_calls
+        if after:
+            # Keyset pagination - rows after the cursor in (-created_at, -id) order
+            after_created_at, after_pk = after
+            page = page.filter(Q(created_at__lt=after_created_at) | Q(created_at=after_created_at, id__lt=after_pk))
+
+        # id/created_at are always read - the cursor needs them
+        columns = list(dict.fromkeys(fields + ['id', 'created_at']))
+        rows = list(page.order_by('-created_at', '-id').values(*columns)[:limit + 1])
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_call_cursor(rows[-1]['created_at'], rows[-1]['id']) if has_more else None
+
+        history_data = [{field: row[field] for field in fields} for row in rows]
+
+        return {
+            'count': today_calls.count(),  # All of today's calls, not just this page
+            'calls': history_data,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }, status.HTTP_200_OK
+
+
+class CallDetailView(APIView):
+    """
+    API endpoint to get the summary and transcript of one call
+    GET request - loaded when a call's details are opened (lists don't carry the text)
+    """
+
+    def get(self, request, call_id):
+        call = CallHistory.objects.filter(call_id=call_id).values('call_id', *CALL_TEXT_FIELDS).first()
+        if not call:
+            return Response({'error': f'Call {call_id} not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(call, status=status.HTTP_200_OK)
+
+
+def call_history_slot(limit, cursor, fields):
+    """Cache slot of one call history page"""
+    page_key = hashlib.md5(f"{limit}|{cursor}|{','.join(fields)}".encode('utf-8')).hexdigest()
+    return f'call_history_data:{page_key}'
+
+
+# Dashboard payloads the scheduler keeps warm (full OFD list and the first call history page)
+response_cache.register_refresher(
+    'ofd_orders_data', ofd_orders_version, OFDOrdersView.build, CACHE_TIMEOUT_OFD
+)
+response_cache.register_refresher(
+    call_history_slot(CALL_HISTORY_PAGE_SIZE, None, CALL_HISTORY_LIST_FIELDS),
+    lambda: cache_versions.current(cache_versions.CALLS),
+    lambda: CallHistoryView.build(CALL_HISTORY_PAGE_SIZE, None, CALL_HISTORY_LIST_FIELDS),
+    CACHE_TIMEOUT_CALL_HISTORY
+)
 
 
 class SchedulerControlView(APIView):
@@ -866,7 +645,13 @@ class SchedulerControlView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            auto_call_scheduler.start(scheduled_time)
+            try:
+                auto_call_scheduler.start(scheduled_time)
+            except ValueError:
+                return Response(
+                    {'error': 'time must be in HH:MM format'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             return Response({
                 'message': f'Scheduler started. Calls will be made daily at {scheduled_time}',
                 'status': auto_call_scheduler.get_status()
@@ -913,88 +698,19 @@ class VAPIWebhookView(APIView):
     """
     VAPI Webhook endpoint to receive call status updates
     This endpoint is called by VAPI when call status changes
+    Events are applied to CallHistory by webhook_queue's background consumer
     """
     permission_classes = [AllowAny]  # Allow VAPI to call without auth
 
     def post(self, request):
-        """Handle VAPI webhook events"""
+        """Handle VAPI webhook events - stored and acknowledged right away, applied in background"""
         try:
-            webhook_data = request.data
-            message_type = webhook_data.get('message', {}).get('type')
-
-            # Handle call status update
-            if message_type == 'status-update':
-                call_data = webhook_data.get('message', {}).get('call', {})
-                call_id = call_data.get('id')
-
-                if not call_id:
-                    return Response({'status': 'ok'}, status=status.HTTP_200_OK)
-
-                # Find and update call history
-                try:
-                    call_history = CallHistory.objects.get(call_id=call_id)
-
-                    # Update call details
-                    call_history.status = call_data.get('status')
-                    call_history.duration = call_data.get('duration')
-                    call_history.cost = call_data.get('cost', 0)
-                    call_history.ended_reason = call_data.get('endedReason')
-
-                    # Parse timestamps
-                    if call_data.get('startedAt'):
-                        call_history.call_started_at = parse_datetime(call_data.get('startedAt'))
-                    if call_data.get('endedAt'):
-                        call_history.call_ended_at = parse_datetime(call_data.get('endedAt'))
-
-                    # Update full VAPI response
-                    call_history.vapi_response = call_data
-
-                    call_history.save()
-
-                    print(f"Updated call history for call_id: {call_id}, status: {call_data.get('status')}")
-
-                except CallHistory.DoesNotExist:
-                    print(f"Call history not found for call_id: {call_id}")
-
-            # Handle end-of-call-report (contains analysis)
-            elif message_type == 'end-of-call-report':
-                call_data = webhook_data.get('message', {})
-                call_id = call_data.get('call', {}).get('id')
-
-                if not call_id:
-                    return Response({'status': 'ok'}, status=status.HTTP_200_OK)
-
-                # Find and update call history with analysis data
-                try:
-                    call_history = CallHistory.objects.get(call_id=call_id)
-
-                    # Update with full call data including analysis
-                    full_call_data = call_data.get('call', {})
-                    call_history.status = full_call_data.get('status', call_history.status)
-                    call_history.duration = full_call_data.get('duration', call_history.duration)
-                    call_history.cost = full_call_data.get('cost', call_history.cost)
-                    call_history.ended_reason = full_call_data.get('endedReason', call_history.ended_reason)
-
-                    # Parse timestamps
-                    if full_call_data.get('startedAt'):
-                        call_history.call_started_at = parse_datetime(full_call_data.get('startedAt'))
-                    if full_call_data.get('endedAt'):
-                        call_history.call_ended_at = parse_datetime(full_call_data.get('endedAt'))
-
-                    # Update full VAPI response with analysis
-                    call_history.vapi_response = full_call_data
-
-                    call_history.save()
-
-                    success_eval = full_call_data.get('analysis', {}).get('successEvaluation')
-                    print(f"Updated call history with analysis for call_id: {call_id}, success: {success_eval}")
-
-                except CallHistory.DoesNotExist:
-                    print(f"Call history not found for call_id: {call_id}")
-
+            # status-update / end-of-call-report are queued (duplicates ignored), the rest is ignored
+            webhook_queue.enqueue(request.data)
             return Response({'status': 'ok'}, status=status.HTTP_200_OK)
 
         except Exception as e:
+            # Not stored - non-200 makes VAPI retry the delivery
             print(f"Webhook error: {str(e)}")
             return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -1059,10 +775,12 @@ class PollCallStatusView(APIView):
                 'error': 'call_ids must be an array'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        updated_calls = []
+        # One VAPI list request per 100 calls first, GET /call/{id} only for calls not in the list
+        reconciled = reconcile_calls(call_ids=call_ids)
+        updated_calls = [self.call_result(call_history) for call_history in reconciled['calls']]
         failed_calls = []
 
-        for call_id in call_ids:
+        for call_id in reconciled['not_found']:
             try:
                 # Get call details from VAPI
                 call_details = VAPIService.get_call_details(call_id)
@@ -1100,29 +818,15 @@ class PollCallStatusView(APIView):
                     if call_details.get('endedAt'):
                         call_history.call_ended_at = parse_datetime(call_details.get('endedAt'))
 
-                    # Update full VAPI response
-                    call_history.vapi_response = call_details
+                    # Update full VAPI response (+ outcome columns)
+                    call_history.set_vapi_response(call_details)
 
                     # Update retry status
                     call_history.update_retry_status()
 
                     call_history.save()
 
-                    # Extract success evaluation
-                    success_evaluation = None
-                    if call_details.get('analysis'):
-                        success_evaluation = call_details['analysis'].get('successEvaluation')
-
-                    updated_calls.append({
-                        'call_id': call_id,
-                        'status': call_history.status,
-                        'duration': call_history.duration,
-                        'cost': call_history.cost,
-                        'ended_reason': call_history.ended_reason,
-                        'success_evaluation': success_evaluation,
-                        'is_successful': call_history.is_successful,
-                        'needs_retry': call_history.needs_retry
-                    })
+                    updated_calls.append(self.call_result(call_history))
 
                 except CallHistory.DoesNotExist:
                     failed_calls.append({
@@ -1143,6 +847,19 @@ class PollCallStatusView(APIView):
             'failed_calls': failed_calls
         }, status=status.HTTP_200_OK)
 
+    @staticmethod
+    def call_result(call_history):
+        return {
+            'call_id': call_history.call_id,
+            'status': call_history.status,
+            'duration': call_history.duration,
+            'cost': call_history.cost,
+            'ended_reason': call_history.ended_reason,
+            'success_evaluation': call_history.success_evaluation,
+            'is_successful': call_history.is_successful,
+            'needs_retry': call_history.needs_retry
+        }
+
     def get(self, request):
         """Get call status for a single call ID via query param"""
         call_id = request.GET.get('call_id')
@@ -1185,3 +902,69 @@ class PollCallStatusView(APIView):
                 'database_data': None,
                 'message': 'Call not found in local database'
             }, status=status.HTTP_200_OK)
+
+
+class ReconcileCallsView(APIView):
+    """
+    API endpoint to sync call status for all of today's open calls from VAPI in one go
+    POST request - pages through VAPI's call list (100 calls per request) since the
+    oldest call that hasn't ended and bulk updates CallHistory
+    """
+    def post(self, request):
+        report = reconcile_calls()
+
+        return Response({
+            'status': 'error' if report['error'] and not report['fetched'] else 'success',
+            'vapi_requests': report['pages'],
+            'fetched': report['fetched'],
+            'updated': report['updated'],
+            'unchanged': report['unchanged'],
+            'error': report['error']
+        }, status=status.HTTP_200_OK)
+
+
+def session_snapshot():
+    """Full live session state, sent first (or when a client can't resume)"""
+    status_data = auto_call_scheduler.get_status()
+    return {'live_session': status_data['live_session'], 'running': status_data['running']}
+
+
+# Long-polls waiting at once in this process - the rest answer right away, so waiting
+# dashboards never take all of gunicorn's threads
+_long_poll_slots = threading.BoundedSemaphore(LONG_POLL_MAX_WAITERS)
+
+
+class SchedulerEventsView(APIView):
+    """
+    Live scheduler progress by long-poll (normal API auth, replaces polling /orders/scheduler/)
+    GET ?after=<last event id>&wait=<seconds> - returns as soon as there are newer events
+    Without 'after' (or if it's too old to resume) returns a snapshot and the current cursor
+    Events: log (add_log entry), session (counters), calls (call history changed)
+    """
+
+    def get(self, request):
+        try:
+            after = int(request.GET['after']) if request.GET.get('after') else None
+            wait = min(float(request.GET.get('wait', LONG_POLL_MAX_SECONDS)), LONG_POLL_MAX_SECONDS)
+        except ValueError:
+            return Response({'error': 'after must be an integer and wait a number'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if after is None or not live_events.can_resume(after):
+            return Response({
+                'snapshot': session_snapshot(),
+                'events': [],
+                'last_event_id': live_events.latest_id()
+            }, status=status.HTTP_200_OK)
+
+        if _long_poll_slots.acquire(blocking=False):
+            try:
+                events = live_events.wait_for_events(after, max(wait, 0))
+            finally:
+                _long_poll_slots.release()
+        else:
+            events = live_events.events_after(after)
+        return Response({
+            'snapshot': None,
+            'events': [live_events.serialize(event) for event in events],
+            'last_event_id': events[-1].id if events else after
+        }, status=status.HTTP_200_OK)
@@ -5,6 +5,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import CallHistory, Order
 from .vapi_service import VAPIService
+from .call_buffer import CallHistoryBuffer
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.db.models import Q
 from datetime import datetime, time as dt_time
@@ -20,8 +22,8 @@ class BulkCallPendingOrdersView(APIView):
         """Make calls to all pending orders immediately"""
 
         # Get today's date range
-        today_start = datetime.combine(datetime.now().date(), dt_time.min)
-        today_end = datetime.combine(datetime.now().date(), dt_time.max)
+        today_start = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+        today_end = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.max))
 
         # Get all OFD/Undelivered orders from database
         all_orders = Order.objects.filter(
@@ -76,80 +78,82 @@ class BulkCallPendingOrdersView(APIView):
         failed_count = 0
         call_results = []
 
-        for order in pending_orders:
-            phone_number = order.customer_mobile
+        # Today's call counts loaded once, call records saved with bulk inserts
+        call_buffer = CallHistoryBuffer(awbs=[order.awb for order in pending_orders])
 
-            if not phone_number or phone_number == 'N/A' or len(str(phone_number).strip()) < 10:
-                skipped_count += 1
-                call_results.append({
-                    'awb': order.awb,
-                    'status': 'skipped',
-                    'reason': 'No valid phone number'
-                })
-                continue
+        with call_buffer:
+            for order in pending_orders:
+                phone_number = order.customer_mobile
 
-            # Prepare order data
-            order_data = {
-                'awb': order.awb,
-                'customer_name': order.customer_name,
-                'order_type': order.order_type,
-                'current_status': order.current_status,
-                'customer_address': order.customer_address,
-                'customer_pincode': order.customer_pincode,
-                'cod_amount': order.cod_amount
-            }
-
-            # Make call using VAPI
-            result = VAPIService.make_ofd_call(phone_number, order_data)
-
-            if "error" in result:
-                failed_count += 1
-                call_results.append({
-                    'awb': order.awb,
-                    'status': 'failed',
-                    'reason': result.get('error')
-                })
-                continue
+                if not phone_number or phone_number == 'N/A' or len(str(phone_number).strip()) < 10:
+                    skipped_count += 1
+                    call_results.append({
+                        'awb': order.awb,
+                        'status': 'skipped',
+                        'reason': 'No valid phone number'
+                    })
+                    continue
 
-            # Save to database
-            try:
-                # Count previous calls today
-                previous_calls = CallHistory.objects.filter(
-                    awb=order.awb,
-                    created_at__range=(today_start, today_end)
-                ).count()
-
-                CallHistory.objects.create(
-                    call_id=result.get('id'),
-                    awb=order.awb,
-                    customer_name=order.customer_name,
-                    customer_phone=phone_number,
-                    order_type=order.order_type,
-                    assistant_id=result.get('assistantId'),
-                    phone_number_id=result.get('phoneNumberId'),
-                    status=result.get('status'),
-                    call_type=result.get('type'),
-                    cost=result.get('cost', 0),
-                    retry_count=previous_calls,
-                    call_started_at=parse_datetime(result.get('createdAt')) if result.get('createdAt') else None,
-                    vapi_response=result
-                )
-
-                called_count += 1
-                call_results.append({
-                    'awb': order.awb,
-                    'status': 'success',
-                    'call_id': result.get('id'),
-                    'customer_name': order.customer_name
-                })
-
-            except Exception as e:
-                failed_count += 1
-                call_results.append({
+                # Prepare order data
+                order_data = {
                     'awb': order.awb,
-                    'status': 'failed',
-                    'reason': f'Database error: {str(e)}'
-                })
+                    'customer_name': order.customer_name,
+                    'order_type': order.order_type,
+                    'current_status': order.current_status,
+                    'customer_address': order.customer_address,
+                    'customer_pincode': order.customer_pincode,
+                    'cod_amount': order.cod_amount
+                }
+
+                # Make call using VAPI
+                result = VAPIService.make_ofd_call(phone_number, order_data)
+
+                if "error" in result:
+                    failed_count += 1
+                    call_results.append({
+                        'awb': order.awb,
+                        'status': 'failed',
+                        'reason': result.get('error')
+                    })
+                    continue
+
+                # Queue for bulk insert
+                try:
+                    call_buffer.add(CallHistory(
+                        call_id=result.get('id'),
+                        awb=order.awb,
+                        customer_name=order.customer_name,
+                        customer_phone=phone_number,
+                        order_type=order.order_type,
+                        assistant_id=result.get('assistantId'),
+                        phone_number_id=result.get('phoneNumberId'),
+                        status=result.get('status'),
+                        call_type=result.get('type'),
+                        cost=result.get('cost', 0),
+                        retry_count=call_buffer.next_retry_count(order.awb),
+                        call_started_at=parse_datetime(result.get('createdAt')) if result.get('createdAt') else None,
+                        vapi_response=result
+                    ))
+
+                    called_count += 1
+                    call_results.append({
+                        'awb': order.awb,
+                        'status': 'success',
+                        'call_id': result.get('id'),
+                        'customer_name': order.customer_name
+                    })
+
+                except Exception as e:
+                    failed_count += 1
+                    call_results.append({
+                        'awb': order.awb,
+                        'status': 'failed',
+                        'reason': f'Database error: {str(e)}'
+                    })
+
+        # Records that failed in the final bulk insert
+        called_count -= call_buffer.failed
+        failed_count += call_buffer.failed
 
         return Response({
             'status': 'success',
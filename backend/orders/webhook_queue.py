@@ -0,0 +1,208 @@
+import hashlib
+import json
+import threading
+from datetime import timedelta
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from .constants import WEBHOOK_BATCH_SIZE, WEBHOOK_POLL_SECONDS, WEBHOOK_MAX_WAIT_SECONDS, WEBHOOK_CLAIM_STALE_SECONDS
+from .jobs import WORKER
+from .models import CallHistory, CallPayload, WebhookEvent
+from . import live_events, read_model, cache_versions
+
+
+# Webhook messages that update CallHistory
+HANDLED_TYPES = ('status-update', 'end-of-call-report')
+
+# Call status order - an older status-update delivered late must not undo a newer one
+STATUS_RANK = {
+    'queued': 0,
+    'ringing': 1,
+    'in-progress': 2,
+    'forwarding': 3,
+    'ended': 4,
+}
+
+_wakeup = threading.Event()
+_consumer = None
+_consumer_lock = threading.Lock()
+
+
+def enqueue(webhook_data):
+    """
+    Store a webhook delivery for the background consumer (one INSERT, duplicates ignored)
+    Returns:
+        bool: True if the message is one we handle and has a call id
+    """
+    message = webhook_data.get('message', {})
+    message_type = message.get('type')
+    call_data = message.get('call', {}) or {}
+    call_id = call_data.get('id')
+
+    if message_type not in HANDLED_TYPES or not call_id:
+        return False
+
+    dedupe_key = hashlib.sha256(
+        json.dumps(webhook_data, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+
+    WebhookEvent.objects.bulk_create([
+        WebhookEvent(
+            dedupe_key=dedupe_key,
+            call_id=call_id,
+            message_type=message_type,
+            call_data=call_data
+        )
+    ], ignore_conflicts=True)
+
+    start_consumer()
+    _wakeup.set()
+    return True
+
+
+def _ordered_events(events):
+    """Events of one call oldest state first, end-of-call reports last"""
+    return sorted(events, key=lambda event: (
+        event.message_type == 'end-of-call-report',
+        STATUS_RANK.get(event.call_data.get('status'), -1),
+        event.id
+    ))
+
+
+def _claim(limit):
+    """
+    Take up to limit unprocessed events for this consumer - one conditional UPDATE, so with a
+    consumer in every worker each event is applied once (claims of a stopped consumer expire)
+    Returns:
+        list: Claimed events, fresh ones first and ones still waiting for their call row after them
+    """
+    now = timezone.now()
+    claimable = Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=WEBHOOK_CLAIM_STALE_SECONDS))
+    candidates = list(
+        WebhookEvent.objects.filter(claimable, processed_at__isnull=True)
+        .order_by('attempts', 'id').values_list('id', flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+
+    # Rows another consumer claimed since the SELECT no longer match - they're skipped
+    WebhookEvent.objects.filter(claimable, id__in=candidates, processed_at__isnull=True).update(
+        claimed_by=WORKER, claimed_at=now
+    )
+    return list(WebhookEvent.objects.filter(id__in=candidates, claimed_by=WORKER, claimed_at=now)
+                .order_by('attempts', 'id'))
+
+
+def process_pending(limit=WEBHOOK_BATCH_SIZE):
+    """
+    Apply queued webhook events to CallHistory
+    Events of the same call are coalesced, changed calls are written with one bulk_update.
+    Returns:
+        dict: events, calls_updated, unchanged, waiting (call not saved yet), dropped
+    """
+    events = _claim(limit)
+    report = {'events': len(events), 'calls_updated': 0, 'unchanged': 0, 'waiting': 0, 'dropped': 0}
+    if not events:
+        return report
+
+    by_call = {}
+    for event in events:
+        by_call.setdefault(event.call_id, []).append(event)
+
+    calls = CallHistory.objects.in_bulk(list(by_call.keys()), field_name='call_id')
+    now = timezone.now()
+
+    changed_rows = []
+    changed_fields = set()
+    done_ids = []
+    waiting_ids = []
+    dropped_ids = []
+
+    for call_id, call_events in by_call.items():
+        call_history = calls.get(call_id)
+
+        if call_history is None:
+            # Call row may still be in the scheduler's insert buffer - retry on the next pass
+            if now - min(event.received_at for event in call_events) > timedelta(seconds=WEBHOOK_MAX_WAIT_SECONDS):
+                print(f"[WEBHOOK] ❌ Call history not found for call_id: {call_id} - dropping {len(call_events)} events")
+                dropped_ids.extend(event.id for event in call_events)
+            else:
+                waiting_ids.extend(event.id for event in call_events)
+            continue
+
+        changed = set()
+        for event in _ordered_events(call_events):
+            call_data = event.call_data
+
+            # Don't move an ended call back to an earlier status
+            if (event.message_type == 'status-update' and
+                    STATUS_RANK.get(call_data.get('status'), -1) < STATUS_RANK.get(call_history.status, -1)):
+                continue
+
+            changed.update(call_history.apply_vapi_call(call_data))
+
+        if changed:
+            # Outcome may have changed - same retry flags as the old inline handler / reconcile
+            call_history.update_retry_status()
+            call_history.updated_at = now
+            changed_rows.append(call_history)
+            changed_fields.update(changed)
+            print(f"[WEBHOOK] Updated call_id: {call_id}, status: {call_history.status} ({len(call_events)} events)")
+        else:
+            report['unchanged'] += 1
+
+        done_ids.extend(e.id for e in call_events)
+
+    if changed_rows:
+        # One bulk write, dashboard refresh and version bump per batch (save() would do it per call)
+        changed_fields.discard('vapi_response')
+        changed_fields.update(['is_successful', 'needs_retry', 'updated_at'])
+        CallHistory.objects.bulk_update(changed_rows, sorted(changed_fields), batch_size=100)
+        CallPayload.store_many(changed_rows)
+        read_model.refresh_rows([call_history.awb for call_history in changed_rows])
+        cache_versions.bump(cache_versions.CALLS)
+        report['calls_updated'] = len(changed_rows)
+
+    if done_ids:
+        WebhookEvent.objects.filter(id__in=done_ids).update(processed_at=now, claimed_by=None, claimed_at=None)
+    if report['calls_updated']:
+        live_events.publish('calls', {'updated': report['calls_updated']})
+    if waiting_ids:
+        WebhookEvent.objects.filter(id__in=waiting_ids).update(
+            attempts=F('attempts') + 1, claimed_by=None, claimed_at=None
+        )
+        report['waiting'] = len(waiting_ids)
+    if dropped_ids:
+        WebhookEvent.objects.filter(id__in=dropped_ids).update(
+            processed_at=now, attempts=F('attempts') + 1, last_error='Call history not found',
+            claimed_by=None, claimed_at=None
+        )
+        report['dropped'] = len(dropped_ids)
+
+    return report
+
+
+def _run():
+    while True:
+        _wakeup.wait(WEBHOOK_POLL_SECONDS)
+        _wakeup.clear()
+        try:
+            close_old_connections()
+            # Drain in batches, waiting events are retried on the next wakeup
+            while True:
+                # Dashboard rows of the saved calls are refreshed once per batch, not per save
+                with read_model.batch():
+                    report = process_pending()
+                if report['events'] < WEBHOOK_BATCH_SIZE or report['waiting']:
+                    break
+        except Exception as e:
+            print(f"[WEBHOOK] ⚠️ Consumer error: {e}")
+
+
+def start_consumer():
+    """Start the background consumer thread of this process (once)"""
+    global _consumer
+    with _consumer_lock:
+        if _consumer is None or not _consumer.is_alive():
+            _consumer = threading.Thread(target=_run, name='webhook-consumer', daemon=True)
+            _consumer.start()
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react'
 import axios from 'axios'
 import './CallHistory.css'
 import { API_BASE_URL } from '../config'
+import { followLiveSession } from '../utils/liveEvents'
 
 // Configure axios to skip ngrok browser warning
 axios.defaults.headers.common['ngrok-skip-browser-warning'] = 'true'
@@ -11,6 +12,8 @@ function CallHistory() {
   const [error, setError] = useState(null)
   const [calls, setCalls] = useState([])
   const [count, setCount] = useState(0)
+  const [nextCursor, setNextCursor] = useState(null) // Cursor of the next (older) page
+  const [loadingMore, setLoadingMore] = useState(false)
 
   useEffect(() => {
     // Check if cache is from today, if not clear it (daily refresh)
@@ -30,6 +33,7 @@ function CallHistory() {
         const parsed = JSON.parse(cachedData)
         setCalls(parsed.calls || [])
         setCount(parsed.count || 0)
+        setNextCursor(parsed.next_cursor || null)
         setLoading(false)
       } catch (e) {
         console.error('Failed to parse cached data')
@@ -39,12 +43,29 @@ function CallHistory() {
     // Then fetch fresh data
     fetchCallHistory()
 
-    // Auto-refresh every 10 seconds
-    const interval = setInterval(() => {
-      fetchCallHistory()
-    }, 10000)
+    // While a calling session runs, refetch when the server reports call changes (long-poll);
+    // otherwise only check every 30 seconds (unchanged history answers 304)
+    let refetchTimer = null
+    let firstSnapshot = true
+    const stopFollowing = followLiveSession({
+      idleMs: 30000,
+      onSnapshot: () => {
+        // First one comes right after the fetch above
+        if (!firstSnapshot) fetchCallHistory()
+        firstSnapshot = false
+      },
+      onEvent: (event) => {
+        if (event.kind !== 'calls') return
+        // Several updates usually arrive together - refetch once
+        clearTimeout(refetchTimer)
+        refetchTimer = setTimeout(fetchCallHistory, 1000)
+      }
+    })
 
-    return () => clearInterval(interval)
+    return () => {
+      stopFollowing()
+      clearTimeout(refetchTimer)
+    }
   }, [])
 
   const fetchCallHistory = async () => {
@@ -70,7 +91,19 @@ function CallHistory() {
         })
       }
 
-      setCalls(data.calls || [])
+      // First page replaces the newest calls, older pages already loaded stay
+      const firstPage = data.calls || []
+      const oldestOnPage = firstPage[firstPage.length - 1]
+      setCalls(prev => {
+        const pageIds = new Set(firstPage.map(call => call.id))
+        const olderLoaded = oldestOnPage
+          ? prev.filter(call => !pageIds.has(call.id) && isOlderCall(call, oldestOnPage))
+          : []
+        if (olderLoaded.length === 0) {
+          setNextCursor(data.next_cursor || null)
+        }
+        return [...firstPage, ...olderLoaded]
+      })
       setCount(data.count || 0)
       setLoading(false)
 
@@ -83,6 +116,32 @@ function CallHistory() {
     }
   }
 
+  // Same order as the API: created_at desc, id desc
+  const isOlderCall = (call, other) => {
+    const diff = new Date(call.created_at) - new Date(other.created_at)
+    return diff < 0 || (diff === 0 && call.id < other.id)
+  }
+
+  const loadMoreCalls = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+
+    try {
+      const response = await axios.get(`${API_BASE_URL}/orders/call-history/?cursor=${encodeURIComponent(nextCursor)}`)
+      const data = response.data
+      setCalls(prev => {
+        const loadedIds = new Set(prev.map(call => call.id))
+        return [...prev, ...(data.calls || []).filter(call => !loadedIds.has(call.id))]
+      })
+      setNextCursor(data.next_cursor || null)
+    } catch (err) {
+      console.error('[CallHistory] Error loading more:', err)
+      setError(err.response?.data?.error || 'Failed to load more calls')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const formatDate = (dateString) => {
     if (!dateString) return 'N/A'
     const date = new Date(dateString)
@@ -220,6 +279,14 @@ function CallHistory() {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <div style={{textAlign: 'center', marginTop: '20px'}}>
+          <button onClick={loadMoreCalls} className="refresh-button" disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : `Load More (${calls.length} of ${count})`}
+          </button>
+        </div>
+      )}
     </div>
   )
 }
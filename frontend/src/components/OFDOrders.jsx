@@ -1,8 +1,9 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import axios from 'axios'
 import Toast, { showToast } from './Toast'
 import './OFDOrders.css'
 import { API_BASE_URL } from '../config'
+import { followLiveSession } from '../utils/liveEvents'
 
 // Configure axios to skip ngrok browser warning
 axios.defaults.headers.common['ngrok-skip-browser-warning'] = 'true'
@@ -13,6 +14,8 @@ function OFDOrders() {
   const [data, setData] = useState(null)
   const [callingAwb, setCallingAwb] = useState(null)
   const [schedulerStatus, setSchedulerStatus] = useState(null)
+  const ordersCursor = useRef(null) // Cursor of the last orders response - refreshes only fetch changes
+  const syncPollTimer = useRef(null) // Re-fetch while the server syncs orders in the background
   const [scheduledTime, setScheduledTime] = useState('10:00')
   const [calledAwbs, setCalledAwbs] = useState(new Set())
 
@@ -34,6 +37,7 @@ function OFDOrders() {
 
   // State for expanded cards (accordion)
   const [expandedOrderDetails, setExpandedOrderDetails] = useState({}) // { awb: 'basic' | 'call' | 'recording' }
+  const [callTexts, setCallTexts] = useState({}) // { call_id: { summary, transcript } } - loaded when call details open
 
   // State for frontend console logs
   const [frontendLogs, setFrontendLogs] = useState([])
@@ -45,6 +49,17 @@ function OFDOrders() {
     }))
   }
 
+  // Summary/transcript aren't in the OFD list - fetch them for one call when its details open
+  const loadCallTexts = async (callId) => {
+    if (!callId || callTexts[callId]?.transcript) return // Refetched until the call has one
+    try {
+      const response = await axios.get(`${API_BASE_URL}/orders/call-history/${encodeURIComponent(callId)}/`)
+      setCallTexts(prev => ({ ...prev, [callId]: response.data }))
+    } catch (err) {
+      console.error(`[Call Details] Could not load transcript of ${callId}: ${err.response?.data?.error || err.message}`)
+    }
+  }
+
   // Intercept console.log, console.error, console.warn
   useEffect(() => {
     const originalLog = console.log
@@ -133,6 +148,7 @@ function OFDOrders() {
     // OPTIMIZED: Load data ONCE on mount, then use manual refresh only
     fetchOFDOrders()
     fetchSchedulerStatus()
+    return () => clearTimeout(syncPollTimer.current)
   }, []) // Empty dependency - run once on mount only
 
   // Separate useEffect for countdown timer - updates every minute
@@ -156,23 +172,29 @@ function OFDOrders() {
     }
   }, [schedulerStatus?.scheduled_times]) // Re-run when scheduled_times changes
 
-  // NEW: Auto-refresh scheduler status when calling session is active
+  // Live session updates (long-poll) while a calling session is active
   useEffect(() => {
-    let statusPollInterval = null
-
-    // If calling session is active, poll scheduler status every 3 seconds
-    if (schedulerStatus?.live_session?.is_calling) {
-      console.log('[Live Session] Auto-polling enabled - refreshing every 3 seconds')
-      statusPollInterval = setInterval(() => {
-        fetchSchedulerStatus()
-      }, 3000) // Poll every 3 seconds during active calls
+    if (!schedulerStatus?.live_session?.is_calling) return
+
+    const updateLiveSession = (update) => {
+      setSchedulerStatus(prev => prev ? { ...prev, live_session: update(prev.live_session || {}) } : prev)
     }
 
-    return () => {
-      if (statusPollInterval) {
-        clearInterval(statusPollInterval)
-        console.log('[Live Session] Auto-polling disabled')
+    console.log('[Live Session] Following scheduler events')
+    const stopFollowing = followLiveSession({
+      onSnapshot: (snapshot) => updateLiveSession(() => snapshot.live_session),
+      onEvent: (event) => {
+        if (event.kind === 'session') {
+          updateLiveSession(live => ({ ...live, ...event.data }))
+        } else if (event.kind === 'log') {
+          updateLiveSession(live => ({ ...live, logs: [...(live.logs || []), event.data].slice(-20) }))
+        }
       }
+    })
+
+    return () => {
+      stopFollowing()
+      console.log('[Live Session] Stopped following scheduler events')
     }
   }, [schedulerStatus?.live_session?.is_calling]) // Re-run when is_calling status changes
 
@@ -190,10 +212,55 @@ function OFDOrders() {
     }
   }
 
+  // Merge a ?since= delta into the current list (changed orders replaced in place, new ones first)
+  const applyOrdersDelta = (current, delta) => {
+    const changed = new Map(delta.orders.map(order => [order.awb, order]))
+    const removed = new Set(delta.removed)
+    const kept = current.orders
+      .filter(order => !removed.has(order.awb))
+      .map(order => {
+        const updated = changed.get(order.awb)
+        changed.delete(order.awb)
+        return updated || order
+      })
+
+    return {
+      ...current,
+      orders: [...changed.values(), ...kept],
+      total_count: delta.total_count,
+      ofd_count: delta.ofd_count,
+      undelivered_count: delta.undelivered_count,
+      cursor: delta.cursor
+    }
+  }
+
   const fetchOFDOrders = async (bypassCache = false) => {
     setError(null)
 
     try {
+      // Only changes since the last response, unless a full reload was asked for
+      if (!bypassCache && ordersCursor.current) {
+        const deltaResponse = await axios.get(`${API_BASE_URL}/orders/ofd/?since=${ordersCursor.current}`)
+        const delta = deltaResponse.data || {}
+
+        if (!delta.full_resync) {
+          ordersCursor.current = delta.cursor
+          setData(prev => prev ? applyOrdersDelta(prev, delta) : prev)
+          setCalledAwbs(prev => {
+            const awbs = new Set(prev)
+            delta.removed.forEach(awb => awbs.delete(awb))
+            delta.orders.forEach(order => {
+              if (order.call_history?.has_been_called) awbs.add(order.awb)
+              else awbs.delete(order.awb)
+            })
+            return awbs
+          })
+          setLoading(false)
+          return
+        }
+        console.log('[OFD] Cursor too old - loading full list')
+      }
+
       // Add ?refresh=true to bypass backend cache if needed
       const url = bypassCache
         ? `${API_BASE_URL}/orders/ofd/?refresh=true`
@@ -216,8 +283,15 @@ function OFDOrders() {
         responseData.undelivered_count = 0
       }
 
+      // Database still being filled by the background sync - partial list, check again shortly
+      // (no cursor kept, so the next fetch is a full one)
+      ordersCursor.current = responseData.syncing ? null : (responseData.cursor || null)
       setData(responseData)
       setLoading(false)
+      if (responseData.syncing) {
+        clearTimeout(syncPollTimer.current)
+        syncPollTimer.current = setTimeout(() => fetchOFDOrders(), 3000)
+      }
 
       // Update called AWBs from order data (no separate API call needed)
       const awbs = new Set(
@@ -517,12 +591,12 @@ Check "Call History" tab for full details.
         'success'
       )
 
-      // IMPORTANT: Clear localStorage cache and force backend refresh with cache bypass
+      // IMPORTANT: Clear localStorage cache
       localStorage.removeItem('ofd_orders_cache')
 
-      // Fetch fresh data from backend with cache bypass (refresh=true)
+      // Fetch the changes - backend cache is invalidated by the call updates, no bypass needed
       setTimeout(() => {
-        fetchOFDOrders(true) // true = bypass backend cache
+        fetchOFDOrders()
       }, 500) // Small delay to let database updates propagate
     } catch (err) {
       showToast(
@@ -561,11 +635,23 @@ Check "Call History" tab for full details.
             {data.undelivered_count > 0 && (
               <div className="count-badge undelivered">{data.undelivered_count} Undelivered</div>
             )}
+            {data.syncing && data.sync && (
+              <div className="count-badge total">
+                ⏳ Syncing from iThink{data.sync.stage === 'tracking'
+                  ? ` - tracked ${data.sync.awbs_tracked}/${data.sync.awbs_total}`
+                  : ` - ${data.sync.orders_fetched} orders fetched`}
+              </div>
+            )}
+            {!data.syncing && data.sync?.status === 'failed' && (
+              <div className="count-badge undelivered" title={data.sync.error || ''}>
+                ⚠️ Last iThink sync failed
+              </div>
+            )}
           </div>
         </div>
         <div style={{ display: 'flex', gap: '0.75rem', flexWrap: 'wrap', alignItems: 'center' }}>
           <button
-            onClick={() => { localStorage.removeItem('ofd_orders_cache'); fetchOFDOrders(true); }}
+            onClick={() => { localStorage.removeItem('ofd_orders_cache'); fetchOFDOrders(); }}
             style={{
               padding: '0.65rem 1.25rem',
               borderRadius: '10px',
@@ -1272,7 +1358,10 @@ Check "Call History" tab for full details.
               {order.call_history && (
                 <>
                   <button
-                    onClick={() => toggleOrderSection(order.awb, 'call')}
+                    onClick={() => {
+                      if (expandedOrderDetails[order.awb] !== 'call') loadCallTexts(order.call_history.call_id)
+                      toggleOrderSection(order.awb, 'call')
+                    }}
                     style={{
                       width: '100%',
                       padding: '0.75rem',
@@ -1421,7 +1510,7 @@ Check "Call History" tab for full details.
                       )}
 
                       {/* Transcript - Improved UI */}
-                      {order.call_history.transcript && (
+                      {callTexts[order.call_history.call_id]?.transcript && (
                         <div style={{
                           marginTop: '1rem',
                           padding: '1rem',
@@ -1451,7 +1540,7 @@ Check "Call History" tab for full details.
                             borderRadius: '6px',
                             boxShadow: 'inset 0 2px 4px rgba(0,0,0,0.06)'
                           }}>
-                            {order.call_history.transcript.split('\n').map((line, index) => {
+                            {callTexts[order.call_history.call_id].transcript.split('\n').map((line, index) => {
                               const isAI = line.startsWith('AI:')
                               const isUser = line.startsWith('User:')
 
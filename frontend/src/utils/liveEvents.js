@@ -0,0 +1,67 @@
+import axios from 'axios'
+import { API_BASE_URL } from '../config'
+
+const LONG_POLL_WAIT = 20 // Seconds the server may hold a request (LONG_POLL_MAX_SECONDS)
+const EMPTY_DELAY = 2000 // Pause after an answer without events (server had no free wait slot)
+const ERROR_DELAY = 5000
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms))
+
+// Follow live scheduler events (long-poll on the normal API, token in the Authorization header)
+// Requests are only held open while a calling session runs - otherwise the session state is
+// checked every idleMs. Returns a function that stops following.
+export const followLiveSession = ({ onSnapshot, onEvent, idleMs = 30000 }) => {
+  let stopped = false
+  let controller = null
+
+  const fetchEvents = async (params) => {
+    controller = new AbortController()
+    const response = await axios.get(`${API_BASE_URL}/orders/scheduler/events/`, {
+      params,
+      signal: controller.signal
+    })
+    return response.data
+  }
+
+  const run = async () => {
+    let after = null
+    while (!stopped) {
+      try {
+        const data = await fetchEvents(after === null ? {} : { after, wait: LONG_POLL_WAIT })
+        if (stopped) return
+
+        if (data.snapshot) {
+          if (onSnapshot) onSnapshot(data.snapshot)
+          if (!data.snapshot.live_session?.is_calling) {
+            after = null
+            await sleep(idleMs)
+            continue
+          }
+        }
+
+        after = data.last_event_id
+        let sessionEnded = false
+        data.events.forEach(event => {
+          if (onEvent) onEvent(event)
+          if (event.kind === 'session' && event.data?.is_calling === false) sessionEnded = true
+        })
+
+        if (sessionEnded) {
+          after = null // Next request gets the final snapshot, then goes idle
+        } else if (data.events.length === 0) {
+          await sleep(EMPTY_DELAY)
+        }
+      } catch (err) {
+        if (stopped || axios.isCancel(err)) return
+        await sleep(ERROR_DELAY)
+      }
+    }
+  }
+
+  run()
+
+  return () => {
+    stopped = true
+    if (controller) controller.abort()
+  }
+}